@@ -2,7 +2,8 @@
 Script to generate new_object overloads for core.pyi from fields.py
 
 Reads ID_TO_TYPEDDICT and generates @overload stubs for each object ID.
-Outputs to output.txt for manual insertion into core.pyi
+Outputs to output.txt for manual insertion into core.pyi,
+and the by_id overloads (one per TypedDict) to output_by_id.txt for manual insertion into typed_access.py
 """
 
 import sys
@@ -45,6 +46,21 @@ def generate_overloads() -> str:
     return "\n".join(lines)
 
 
+def generate_by_id_overloads() -> str:
+    """Generate TypedAccess.by_id overloads, one per TypedDict with a Literal of all its IDs."""
+    ids_by_type: dict[str, list[int]] = {}
+    for obj_id, typeddict_type in sorted(ID_TO_TYPEDDICT.items(), key=lambda x: x[0]):
+        ids_by_type.setdefault(get_typeddict_name(typeddict_type), []).append(obj_id)
+    
+    lines: list[str] = []
+    for typeddict_name, ids in sorted(ids_by_type.items(), key=lambda x: x[1][0]):
+        literal = ", ".join(map(str, ids))
+        lines.append("    @overload")
+        lines.append(f"    def by_id(self, object_id: Literal[{literal}]) -> list[td.{typeddict_name}]: ...")
+    
+    return "\n".join(lines)
+
+
 # def is_obj_id(obj: ObjectType, object_id: Literal[4539]) -> TypeGuard[td.CollectibleType]: ...
 def main():
     overloads = generate_overloads()
@@ -56,6 +72,15 @@ def main():
     
     print(f"Generated {len(overloads.splitlines()) // 2} overloads")
     print(f"Output written to: {output_path}")
+    
+    by_id_overloads = generate_by_id_overloads()
+    by_id_path = Path(__file__).parent / "output_by_id.txt"
+    
+    with open(by_id_path, "w") as f:
+        f.write(by_id_overloads)
+    
+    print(f"Generated {len(by_id_overloads.splitlines()) // 2} by_id overloads")
+    print(f"Output written to: {by_id_path}")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 
 from .level import Level
+from .cache import LevelCache
 from .id import NamedInt
 from . import context
 from .context import (
@@ -24,12 +25,13 @@ from .core import (
     is_obj_id,
 )
 
-from .validation import setting
+from .validation import setting, deferred_validation
 
 from . import object_types as td
 from .object_types import AllPropsType, ObjectType
 
 from .object import ObjectList
+from .columnar import ColumnarObjectList
 
 from .color import Color
 
@@ -47,6 +49,7 @@ from .mappings import obj_enum as enum
 
 __all__ = [
     "Level",
+    "LevelCache",
     # Context
     "context",
     "ctx",
@@ -66,6 +69,7 @@ __all__ = [
     "wait",
     # Object
     "ObjectList",
+    "ColumnarObjectList",
     # ID allocation
     "NamedInt",
     # Core helpers
@@ -75,6 +79,7 @@ __all__ = [
     "is_obj_id",
     # Validation
     "setting",
+    "deferred_validation",
     # Color
     "Color",
     # TypedDicts
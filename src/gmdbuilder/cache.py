@@ -0,0 +1,134 @@
+"""On-disk snapshots of loaded levels, so unchanged .gmd files load without decompressing or decoding their objects."""
+
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .id import IDTypes
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "gmdbuilder"
+
+_FORMAT_VERSION = 1
+_SNAPSHOT_SUFFIX = ".snapshot"
+_OBJECTS_SUFFIX = ".objects"
+
+
+SourceKey = tuple[str, int, int, str]
+"""(resolved path, mtime_ns, size, content hash) of a source file"""
+
+
+def source_key(path: str | Path) -> SourceKey:
+    """Identify the current contents of a source file."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, "blake2b").hexdigest()
+    return str(path), stat.st_mtime_ns, stat.st_size, digest
+
+
+@dataclass(slots=True)
+class LevelSnapshot:
+    """Everything Level.from_file needs from a .gmd besides its plist."""
+    source: SourceKey
+    """The file this was taken from, as it was before loading"""
+    start: str
+    """Start object string (level settings and color channels)"""
+    chunks: list[str]
+    """Object strings in file order, tagged objects included"""
+    payloads: list[dict[str, Any] | None]
+    """Decoded objects matching chunks, None for tagged objects. See level._decode_shard."""
+    id_refs: dict[IDTypes, bytes] | None
+    """Per-pool ID reference counts of the loaded objects, None if they weren't tracked"""
+
+
+class LevelCache:
+    """
+    A directory of LevelSnapshots, one per source file and tag group, and of the object files behind Level.open_readonly().
+
+    A snapshot is used only while its source file's path, mtime and content hash all match.
+    Least recently used snapshots are deleted once the directory grows past max_bytes.
+    Snapshots are pickles, so only use directories you trust.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIR, max_bytes: int = 1 << 30):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def _stem(source: Path) -> str:
+        return hashlib.blake2b(str(source.resolve()).encode(), digest_size=16).hexdigest()
+
+    def _entry(self, source: Path, tag_group: int) -> Path:
+        return self.directory / f"{self._stem(source)}-{tag_group}{_SNAPSHOT_SUFFIX}"
+
+    def _entries(self, stem: str = "*") -> list[Path]:
+        return [
+            *self.directory.glob(f"{stem}-*{_SNAPSHOT_SUFFIX}"),
+            *self.directory.glob(f"{stem}{_OBJECTS_SUFFIX}"),
+        ]
+
+    def objects_file(self, source: str | Path) -> Path:
+        """Where the read-only object file of source is kept, see readonly.ReadOnlyLevel."""
+        return self.directory / f"{self._stem(Path(source))}{_OBJECTS_SUFFIX}"
+
+    def load(self, source: str | Path, tag_group: int = 9999, key: SourceKey | None = None) -> LevelSnapshot | None:
+        """
+        The snapshot for source, or None if there is none or it is out of date. Out of date snapshots are deleted.
+        key is source_key(source) if the caller already has it, so the file isn't hashed again.
+        """
+        source = Path(source)
+        entry = self._entry(source, tag_group)
+        try:
+            with open(entry, "rb") as f:
+                if pickle.load(f) != (_FORMAT_VERSION, key or source_key(source)):
+                    raise ValueError("stale snapshot")
+                snapshot: LevelSnapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            entry.unlink(missing_ok=True)
+            return None
+        os.utime(entry) # mark as recently used
+        return snapshot
+
+    def store(self, source: str | Path, tag_group: int, snapshot: LevelSnapshot) -> None:
+        """Save a snapshot for source, then evict down to max_bytes."""
+        source = Path(source)
+        entry = self._entry(source, tag_group)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((_FORMAT_VERSION, snapshot.source), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def invalidate(self, source: str | Path | None = None) -> int:
+        """Delete the snapshots and object file of source, or every file in the cache if source is None. Returns number deleted."""
+        deleted = 0
+        for entry in self._entries("*" if source is None else self._stem(Path(source))):
+            entry.unlink(missing_ok=True)
+            deleted += 1
+        return deleted
+
+    def size(self) -> int:
+        """Total bytes of cache files in the directory."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used cache files until the directory is within max_bytes. Returns number deleted."""
+        entries = [(entry.stat(), entry) for entry in self._entries()]
+        total = sum(stat.st_size for stat, _ in entries)
+        deleted = 0
+        for stat, entry in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+            deleted += 1
+        return deleted
@@ -0,0 +1,566 @@
+"""Opt-in columnar (struct-of-arrays) storage for level objects."""
+
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Mapping, MutableMapping, MutableSequence, SupportsIndex, cast, overload
+
+if TYPE_CHECKING:
+    from .id import IDAllocator
+    from .query import Query
+    from .selection import Selection
+
+from .mappings import obj_prop
+from .object import ObjectPatternMatch, ValidatedObject, compile_pattern
+from .object_types import ObjectType
+from .typed_access import TypedAccess
+from .validation import validate
+
+
+HOT_COLUMNS: dict[str, str] = {
+    obj_prop.X: "d",
+    obj_prop.Y: "d",
+    obj_prop.ROTATION: "d",
+    obj_prop.SCALE_X: "d",
+    obj_prop.SCALE_Y: "d",
+    obj_prop.COLOR_1: "i",
+    obj_prop.COLOR_2: "i",
+}
+"""Default props stored in typed arrays, mapped to their array typecode ('d' or 'i'). Object ID (a1) always has its own column."""
+
+PACKED_COLUMNS: tuple[str, ...] = (obj_prop.GROUPS,)
+"""Default set[int] props packed into one int array per key, instead of one Python set per object."""
+
+
+class _IntSetColumn:
+    """
+    One set[int] prop of every slot, packed: a slot's values are a run of ints in one shared array.
+    A rewrite reuses the slot's run when the new set fits in it and appends a new run otherwise.
+    Runs left behind are dropped once they make up half the array.
+    """
+    __slots__ = ("_ints", "_start", "_len", "_dead")
+
+    def __init__(self):
+        self._ints = array("i")
+        self._start = array("q")
+        self._len = array("i")
+        """Slot -> length of its run, -1 if the slot lacks the prop."""
+        self._dead = 0
+        """Ints in runs no slot uses anymore."""
+
+    def add_slot(self) -> None:
+        self._start.append(0)
+        self._len.append(-1)
+
+    def has(self, slot: int) -> bool:
+        return self._len[slot] >= 0
+
+    def get(self, slot: int) -> set[int] | None:
+        n = self._len[slot]
+        if n < 0:
+            return None
+        start = self._start[slot]
+        return set(self._ints[start:start + n])
+
+    def set(self, slot: int, values: Iterable[int]) -> None:
+        run = array("i", values)
+        n = len(run)
+        old = self._len[slot]
+        if n <= old:
+            start = self._start[slot]
+            self._ints[start:start + n] = run
+            self._dead += old - n
+        else:
+            if old > 0:
+                self._dead += old
+            self._start[slot] = len(self._ints)
+            self._ints.extend(run)
+        self._len[slot] = n
+        if self._dead > 4096 and self._dead * 2 > len(self._ints):
+            self._compact()
+
+    def discard(self, slot: int) -> None:
+        if (n := self._len[slot]) > 0:
+            self._dead += n
+        self._len[slot] = -1
+
+    def _compact(self) -> None:
+        ints, starts = self._ints, self._start
+        packed = array("i")
+        for slot, n in enumerate(self._len):
+            if n > 0:
+                start = starts[slot]
+                starts[slot] = len(packed)
+                packed.extend(ints[start:start + n])
+        self._ints = packed
+        self._dead = 0
+
+
+class ObjectRow(MutableMapping[str, Any]):
+    """
+    A dict-like view of one object in a ColumnarObjectList.
+
+    Property edits are validated exactly like ValidatedObject.
+    A row becomes invalid once its object is deleted from the list.
+    """
+    __slots__ = ("_store", "_slot", "_gen")
+
+    def __init__(self, store: "ColumnarObjectList", slot: int):
+        self._store = store
+        self._slot = slot
+        self._gen = store._gens[slot]
+
+    def _check(self) -> int:
+        if self._store._gens[self._slot] != self._gen:
+            raise RuntimeError("Object row refers to an object that was removed from its ColumnarObjectList")
+        return self._slot
+
+    def __getitem__(self, k: str) -> Any:
+        return self._store._get(self._check(), k)
+
+    def __setitem__(self, k: str, v: Any):
+        if k == obj_prop.ID:
+            raise KeyError("Cannot change object ID after initialization")
+        slot = self._check()
+        validate(k, v, self)
+        self._store._set(slot, k, v)
+
+    def __delitem__(self, k: str):
+        if k == obj_prop.ID:
+            raise KeyError("Cannot delete object ID")
+        self._store._del(self._check(), k)
+
+    def __contains__(self, k: object) -> bool:
+        return self._store._has_key(self._check(), k)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._store._keys(self._check())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._store._keys(self._check()))
+
+    def update(self, *args: Any, **kwargs: Any):
+        items = dict(*args, **kwargs)
+        slot = self._check()
+        for k, v in items.items():
+            if k == obj_prop.ID:
+                raise KeyError("Cannot change object ID after initialization")
+            validate(k, v, self)
+        for k, v in items.items():
+            self._store._set(slot, k, v)
+
+    def __repr__(self) -> str:
+        return f"ObjectRow({dict(self.items())!r})"
+
+
+class ColumnarObjectList(TypedAccess, MutableSequence[ObjectType]):
+    """
+    Opt-in alternative to ObjectList that stores objects column-wise.
+
+    Hot numeric props (see HOT_COLUMNS) live in typed arrays, and group sets (see PACKED_COLUMNS) are packed
+    into one int array per key. Every other prop lives in a per-object value tuple,
+    described by a key layout shared by all objects with the same rare keys.
+    Indexing returns ObjectRow views that keep dict-style access and validation.
+
+    Objects are copied into the store on append/insert/extend: edit them through
+    `objects[i]` afterwards, not through the original dict.
+    Float columns return floats, packed columns return a new set on every read, and keys are exported hot-props-first.
+    """
+
+    def __init__(self, *,
+        tag_group: int = 9999,
+        hot_columns: Mapping[str, str] = HOT_COLUMNS,
+        packed_columns: Iterable[str] = PACKED_COLUMNS):
+        for k, t in hot_columns.items():
+            if t not in ("d", "i"):
+                raise ValueError(f"Column {k!r} must use typecode 'd' (float) or 'i' (int), got {t!r}")
+        packed_columns = tuple(packed_columns)
+        if both := set(hot_columns).intersection(packed_columns):
+            raise ValueError(f"Columns {sorted(both)} can't be both hot and packed")
+        
+        self.tag_group: int = tag_group
+        """Group ID automatically added to objects on append/insert/extend."""
+        self._id_allocator: IDAllocator | None = None
+        """Private reference to the level's IDAllocator."""
+
+        self._order = array("q")
+        """List position -> storage slot."""
+        self._free: list[int] = []
+        self._gens = array("L")
+        self._ids = array("i")
+        self._cols: dict[str, array[Any]] = {k: array(t) for k, t in hot_columns.items()}
+        self._has: dict[str, bytearray] = {k: bytearray() for k in hot_columns}
+        self._sets: dict[str, _IntSetColumn] = {k: _IntSetColumn() for k in packed_columns}
+        self._layouts: dict[tuple[str, ...], dict[str, int]] = {}
+        """Interned rare-key layouts: key tuple -> {key: position in value tuple}."""
+        self._layout: list[dict[str, int] | None] = []
+        self._values: list[tuple[Any, ...] | None] = []
+
+    # -- slot storage --------------------------------------------------------
+
+    def _new_slot(self, obj: Mapping[str, Any]) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = obj[obj_prop.ID]
+        else:
+            slot = len(self._ids)
+            self._ids.append(obj[obj_prop.ID])
+            self._gens.append(0)
+            self._layout.append(None)
+            self._values.append(None)
+            for k, col in self._cols.items():
+                col.append(0)
+                self._has[k].append(0)
+            for packed in self._sets.values():
+                packed.add_slot()
+
+        cols = self._cols
+        sets = self._sets
+        keys: list[str] = []
+        values: list[Any] = []
+        for k, v in obj.items():
+            if k == obj_prop.ID:
+                continue
+            if (col := cols.get(k)) is not None:
+                col[slot] = v
+                self._has[k][slot] = 1
+            elif (packed := sets.get(k)) is not None:
+                packed.set(slot, v)
+            else:
+                keys.append(k)
+                values.append(v)
+        self._set_rare(slot, tuple(keys), tuple(values))
+        return slot
+
+    def _set_rare(self, slot: int, keys: tuple[str, ...], values: tuple[Any, ...]) -> None:
+        if not keys:
+            self._layout[slot] = None
+            self._values[slot] = None
+            return
+        if (layout := self._layouts.get(keys)) is None:
+            layout = self._layouts[keys] = {k: i for i, k in enumerate(keys)}
+        self._layout[slot] = layout
+        self._values[slot] = values
+
+    def _free_slot(self, slot: int) -> None:
+        self._gens[slot] += 1
+        for has in self._has.values():
+            has[slot] = 0
+        for packed in self._sets.values():
+            packed.discard(slot)
+        self._layout[slot] = None
+        self._values[slot] = None
+        self._free.append(slot)
+
+    def _get(self, slot: int, k: str) -> Any:
+        if k == obj_prop.ID:
+            return self._ids[slot]
+        if (col := self._cols.get(k)) is not None:
+            if self._has[k][slot]:
+                return col[slot]
+            raise KeyError(k)
+        if (packed := self._sets.get(k)) is not None:
+            if (values := packed.get(slot)) is None:
+                raise KeyError(k)
+            return values
+        layout = self._layout[slot]
+        if layout is None:
+            raise KeyError(k)
+        return cast(tuple[Any, ...], self._values[slot])[layout[k]]
+
+    def _set(self, slot: int, k: str, v: Any) -> None:
+        if (col := self._cols.get(k)) is not None:
+            col[slot] = v
+            self._has[k][slot] = 1
+            return
+        if (packed := self._sets.get(k)) is not None:
+            packed.set(slot, v)
+            return
+        layout = self._layout[slot]
+        if layout is None:
+            self._set_rare(slot, (k,), (v,))
+            return
+        values = cast(tuple[Any, ...], self._values[slot])
+        if (i := layout.get(k)) is not None:
+            self._values[slot] = values[:i] + (v,) + values[i + 1:]
+        else:
+            self._set_rare(slot, tuple(layout) + (k,), values + (v,))
+
+    def _del(self, slot: int, k: str) -> None:
+        if k in self._cols:
+            if not self._has[k][slot]:
+                raise KeyError(k)
+            self._has[k][slot] = 0
+            return
+        if (packed := self._sets.get(k)) is not None:
+            if not packed.has(slot):
+                raise KeyError(k)
+            packed.discard(slot)
+            return
+        layout = self._layout[slot]
+        if layout is None or k not in layout:
+            raise KeyError(k)
+        i = layout[k]
+        keys = tuple(layout)
+        values = cast(tuple[Any, ...], self._values[slot])
+        self._set_rare(slot, keys[:i] + keys[i + 1:], values[:i] + values[i + 1:])
+
+    def _has_key(self, slot: int, k: object) -> bool:
+        if k == obj_prop.ID:
+            return True
+        if isinstance(k, str) and k in self._has:
+            return bool(self._has[k][slot])
+        if isinstance(k, str) and (packed := self._sets.get(k)) is not None:
+            return packed.has(slot)
+        layout = self._layout[slot]
+        return layout is not None and k in layout
+
+    def _keys(self, slot: int) -> Iterator[str]:
+        yield obj_prop.ID
+        for k, has in self._has.items():
+            if has[slot]:
+                yield k
+        for k, packed in self._sets.items():
+            if packed.has(slot):
+                yield k
+        if (layout := self._layout[slot]) is not None:
+            yield from layout
+
+    # -- sequence protocol ---------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @overload
+    def __getitem__(self, index: SupportsIndex) -> ObjectType: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[ObjectType]: ...
+    def __getitem__(self, index: SupportsIndex | slice) -> ObjectType | list[ObjectType]:
+        if isinstance(index, slice):
+            return [cast(ObjectType, ObjectRow(self, slot)) for slot in self._order[index]]
+        return cast(ObjectType, ObjectRow(self, self._order[index]))
+
+    def __iter__(self) -> Iterator[ObjectType]:
+        for slot in self._order:
+            yield cast(ObjectType, ObjectRow(self, slot))
+
+    def __delitem__(self, index: SupportsIndex | slice):
+        if isinstance(index, slice):
+            for slot in self._order[index]:
+                self._free_slot(slot)
+        else:
+            self._free_slot(self._order[index])
+        del self._order[index]
+
+    def __setitem__(self, # type: ignore[override]
+        index: SupportsIndex | slice,
+        value: ObjectType | list[ObjectType]):
+        """Validate when setting an item by index."""
+        if isinstance(index, slice):
+            if not isinstance(value, list):
+                raise TypeError(f"can only assign a list (not {type(value).__name__}) to a slice")
+            slots = array("q", (self._new_slot(ValidatedObject.wrap_object(obj)) for obj in value))
+            for slot in self._order[index]:
+                self._free_slot(slot)
+            self._order[index] = slots
+        else:
+            if not isinstance(value, Mapping):
+                raise TypeError(f"can only assign ObjectType dict (not {type(value).__name__})")
+            slot = self._new_slot(ValidatedObject.wrap_object(value))
+            self._free_slot(self._order[index])
+            self._order[index] = slot
+
+    def _tagged(self, obj: ObjectType) -> ObjectType:
+        obj = ValidatedObject.wrap_object(obj)
+
+        groups = set(obj.get(obj_prop.GROUPS, set()))
+        groups.add(self.tag_group)
+        obj[obj_prop.GROUPS] = groups
+
+        if self._id_allocator is not None:
+            self._id_allocator.register_object(obj)
+        return obj
+
+    def append(self, obj: ObjectType):
+        """Validate and append an object."""
+        self._order.append(self._new_slot(self._tagged(obj)))
+
+    def insert(self, index: SupportsIndex, obj: ObjectType):
+        """Validate and insert an object at index."""
+        self._order.insert(int(index), self._new_slot(self._tagged(obj)))
+
+    def extend(self, iterable: Iterable[ObjectType]):
+        """Validate and extend with multiple objects."""
+        for obj in iterable:
+            self.append(obj)
+
+    def _append_loaded(self, obj: ObjectType) -> None:
+        """Append an already validated object from a level load, without tagging."""
+        self._order.append(self._new_slot(obj))
+
+    def _finish_load(self) -> None:
+        """Counterpart of ObjectList._finish_load. Columns need no post-load indexing."""
+
+    def _materialize(self, slot: int) -> ObjectType:
+        obj = ValidatedObject(self._ids[slot])
+        dict.update(obj, ((k, self._get(slot, k)) for k in self._keys(slot)))
+        return cast(ObjectType, obj)
+
+    def pop(self, index: int = -1) -> ObjectType:
+        """Remove and return the object at index, detached from the store as a ValidatedObject."""
+        slot = self._order[index]
+        obj = self._materialize(slot)
+        del self[index]
+        return obj
+
+    def reverse(self) -> None:
+        self._order.reverse()
+
+    def clear(self) -> None:
+        for slot in self._order:
+            self._free_slot(slot)
+        del self._order[:]
+
+    def __add__(self, other: object) -> "ColumnarObjectList":
+        """Disabled: use extend() instead."""
+        raise TypeError("Use .extend() instead of + operator")
+
+    def __iadd__(self, other: object) -> "ColumnarObjectList": # type: ignore[override]
+        """Disabled: use extend() instead."""
+        raise TypeError("Use .extend() instead of += operator")
+
+    # -- scans ---------------------------------------------------------------
+
+    def column(self, key: str, default: Any = None) -> list[Any]:
+        """Values of one property for every object in list order, default where the object lacks it."""
+        order = self._order
+        if key == obj_prop.ID:
+            ids = self._ids
+            return [ids[s] for s in order]
+        if (col := self._cols.get(key)) is not None:
+            has = self._has[key]
+            return [col[s] if has[s] else default for s in order]
+        if (packed := self._sets.get(key)) is not None:
+            get = packed.get
+            return [default if (v := get(s)) is None else v for s in order]
+        layouts, values = self._layout, self._values
+        return [
+            cast(tuple[Any, ...], values[s])[i] 
+            if (l := layouts[s]) is not None and (i := l.get(key)) is not None else default
+            for s in order
+        ]
+
+    def _of_id(self, object_id: int) -> list[ObjectType]:
+        """Objects with object_id, in list order. A scan of the ID column, without building rows for other objects."""
+        ids = self._ids
+        return [cast(ObjectType, ObjectRow(self, s)) for s in self._order if ids[s] == object_id]
+
+    def _slot_matcher(self, condition: Mapping[str, Any]) -> Callable[[int], bool]:
+        """Compile a dict pattern into a per-slot check that reads columns directly."""
+        checks: list[Callable[[int], bool]] = []
+        for k, v in condition.items():
+            if k == obj_prop.ID:
+                ids = self._ids
+                checks.append(lambda s, v=v: ids[s] == v)
+            elif (col := self._cols.get(k)) is not None:
+                has = self._has[k]
+                if v is None:
+                    checks.append(lambda s, has=has: bool(has[s]))
+                else:
+                    checks.append(lambda s, col=col, has=has, v=v: bool(has[s]) and col[s] == v)
+            elif (packed := self._sets.get(k)) is not None:
+                if v is None:
+                    checks.append(packed.has)
+                else:
+                    checks.append(lambda s, get=packed.get, v=v: get(s) == v)
+            else:
+                layouts, values = self._layout, self._values
+                if v is None:
+                    checks.append(lambda s, k=k: (l := layouts[s]) is not None and k in l)
+                else:
+                    checks.append(lambda s, k=k, v=v: 
+                        (l := layouts[s]) is not None and k in l 
+                        and cast(tuple[Any, ...], values[s])[l[k]] == v)
+        if len(checks) == 1:
+            return checks[0]
+        return lambda s: all(check(s) for check in checks)
+
+    def query(self) -> "Query":
+        """Start a query combining conditions, see query.Query. Only ID conditions avoid a full scan here."""
+        from .query import Query
+        return Query(self)
+
+    def select(self, condition: ObjectPatternMatch | None = None) -> "Selection":
+        """
+        Select objects matching a condition (dict or predicate), or all objects, for batched edits.
+        Dict patterns are evaluated on the columns; hot columns are edited in place through NumPy when available.
+        """
+        from .selection import Selection
+        if condition is None:
+            return Selection(self, list(self))
+        if callable(condition):
+            predicate = compile_pattern(condition)
+            return Selection(self, [row for row in self if predicate(row)])
+        match = self._slot_matcher(condition)
+        return Selection(self, [cast(ObjectType, ObjectRow(self, s)) for s in self._order if match(s)])
+
+    def _match_flags(self, condition: ObjectPatternMatch, limit: int = -1) -> bytearray:
+        """Whether each object matches, in list order. With a limit, only the last limit matches are flagged."""
+        match: Callable[[int], bool]
+        if callable(condition):
+            predicate = condition
+            match = lambda s: predicate(cast(ObjectType, ObjectRow(self, s)))
+        else:
+            match = self._slot_matcher(condition)
+
+        order = self._order
+        if limit == -1:
+            return bytearray(map(bool, map(match, order)))
+        # Matches count from the end, like ObjectList.delete_where
+        remaining = limit
+        flags = bytearray(len(order))
+        for i in range(len(order) - 1, -1, -1):
+            if match(order[i]):
+                flags[i] = 1
+                remaining -= 1
+                if remaining == 0:
+                    break
+        return flags
+
+    def _remove_flagged(self, flags: bytearray, materialize: bool = False) -> list[ObjectType]:
+        """Free flagged slots in one pass, keeping the rest in order. Returns the removed objects if materialize."""
+        removed: list[ObjectType] = []
+        kept = array("q")
+        for flag, slot in zip(flags, self._order):
+            if flag:
+                if materialize:
+                    removed.append(self._materialize(slot))
+                self._free_slot(slot)
+            else:
+                kept.append(slot)
+        self._order = kept
+        return removed
+
+    def delete_where(self, condition: ObjectPatternMatch, *, limit: int = -1) -> int:
+        """
+        Delete objects matching a condition (dict or predicate)
+
+        For dict-matching, dict must match standard ObjectType keys/values.
+        'None' can be used as a wildcard value (not key).
+        Dict patterns are evaluated directly on the columns, without building rows.
+
+        Returns number of deleted objects.
+        """
+        if limit < -1 or limit == 0:
+            raise ValueError("delete_where limit must be -1 (no limit) or positive")
+        count = len(self._order)
+        self._remove_flagged(self._match_flags(condition, limit))
+        return count - len(self._order)
+
+    def filter_where(self, condition: ObjectPatternMatch) -> int:
+        """Keep only objects matching a condition (dict or predicate), deleting the rest. Returns number of deleted objects."""
+        count = len(self._order)
+        self._remove_flagged(bytearray(not f for f in self._match_flags(condition)))
+        return count - len(self._order)
+
+    def partition_where(self, condition: ObjectPatternMatch) -> list[ObjectType]:
+        """Remove objects matching a condition (dict or predicate) and return them, in list order, as ValidatedObjects like pop()."""
+        return self._remove_flagged(self._match_flags(condition), materialize=True)
@@ -1,6 +1,5 @@
 
 from dataclasses import dataclass
-from functools import lru_cache
 from typing import Any, Callable, Iterable, Literal, Union, get_args, get_origin, Required
 from . mappings import obj_id, obj_prop
 from . import object_types as td
@@ -256,8 +255,8 @@ _assign_id_types(range(3492, 3493 + 1), td.AnimatedType)
 _assign_id_types(range(4401, 4539 + 1), td.CollectibleType)
 
 
-ID_TO_ALLOWED_KEYS = {
-    k: set(v.__required_keys__) | set(v.__optional_keys__) 
+ID_TO_ALLOWED_KEYS: dict[int, frozenset[str]] = {
+    k: v.__required_keys__ | v.__optional_keys__
     for k, v in ID_TO_TYPEDDICT.items()
 }
 
@@ -266,6 +265,15 @@ COMMON_ALLOWED_KEYS = td.ObjectType.__required_keys__ | td.ObjectType.__optional
 TARGET_GROUP_FIELDS = { "a51", "a71", "a401", "a395", "a76" }
 """All fields are hashable"""
 
+INSTANT_SPAWNERS = {
+    tid.SPAWN,
+    tid.RANDOM,
+    tid.INSTANT_COUNT,
+    tid.INSTANT_COLLISION,
+    tid.ITEM_COMPARE,
+}
+"""Triggers that spawn their target groups (a51, a71) in the tick they are activated. Spawn only without a delay."""
+
 TARGETS_SOLID_GROUPS = {
     tid.MOVE,
     tid.ROTATE,
@@ -298,14 +306,12 @@ UNHASHABLE_VALUE_KEYS = {
 }
 
 
-@lru_cache(maxsize=1024)
 def int_is_in_range(v: Any, min_val: int = 0, max_val: int = 9999) -> bool:
     return isinstance(v, int) and min_val <= v <= max_val
 
 
-@lru_cache(maxsize=1024)
 def key_is_allowed(obj_id: int, key: str) -> bool:
-    return key in COMMON_ALLOWED_KEYS or key in ID_TO_ALLOWED_KEYS.get(obj_id, {})
+    return key in COMMON_ALLOWED_KEYS or key in ID_TO_ALLOWED_KEYS.get(obj_id, frozenset())
 
 
 @dataclass(frozen=True, slots=True)
@@ -399,14 +405,42 @@ def is_group_id(object_id: int, key: str, id: int) -> bool:
 
 hashable_value_key_to_isinstance: dict[str, Callable[[Any], bool]] = {}
 
+numeric_key_types: dict[str, type] = {}
+"""Keys annotated as plain int or float, whose type check depends only on the value's type."""
+
 
-# ACTUAL FUNCTION WE CARE ABOUT
-@lru_cache(maxsize=2048)
-def value_is_correct_type(key: str, v: Any) -> bool:
-    """Check if value v is of the correct type for key."""
-    if key not in hashable_value_key_to_isinstance:
-        raise ValueError(f"No type information available for key {key!r} : {v!r}")
-    return hashable_value_key_to_isinstance[key](v)
+type_check_stats = {"subclass_checks": 0}
+"""
+Counts type checks that missed the exact-type fast path (e.g. IntEnum or NamedInt values). 
+Read through validation.validation_stats().
+"""
+
+
+def _exact_type_check(accepted: tuple[type, ...]) -> Callable[[Any], bool]:
+    """
+    isinstance(v, accepted) excluding bool (unless accepted is bool), indexed by type(v). 
+    Exact types are one set lookup; subclasses fall back to isinstance.
+    """
+    exact = frozenset(accepted)
+    excluded = () if bool in exact else (bool,)
+    stats = type_check_stats
+    
+    def check(v: Any) -> bool:
+        t = type(v)
+        if t in exact:
+            return True
+        stats["subclass_checks"] += 1
+        return isinstance(v, accepted) and not isinstance(v, excluded)
+    return check
+
+
+def _literal_check(allowed: frozenset[Any]) -> Callable[[Any], bool]:
+    def check(v: Any) -> bool:
+        try:
+            return v in allowed
+        except TypeError: # Unhashable value
+            return False
+    return check
 
 
 def _type_to_isinstance(typ: Any) -> Callable[[Any], bool]:
@@ -420,17 +454,14 @@ def _type_to_isinstance(typ: Any) -> Callable[[Any], bool]:
         checks = [_type_to_isinstance(t) for t in get_args(typ)]
         return lambda v: any(check(v) for check in checks)
     elif origin is Literal:
-        allowed = get_args(typ)
-        return lambda v: v in allowed
+        return _literal_check(frozenset(get_args(typ)))
     elif typ is Any:
         return lambda v: True
     elif isinstance(typ, type):
-        if typ is bool:
-            return lambda v: isinstance(v, bool)
-        elif typ is float:
-            return lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
-        elif typ is int:
-            return lambda v: isinstance(v, int) and not isinstance(v, bool)
+        if typ is float:
+            return _exact_type_check((int, float))
+        elif typ is int or typ is bool:
+            return _exact_type_check((typ,))
         else:
             return lambda v: isinstance(v, typ)
 
@@ -449,6 +480,11 @@ def _typeddict_to_isinstance(typeddict: type):
         if key in hashable_value_key_to_isinstance: continue
         if key in UNHASHABLE_VALUE_KEYS: continue
         
+        if get_origin(typ) is Required:
+            typ = get_args(typ)[0]
+        if typ is int or typ is float:
+            numeric_key_types[key] = typ
+        
         try:
             hashable_value_key_to_isinstance[key] = _type_to_isinstance(typ)
         except ValueError as e:
@@ -1,5 +1,9 @@
 
-from typing import Iterable, Literal, overload
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Literal, Sequence, get_args, overload
+from .index import ObjectIndex
 from .mappings import obj_id, obj_prop
 from .object_types import ObjectType
 
@@ -26,69 +30,358 @@ class NamedInt(int):
 
 IDTypes = Literal["group", "item", "color", "collision"]
 
+BlockPolicy = Literal["first", "best"]
+
+MAX_ID = 9999
+
+_FREE_RUN = re.compile(b"\x00+")
+
+
+@dataclass(frozen=True)
+class IDPoolStats:
+    """Usage of one ID type, from IDAllocator.stats()."""
+    used: int
+    """IDs in use, reserved or handed out"""
+    free: int
+    free_runs: int
+    """Number of separate runs of free IDs"""
+    largest_free_run: int
+    """Longest block that can still be allocated"""
+    highest_used: int
+    """Highest ID in use, 0 if none"""
+    fragmentation: float
+    """0.0 when all free IDs form one run, approaching 1.0 as they scatter into small holes"""
+
+
+class IDPool:
+    """
+    Used/free state of one ID type (1-9999), one byte per ID.
+    
+    An ID is used while it is held (handed out or reserved) or referenced by at least one object in the level.
+    Object references are counted, so an ID becomes free again when the last object using it is removed or edited.
+    
+    Next-free is a C-level scan of the bitmap from a cursor that only moves back when IDs are freed,
+    so allocating every free ID once costs O(9999) in total.
+    """
+    __slots__ = ("name", "_used", "_held", "_refs", "_cursor", "_counter")
+
+    def __init__(self, name: IDTypes):
+        self.name: IDTypes = name
+        self._used = bytearray(MAX_ID + 1)
+        self._used[0] = 1 # ID 0 is never handed out
+        self._held = bytearray(self._used)
+        self._refs = array("I", bytes(4 * (MAX_ID + 1)))
+        """Number of objects referencing each ID"""
+        self._cursor = 1
+        """No free ID below this"""
+        self._counter = 0
+        """IDs handed out so far, for NamedInt names"""
+
+    def __contains__(self, id: int) -> bool:
+        return 0 <= id <= MAX_ID and self._used[id] == 1
+
+    def used_ids(self) -> set[int]:
+        used = self._used
+        return {i for i in range(1, MAX_ID + 1) if used[i]}
+
+    def refs(self, id: int) -> int:
+        """Number of objects currently using id."""
+        return self._refs[id] if 0 <= id <= MAX_ID else 0
+
+    def _free(self, id: int) -> None:
+        self._used[id] = 0
+        if id < self._cursor:
+            self._cursor = id
+
+    def mark_used(self, id: int) -> None:
+        """Hold id until released."""
+        if 0 < id <= MAX_ID:
+            self._held[id] = 1
+            self._used[id] = 1
+
+    def release(self, id: int) -> None:
+        """Drop the hold on id. It stays used while objects still reference it."""
+        if 0 < id <= MAX_ID:
+            self._held[id] = 0
+            if not self._refs[id]:
+                self._free(id)
+
+    def ref(self, id: int) -> None:
+        if 0 < id <= MAX_ID:
+            self._refs[id] += 1
+            self._used[id] = 1
+
+    def unref(self, id: int) -> None:
+        if 0 < id <= MAX_ID and self._refs[id]:
+            self._refs[id] -= 1
+            if not self._refs[id] and not self._held[id]:
+                self._free(id)
+
+    def clear_refs(self) -> None:
+        self._refs = array("I", bytes(4 * (MAX_ID + 1)))
+        self._used[:] = self._held
+        self._reset_cursor()
+
+    def load_refs(self, refs: bytes) -> None:
+        """Replace all reference counts with ones saved from refs_bytes()."""
+        self._refs = array("I", refs)
+        self._sync_used()
+
+    def refs_bytes(self) -> bytes:
+        return self._refs.tobytes()
+
+    def _sync_used(self) -> None:
+        held, refs = self._held, self._refs
+        self._used[:] = bytes(1 if held[i] or refs[i] else 0 for i in range(MAX_ID + 1))
+        self._reset_cursor()
+
+    def _reset_cursor(self) -> None:
+        cursor = self._used.find(0)
+        self._cursor = MAX_ID + 1 if cursor == -1 else cursor
+
+    def _name(self, id: int) -> NamedInt:
+        self._counter += 1
+        return NamedInt(id, f"new_{self.name}_{self._counter}")
+
+    def next_free(self) -> NamedInt:
+        id = self._used.find(0, self._cursor)
+        if id == -1:
+            self._cursor = MAX_ID + 1
+            raise RuntimeError(f"No free {self.name} IDs available (1-{MAX_ID} range exhausted)")
+        self._used[id] = 1
+        self._held[id] = 1
+        self._cursor = id + 1
+        return self._name(id)
+
+    def free_runs(self) -> list[tuple[int, int]]:
+        """(start, length) of every run of consecutive free IDs, in ID order."""
+        return [(m.start(), m.end() - m.start()) for m in _FREE_RUN.finditer(self._used, self._cursor)]
+
+    def _first_fit(self, count: int, align: int) -> int:
+        used = self._used
+        zeros = bytes(count)
+        pos = self._cursor
+        while True:
+            start = used.find(zeros, pos)
+            if start == -1:
+                return -1
+            aligned = -(-start // align) * align
+            if aligned == start:
+                return start
+            pos = aligned
+
+    def _best_fit(self, count: int, align: int) -> int:
+        best, best_length = -1, MAX_ID + 1
+        for start, length in self.free_runs():
+            aligned = -(-start // align) * align
+            if aligned + count <= start + length and length < best_length:
+                best, best_length = aligned, length
+        return best
+
+    def block(self, count: int, policy: "BlockPolicy" = "first", align: int = 1) -> tuple[NamedInt, ...]:
+        """
+        count consecutive free IDs starting at a multiple of align.
+        policy "first" takes the lowest run that fits, "best" the smallest run that fits (keeps large runs intact).
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        if align < 1:
+            raise ValueError("align must be at least 1")
+        if policy == "first":
+            start = self._first_fit(count, align)
+        elif policy == "best":
+            start = self._best_fit(count, align)
+        else:
+            raise ValueError(f"Unknown block policy: {policy}")
+        if start == -1:
+            raise RuntimeError(f"No run of {count} free {self.name} IDs available (align={align})")
+        
+        self._used[start:start + count] = self._held[start:start + count] = b"\x01" * count
+        if start == self._cursor:
+            self._cursor = start + count
+        return tuple(self._name(id) for id in range(start, start + count))
+
+    def stats(self) -> "IDPoolStats":
+        runs = self.free_runs()
+        free = sum(length for _, length in runs)
+        largest = max((length for _, length in runs), default=0)
+        highest = self._used.rfind(1, 1)
+        return IDPoolStats(
+            used=MAX_ID - free,
+            free=free,
+            free_runs=len(runs),
+            largest_free_run=largest,
+            highest_used=max(highest, 0),
+            fragmentation=1 - largest / free if free else 0.0,
+        )
+
+    def snapshot(self) -> tuple[bytes, int, int]:
+        """Holds and counters only. Object references follow the level, not the snapshot."""
+        return bytes(self._held), self._cursor, self._counter
+
+    def restore(self, state: tuple[bytes, int, int]) -> None:
+        held, _, self._counter = state
+        self._held[:] = held
+        self._sync_used()
+
+
+class IDUsageIndex(ObjectIndex):
+    """
+    Counts references from the objects of an ObjectList into an IDAllocator's pools.
+    
+    Tracks the same properties as IDAllocator.register_object. Built on the first allocation after a level load,
+    then kept exact by object writes, deletes and list mutations.
+    """
+    
+    build_on_load = False
+    
+    def __init__(self, pools: dict[IDTypes, IDPool]):
+        tid = obj_id.Trigger
+        counters = frozenset({tid.PICKUP, tid.COUNT, tid.INSTANT_COUNT})
+        collisions = frozenset({tid.COLLISION, tid.COLLISION_BLOCK})
+        self._tracked: dict[str, tuple[IDPool, frozenset[int] | None]] = {
+            obj_prop.COLOR_1: (pools["color"], None),
+            obj_prop.COLOR_2: (pools["color"], None),
+            obj_prop.Trigger.Color.COPY_ID: (pools["color"], None),
+            obj_prop.GROUPS: (pools["group"], None),
+            obj_prop.Trigger.Count.ITEM_ID: (pools["item"], counters),
+            obj_prop.Trigger.Collision.BLOCK_A: (pools["collision"], collisions),
+            obj_prop.Trigger.Collision.BLOCK_B: (pools["collision"], collisions),
+        }
+        """key -> (pool, object IDs the key counts for, None for all)"""
+        self.keys = frozenset(self._tracked)
+        self._pools = list(pools.values())
+    
+    def _ids(self, obj: ObjectType, key: str, value: Any) -> Iterable[int]:
+        only = self._tracked[key][1]
+        if value is None or (only is not None and obj.get(obj_prop.ID) not in only):
+            return ()
+        return value if key == obj_prop.GROUPS else (value,)
+    
+    def add(self, obj: ObjectType) -> None:
+        for key, (pool, _) in self._tracked.items():
+            for id in self._ids(obj, key, obj.get(key)):
+                pool.ref(id)
+    
+    def discard(self, obj: ObjectType) -> None:
+        for key, (pool, _) in self._tracked.items():
+            for id in self._ids(obj, key, obj.get(key)):
+                pool.unref(id)
+    
+    def changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None:
+        pool = self._tracked[key][0]
+        for id in self._ids(obj, key, old):
+            pool.unref(id)
+        for id in self._ids(obj, key, new):
+            pool.ref(id)
+    
+    def clear(self) -> None:
+        for pool in self._pools:
+            pool.clear_refs()
+
+
 class IDAllocator:
-    """Class to manage unique ID allocation. Instance is 'new'."""
+    """
+    Class to manage unique ID allocation. Instance is 'new'.
     
-    def __init__(self, objects: list[ObjectType]):
+    For an ObjectList, IDs used by its objects are reference counted through an IDUsageIndex,
+    so edits and deletes free IDs as soon as no object uses them.
+    Other lists only register objects when they are added.
+    """
+    
+    def __init__(self, objects: Sequence[ObjectType]):
         self._initialized = False
+        self._unscanned: Sequence[ObjectType] | None = None
+        """Level objects not yet registered, scanned on first use so loading doesn't decode them"""
         
-        self.used_group_ids: set[int] = set()
-        self.used_item_ids: set[int] = set()
-        self.used_color_ids: set[int] = set()
-        self.used_collision_ids: set[int] = set()
-        
-        self._group_counter: int = 0
-        self._item_counter: int = 0
-        self._color_counter: int = 0
-        self._collision_counter: int = 0
+        self._pools: dict[IDTypes, IDPool] = {name: IDPool(name) for name in get_args(IDTypes)}
+        self._group_pool = self._pools["group"]
+        self._item_pool = self._pools["item"]
+        self._color_pool = self._pools["color"]
+        self._collision_pool = self._pools["collision"]
         
-        self._group_frontier: int = 1
-        self._item_frontier: int = 1
-        self._color_frontier: int = 1
-        self._collision_frontier: int = 1
+        from .object import ObjectList
+        self._objects = objects
+        self._usage: IDUsageIndex | None = None
+        if isinstance(objects, ObjectList):
+            self._usage = IDUsageIndex(self._pools)
+            objects.add_index(self._usage)
+        else:
+            objects._id_allocator = self # type: ignore[attr-defined]
+    
+    def _scan(self) -> None:
+        if self._usage is not None:
+            self._objects._refresh(self._usage) # type: ignore[attr-defined]
+        elif self._unscanned is not None:
+            objects, self._unscanned = self._unscanned, None
+            for obj in objects:
+                self.register_object(obj)
+    
+    def _pool(self, id_type: IDTypes) -> IDPool:
+        self._scan()
+        try:
+            return self._pools[id_type]
+        except KeyError:
+            raise ValueError(f"Unknown ID type: {id_type}") from None
+    
+    @property
+    def used_group_ids(self) -> frozenset[int]:
+        """Group IDs currently in use or handed out, as a snapshot. Use reserve_id/release to change them."""
+        return frozenset(self._pool("group").used_ids())
+    
+    @property
+    def used_item_ids(self) -> frozenset[int]:
+        return frozenset(self._pool("item").used_ids())
+    
+    @property
+    def used_color_ids(self) -> frozenset[int]:
+        return frozenset(self._pool("color").used_ids())
+    
+    @property
+    def used_collision_ids(self) -> frozenset[int]:
+        return frozenset(self._pool("collision").used_ids())
     
     def reserve_id(self, id_type: IDTypes, id_values: int|Iterable[int]):
         """Manually reserve IDs to exclude them from allocation."""
-        
-        ids = {id_values} if isinstance(id_values, int) else set(id_values)
-        
-        if id_type == "group":
-            self.used_group_ids.update(ids)
-        elif id_type == "item":
-            self.used_item_ids.update(ids)
-        elif id_type == "color":
-            self.used_color_ids.update(ids)
-        elif id_type == "collision":
-            self.used_collision_ids.update(ids)
-        else:
-            raise ValueError(f"Unknown ID type: {id_type}")
+        pool = self._pool(id_type)
+        for id in ((id_values,) if isinstance(id_values, int) else id_values):
+            pool.mark_used(id)
+    
+    def release(self, id_type: IDTypes, id_values: int|Iterable[int]):
+        """Return IDs to the free pool so they can be handed out again."""
+        pool = self._pool(id_type)
+        for id in ((id_values,) if isinstance(id_values, int) else id_values):
+            pool.release(id)
     
     def register_object(self, obj: ObjectType) -> None:
+        """Count obj's IDs as used. ObjectLists do this automatically through their IDUsageIndex."""
         id = obj[obj_prop.ID]
         tid = obj_id.Trigger
+        colors = self._color_pool
         
         if (key := obj_prop.COLOR_1) in obj:
-            self.used_color_ids.add(obj[key])
+            colors.ref(obj[key])
         if (key := obj_prop.COLOR_2) in obj:
-            self.used_color_ids.add(obj[key])
+            colors.ref(obj[key])
         if (key := obj_prop.Trigger.Color.COPY_ID) in obj:
-            self.used_color_ids.add(obj[key])
+            colors.ref(obj[key])
         
         if (key := obj_prop.GROUPS) in obj:
-            self.used_group_ids.update(obj[key])
+            for g in obj[key]:
+                self._group_pool.ref(g)
         
         if id in (tid.PICKUP, tid.COUNT, tid.INSTANT_COUNT):
             if (key := obj_prop.Trigger.Count.ITEM_ID) in obj:
-                self.used_item_ids.add(obj[key])
+                self._item_pool.ref(obj[key])
         
         if id in (tid.COLLISION, tid.COLLISION_BLOCK):
             if (key := obj_prop.Trigger.Collision.BLOCK_A) in obj:
-                self.used_collision_ids.add(obj[key])
+                self._collision_pool.ref(obj[key])
             if (key := obj_prop.Trigger.Collision.BLOCK_B) in obj:
-                self.used_collision_ids.add(obj[key])
+                self._collision_pool.ref(obj[key])
     
-    def register_free_ids_for_level(self, object_list: list[ObjectType]) -> None:
-        """Runs automatically at level load."""
+    def register_free_ids_for_level(self, object_list: Sequence[ObjectType]) -> None:
+        """Runs automatically at level load. The objects are scanned on the first allocation or used_*_ids read."""
         if self._initialized:
             raise RuntimeError("IDAllocator is already initialized. register_free_ids_for_level() should only be called once at level load.")
         self._initialized = True
@@ -96,32 +389,68 @@ class IDAllocator:
         if len(object_list) == 0:
             raise RuntimeError("Objects not found. Load a level first with from_file() or from_live_editor()")
         
-        for obj in object_list:
-            self.register_object(obj)
+        if self._usage is None:
+            self._unscanned = list(object_list)
+    
+    def _usage_refs(self) -> dict[IDTypes, bytes] | None:
+        """Reference counts of the level's objects per pool, for level snapshots. None if they aren't tracked by an IDUsageIndex."""
+        if self._usage is None:
+            return None
+        self._scan()
+        return {name: pool.refs_bytes() for name, pool in self._pools.items()}
+    
+    def _load_usage_refs(self, refs: dict[IDTypes, bytes]) -> None:
+        """Counterpart of _usage_refs, for a level loaded from a snapshot. The objects are not scanned."""
+        if self._usage is None:
+            return
+        for name, data in refs.items():
+            self._pools[name].load_refs(data)
+        self._objects._adopt(self._usage) # type: ignore[attr-defined]
+        self._unscanned = None
+    
+    def snapshot(self) -> "IDSnapshot":
+        """Capture allocation state, e.g. before a speculative generation pass that may be rolled back."""
+        self._scan()
+        return IDSnapshot({name: pool.snapshot() for name, pool in self._pools.items()})
+    
+    def restore(self, snapshot: "IDSnapshot") -> None:
+        """Roll allocation state back to a snapshot. IDs handed out since are free again."""
+        self._scan()
+        for name, state in snapshot.pools.items():
+            self._pools[name].restore(state)
+    
+    def block(self, id_type: IDTypes, count: int, *, policy: BlockPolicy = "first", align: int = 1) -> tuple[NamedInt, ...]:
+        """
+        count consecutive free IDs of id_type, starting at a multiple of align.
+        policy "first" takes the lowest run that fits; "best" takes the smallest run that fits, leaving large runs for large blocks.
+        Release a block with release(id_type, block).
+        """
+        return self._pool(id_type).block(count, policy, align)
+    
+    def group_block(self, count: int, *, policy: BlockPolicy = "first", align: int = 1) -> tuple[NamedInt, ...]:
+        """count consecutive free group IDs."""
+        return self.block("group", count, policy=policy, align=align)
+    
+    def item_block(self, count: int, *, policy: BlockPolicy = "first", align: int = 1) -> tuple[NamedInt, ...]:
+        """count consecutive free item IDs."""
+        return self.block("item", count, policy=policy, align=align)
+    
+    def color_block(self, count: int, *, policy: BlockPolicy = "first", align: int = 1) -> tuple[NamedInt, ...]:
+        """count consecutive free color channel IDs."""
+        return self.block("color", count, policy=policy, align=align)
+    
+    def collision_block(self, count: int, *, policy: BlockPolicy = "first", align: int = 1) -> tuple[NamedInt, ...]:
+        """count consecutive free collision block IDs."""
+        return self.block("collision", count, policy=policy, align=align)
+    
+    def stats(self) -> dict[IDTypes, IDPoolStats]:
+        """Per-pool usage and fragmentation, e.g. to see how close a level is to the 9999 ceiling."""
+        self._scan()
+        return {name: pool.stats() for name, pool in self._pools.items()}
     
     def _get_next(self, pool_name: IDTypes) -> NamedInt:
-        """Get next free ID by scanning forward from frontier. O(k) where k = skipped reserved IDs."""
-        
-        used_set: set[int] = getattr(self, f"used_{pool_name}_ids")
-        frontier: int = getattr(self, f"_{pool_name}_frontier")
-        
-        # Scan forward from frontier to find the next ID not already in use
-        candidate = frontier
-        while candidate <= 9999:
-            if candidate not in used_set:
-                break
-            candidate += 1
-        else:
-            raise RuntimeError(f"No free {pool_name} IDs available (1-9999 range exhausted)")
-        
-        used_set.add(candidate)
-        # Update frontier to next candidate for next call
-        setattr(self, f"_{pool_name}_frontier", candidate + 1)
-        
-        counter: int = getattr(self, f"_{pool_name}_counter") + 1
-        setattr(self, f"_{pool_name}_counter", counter)
-
-        return NamedInt(candidate, f"new_{pool_name}_{counter}")
+        """Get next free ID. Amortised O(1), see IDPool."""
+        return self._pool(pool_name).next_free()
     
     
     @overload
@@ -205,3 +534,8 @@ class IDAllocator:
             return self._get_next("collision")
         return tuple(self._get_next("collision") for _ in range(count))
 
+
+@dataclass(frozen=True)
+class IDSnapshot:
+    """Allocation state captured by IDAllocator.snapshot()."""
+    pools: dict[IDTypes, tuple[bytes, int, int]]
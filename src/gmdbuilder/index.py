@@ -0,0 +1,600 @@
+"""Incrementally maintained lookup indexes over an ObjectList."""
+
+import heapq
+import itertools
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Iterator, Mapping
+
+from .fields import TARGET_GROUP_FIELDS
+from .mappings import obj_prop
+from .object_types import ObjectType
+
+
+class ObjectIndex(ABC):
+    """
+    Base class for ObjectList indexes.
+
+    The owning ObjectList calls add/discard as objects enter and leave the list,
+    and changed() when a watched key is written on an object in the list.
+    Objects are tracked by identity, so indexes return the same dicts stored in the list.
+    """
+
+    keys: frozenset[str] = frozenset()
+    """Property keys whose writes this index needs to see."""
+
+    build_on_load: bool = True
+    """False to build on the first query after a level load instead, leaving loaded objects undecoded until then."""
+
+    @abstractmethod
+    def add(self, obj: ObjectType) -> None: ...
+
+    @abstractmethod
+    def discard(self, obj: ObjectType) -> None: ...
+
+    @abstractmethod
+    def changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def rebuild(self, objects: Iterable[ObjectType]) -> None:
+        """Bulk-build from scratch. Used after a level load."""
+        self.clear()
+        for obj in objects:
+            self.add(obj)
+
+
+Bucket = dict[int, ObjectType]
+"""id(obj) -> obj, in the order objects joined the bucket"""
+
+
+class GroupIndex(ObjectIndex):
+    """Group ID -> objects in that group (a57), and group ID -> its parent objects (a274)."""
+
+    keys = frozenset({obj_prop.GROUPS, obj_prop.PARENT_GROUPS})
+    build_on_load = False
+
+    def __init__(self):
+        self._members: dict[int, Bucket] = {}
+        self._parents: dict[int, Bucket] = {}
+
+    @staticmethod
+    def _link(table: dict[int, Bucket], obj: ObjectType, groups: Iterable[int] | None) -> None:
+        if groups:
+            oid = id(obj)
+            for g in groups:
+                bucket = table.get(g)
+                if bucket is None:
+                    table[g] = {oid: obj}
+                else:
+                    bucket[oid] = obj
+
+    @staticmethod
+    def _unlink(table: dict[int, Bucket], obj: ObjectType, groups: Iterable[int] | None) -> None:
+        if groups:
+            oid = id(obj)
+            for g in groups:
+                bucket = table.get(g)
+                if bucket is not None:
+                    bucket.pop(oid, None)
+                    if not bucket:
+                        del table[g]
+
+    def _table(self, key: str) -> dict[int, Bucket]:
+        return self._members if key == obj_prop.GROUPS else self._parents
+
+    def add(self, obj: ObjectType) -> None:
+        self._link(self._members, obj, obj.get(obj_prop.GROUPS))
+        self._link(self._parents, obj, obj.get(obj_prop.PARENT_GROUPS))
+
+    def discard(self, obj: ObjectType) -> None:
+        self._unlink(self._members, obj, obj.get(obj_prop.GROUPS))
+        self._unlink(self._parents, obj, obj.get(obj_prop.PARENT_GROUPS))
+
+    def changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None:
+        table = self._table(key)
+        self._unlink(table, obj, old)
+        self._link(table, obj, new)
+
+    def clear(self) -> None:
+        self._members.clear()
+        self._parents.clear()
+
+    def members(self, group: int) -> list[ObjectType]:
+        bucket = self._members.get(group)
+        return list(bucket.values()) if bucket else []
+
+    def parents(self, group: int) -> list[ObjectType]:
+        bucket = self._parents.get(group)
+        return list(bucket.values()) if bucket else []
+
+    def count(self, group: int) -> int:
+        bucket = self._members.get(group)
+        return len(bucket) if bucket else 0
+
+    def groups(self) -> set[int]:
+        """All group IDs with at least one member."""
+        return set(self._members)
+
+
+def _object_id(obj: ObjectType) -> int:
+    """obj's ID (a1). Read from its source text while it has one, so LazyObjects aren't decoded."""
+    raw: str | None = getattr(obj, "_raw", None)
+    if raw is not None and raw.startswith("1,"):
+        end = raw.find(",", 2)
+        return int(raw[2:] if end == -1 else raw[2:end])
+    return obj[obj_prop.ID]
+
+
+class ObjectIDIndex(ObjectIndex):
+    """Object ID (a1) -> objects with that ID. IDs can't change after creation, so no keys are watched."""
+
+    build_on_load = False
+
+    def __init__(self):
+        self._by_id: dict[int, Bucket] = {}
+
+    def add(self, obj: ObjectType) -> None:
+        object_id = _object_id(obj)
+        bucket = self._by_id.get(object_id)
+        if bucket is None:
+            self._by_id[object_id] = {id(obj): obj}
+        else:
+            bucket[id(obj)] = obj
+
+    def discard(self, obj: ObjectType) -> None:
+        object_id = _object_id(obj)
+        bucket = self._by_id.get(object_id)
+        if bucket is not None:
+            bucket.pop(id(obj), None)
+            if not bucket:
+                del self._by_id[object_id]
+
+    def changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None:
+        pass
+
+    def clear(self) -> None:
+        self._by_id.clear()
+
+    def members(self, object_id: int) -> list[ObjectType]:
+        bucket = self._by_id.get(object_id)
+        return list(bucket.values()) if bucket else []
+
+    def count(self, object_id: int) -> int:
+        bucket = self._by_id.get(object_id)
+        return len(bucket) if bucket else 0
+
+    def ids(self) -> set[int]:
+        """All object IDs with at least one object."""
+        return set(self._by_id)
+
+
+Cell = tuple[int, int]
+
+
+class SpatialIndex(ObjectIndex):
+    """
+    Uniform grid over object X/Y (a2/a3) for rectangle, radius and nearest-neighbour queries.
+    
+    cell_size is in GD units (30 per block). Objects without a position count as (0, 0).
+    Query results are in no particular order.
+    """
+
+    keys = frozenset({obj_prop.X, obj_prop.Y})
+
+    def __init__(self, cell_size: float = 150.0):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self._cells: dict[Cell, Bucket] = {}
+        self._cell_of: dict[int, Cell] = {}
+        """id(obj) -> cell it is stored in"""
+
+    def _cell(self, x: float, y: float) -> Cell:
+        size = self.cell_size
+        return (math.floor(x / size), math.floor(y / size))
+
+    def add(self, obj: ObjectType) -> None:
+        cell = self._cell(obj.get(obj_prop.X, 0.0), obj.get(obj_prop.Y, 0.0))
+        oid = id(obj)
+        self._cell_of[oid] = cell
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            self._cells[cell] = {oid: obj}
+        else:
+            bucket[oid] = obj
+
+    def discard(self, obj: ObjectType) -> None:
+        cell = self._cell_of.pop(id(obj), None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[id(obj)]
+        if not bucket:
+            del self._cells[cell]
+
+    def changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None:
+        cell = self._cell(obj.get(obj_prop.X, 0.0), obj.get(obj_prop.Y, 0.0))
+        if self._cell_of.get(id(obj)) != cell:
+            self.discard(obj)
+            self.add(obj)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._cell_of.clear()
+
+    def rebuild(self, objects: Iterable[ObjectType]) -> None:
+        self.clear()
+        size = self.cell_size
+        floor = math.floor
+        cells = self._cells
+        cell_of = self._cell_of
+        for obj in objects:
+            cell = (floor(obj.get(obj_prop.X, 0.0) / size), floor(obj.get(obj_prop.Y, 0.0) / size))
+            oid = id(obj)
+            cell_of[oid] = cell
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = {oid: obj}
+            else:
+                bucket[oid] = obj
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _buckets_in(self, x1: float, y1: float, x2: float, y2: float) -> Iterator[Bucket]:
+        size = self.cell_size
+        # Infinite bounds stay infinite, so only occupied cells are looked at
+        cx1, cy1, cx2, cy2 = (math.floor(v / size) if math.isfinite(v) else v for v in (x1, y1, x2, y2))
+        if cx1 == math.inf or cy1 == math.inf or cx2 == -math.inf or cy2 == -math.inf:
+            # Both bounds at the same infinity: no cell lies there, and the span would be NaN
+            return
+        cells = self._cells
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(cells):
+            # Rectangle covers more cells than are occupied
+            for (cx, cy), bucket in cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    yield bucket
+            return
+        for cx in range(int(cx1), int(cx2) + 1):
+            for cy in range(int(cy1), int(cy2) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    yield bucket
+
+    def in_rect(self, x1: float, y1: float, x2: float, y2: float) -> list[ObjectType]:
+        """Objects with x1 <= X <= x2 and y1 <= Y <= y2 (corners in any order). Bounds may be infinite."""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        return [
+            obj
+            for bucket in self._buckets_in(x1, y1, x2, y2)
+            for obj in bucket.values()
+            if x1 <= obj.get(obj_prop.X, 0.0) <= x2 and y1 <= obj.get(obj_prop.Y, 0.0) <= y2
+        ]
+
+    def count_in_cells(self, x1: float, y1: float, x2: float, y2: float) -> int:
+        """Objects in the cells the rectangle overlaps: an upper bound on len(in_rect()), without reading positions."""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        return sum(map(len, self._buckets_in(x1, y1, x2, y2)))
+
+    def in_radius(self, x: float, y: float, radius: float) -> list[ObjectType]:
+        """Objects within radius of (x, y), inclusive."""
+        r2 = radius * radius
+        return [
+            obj
+            for bucket in self._buckets_in(x - radius, y - radius, x + radius, y + radius)
+            for obj in bucket.values()
+            if (obj.get(obj_prop.X, 0.0) - x) ** 2 + (obj.get(obj_prop.Y, 0.0) - y) ** 2 <= r2
+        ]
+
+    def nearest(self, x: float, y: float, k: int = 1, max_distance: float = math.inf) -> list[ObjectType]:
+        """
+        Up to k objects closest to (x, y), nearest first, no further than max_distance.
+        Searches outward ring by ring of cells, so cost depends on local density, not level size.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        cx, cy = self._cell(x, y)
+        cells = self._cells
+        found: list[tuple[float, int, ObjectType]] = []
+        seen = 0
+        ring = 0
+        while seen < len(self._cell_of):
+            # Anything outside the rings searched so far is at least (ring - 1) cells away
+            reach = max(ring - 1, 0) * self.cell_size
+            if reach > max_distance or (len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= reach * reach):
+                break
+            if (2 * ring + 1) ** 2 > len(cells):
+                # Rings now cover more cells than are occupied, take every remaining cell
+                for (ox, oy), bucket in cells.items():
+                    if max(abs(ox - cx), abs(oy - cy)) >= ring:
+                        for oid, obj in bucket.items():
+                            d2 = (obj.get(obj_prop.X, 0.0) - x) ** 2 + (obj.get(obj_prop.Y, 0.0) - y) ** 2
+                            found.append((d2, oid, obj))
+                break
+            if ring == 0:
+                ring_cells: Iterable[Cell] = ((cx, cy),)
+            else:
+                ring_cells = itertools.chain(
+                    ((cx + dx, cy - ring) for dx in range(-ring, ring + 1)),
+                    ((cx + dx, cy + ring) for dx in range(-ring, ring + 1)),
+                    ((cx - ring, cy + dy) for dy in range(-ring + 1, ring)),
+                    ((cx + ring, cy + dy) for dy in range(-ring + 1, ring)),
+                )
+            for cell in ring_cells:
+                bucket = cells.get(cell)
+                if bucket is None:
+                    continue
+                seen += len(bucket)
+                for oid, obj in bucket.items():
+                    d2 = (obj.get(obj_prop.X, 0.0) - x) ** 2 + (obj.get(obj_prop.Y, 0.0) - y) ** 2
+                    found.append((d2, oid, obj))
+            ring += 1
+        
+        limit = max_distance * max_distance
+        return [obj for d2, _, obj in heapq.nsmallest(k, found) if d2 <= limit]
+
+
+def strongly_connected(successors: Mapping[int, Iterable[int]]) -> list[list[int]]:
+    """
+    Strongly connected components of a directed graph, as lists of nodes, in reverse topological order.
+    Tarjan's algorithm, iterative so deep chains don't hit the recursion limit. O(nodes + edges).
+    """
+    order: dict[int, int] = {}
+    low: dict[int, int] = {}
+    stack: list[int] = []
+    on_stack: set[int] = set()
+    components: list[list[int]] = []
+    for root in successors:
+        if root in order:
+            continue
+        order[root] = low[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in order:
+                    order[child] = low[child] = len(order)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    break
+                if child in on_stack and order[child] < low[node]:
+                    low[node] = order[child]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component: list[int] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+_TARGET_KEYS = tuple(sorted(TARGET_GROUP_FIELDS))
+
+
+def raw_props(obj: ObjectType) -> dict[str, str] | None:
+    """
+    Raw key -> value tokens of a LazyObject that hasn't been decoded yet, read from its source text
+    so it stays undecoded. None for decoded objects and for objects with remaps, which are left to the decoder.
+    """
+    raw: str | None = getattr(obj, "_raw", None)
+    if raw is None:
+        return None
+    tokens = raw.split(",")
+    props = dict(zip(tokens[::2], tokens[1::2]))
+    return None if "442" in props else props
+
+
+_RAW_TARGET_KEYS = tuple(key[1:] for key in _TARGET_KEYS)
+
+_Links = tuple[tuple[int, ...], tuple[int, ...], tuple[int, ...]]
+"""(groups, edge sources, targets) of one object"""
+
+
+class TriggerGraph(ObjectIndex):
+    """
+    Which groups activate which: an edge source -> target for every trigger in group source that targets group target,
+    through TARGET_GROUP_FIELDS or a Spawn trigger's remaps (the groups spawned triggers end up targeting).
+
+    Only spawn-triggered triggers are activated through their groups. Every other trigger is activated by the player,
+    and its edges start from the ENTRY node instead. Membership of every object is counted too, for missing_targets().
+    """
+
+    ENTRY = 0
+    """Source node of edges from triggers the player activates. Not a valid group ID."""
+
+    keys = frozenset({obj_prop.GROUPS, obj_prop.Trigger.SPAWN_TRIGGER, obj_prop.Trigger.Spawn.REMAPS, *TARGET_GROUP_FIELDS})
+    build_on_load = False
+
+    def __init__(self):
+        self._links: dict[int, _Links] = {}
+        """id(obj) -> what obj contributed, for objects in a group or with targets"""
+        self._size: dict[int, int] = {}
+        """Group -> objects in it"""
+        self._out: dict[int, dict[int, Bucket]] = {}
+        """Source -> target -> triggers making that edge"""
+        self._in: dict[int, Bucket] = {}
+        """Target -> triggers targeting it"""
+
+    @staticmethod
+    def _links_of(obj: ObjectType) -> _Links | None:
+        if (props := raw_props(obj)) is not None:
+            try:
+                targets = [t for key in _RAW_TARGET_KEYS if (t := int(props.get(key, 0)))]
+                groups = tuple({*map(int, props["57"].split("."))}) if props.get("57") else ()
+            except ValueError:
+                pass
+            else:
+                return TriggerGraph._link_tuple(groups, targets, props.get("62", "0") != "0")
+        targets = [t for key in _TARGET_KEYS if (t := obj.get(key))]
+        if remaps := obj.get(obj_prop.Trigger.Spawn.REMAPS):
+            targets.extend(t for t in remaps.values() if t)
+        groups = obj.get(obj_prop.GROUPS)
+        return TriggerGraph._link_tuple(tuple(groups) if groups else (), targets, bool(obj.get(obj_prop.Trigger.SPAWN_TRIGGER)))
+
+    @staticmethod
+    def _link_tuple(groups: tuple[int, ...], targets: list[int], spawn_triggered: bool) -> _Links | None:
+        if not targets and not groups:
+            return None
+        if not targets:
+            return groups, (), ()
+        return groups, groups if spawn_triggered else (TriggerGraph.ENTRY,), tuple(set(targets))
+
+    def add(self, obj: ObjectType) -> None:
+        links = self._links_of(obj)
+        if links is None:
+            return
+        oid = id(obj)
+        self._links[oid] = links
+        groups, sources, targets = links
+        size = self._size
+        for g in groups:
+            size[g] = size.get(g, 0) + 1
+        for t in targets:
+            bucket = self._in.get(t)
+            if bucket is None:
+                self._in[t] = {oid: obj}
+            else:
+                bucket[oid] = obj
+        for s in sources:
+            edges = self._out.get(s)
+            if edges is None:
+                edges = self._out[s] = {}
+            for t in targets:
+                bucket = edges.get(t)
+                if bucket is None:
+                    edges[t] = {oid: obj}
+                else:
+                    bucket[oid] = obj
+
+    def discard(self, obj: ObjectType) -> None:
+        links = self._links.pop(id(obj), None)
+        if links is None:
+            return
+        oid = id(obj)
+        groups, sources, targets = links
+        size = self._size
+        for g in groups:
+            if size[g] == 1:
+                del size[g]
+            else:
+                size[g] -= 1
+        for t in targets:
+            bucket = self._in[t]
+            del bucket[oid]
+            if not bucket:
+                del self._in[t]
+        for s in sources:
+            edges = self._out[s]
+            for t in targets:
+                bucket = edges[t]
+                del bucket[oid]
+                if not bucket:
+                    del edges[t]
+            if not edges:
+                del self._out[s]
+
+    def changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None:
+        # What obj contributed is stored, so it can be unlinked and relinked from its current state
+        self.discard(obj)
+        self.add(obj)
+
+    def clear(self) -> None:
+        self._links.clear()
+        self._size.clear()
+        self._out.clear()
+        self._in.clear()
+
+    # -- queries -------------------------------------------------------------
+
+    def groups(self) -> set[int]:
+        """All group IDs with at least one member."""
+        return set(self._size)
+
+    def targets(self, group: int) -> set[int]:
+        """Groups targeted by triggers group activates. targets(TriggerGraph.ENTRY) for those of player-activated triggers."""
+        return set(self._out.get(group, ()))
+
+    def sources(self, group: int) -> set[int]:
+        """Groups whose triggers target group, ENTRY included if a player-activated trigger does."""
+        return {s for s, edges in self._out.items() if group in edges}
+
+    def triggers(self, source: int, target: int) -> list[ObjectType]:
+        """Triggers making the edge source -> target."""
+        bucket = self._out.get(source, {}).get(target)
+        return list(bucket.values()) if bucket else []
+
+    def activators(self, group: int) -> list[ObjectType]:
+        """Every trigger targeting group."""
+        bucket = self._in.get(group)
+        return list(bucket.values()) if bucket else []
+
+    def activator_count(self, group: int) -> int:
+        """Number of triggers targeting group."""
+        return len(self._in.get(group, ()))
+
+    def edges(self) -> Iterator[tuple[int, int, list[ObjectType]]]:
+        """(source, target, triggers) of every edge."""
+        for source, edges in self._out.items():
+            for target, bucket in edges.items():
+                yield source, target, list(bucket.values())
+
+    def reachable(self, start: int | Iterable[int] | None = None) -> set[int]:
+        """Groups reached by following edges from start, start included. From the player-activated triggers by default."""
+        if start is None:
+            frontier = [self.ENTRY]
+        elif isinstance(start, int):
+            frontier = [start]
+        else:
+            frontier = list(start)
+        seen = set(frontier)
+        out = self._out
+        while frontier:
+            for t in out.get(frontier.pop(), ()):
+                if t not in seen:
+                    seen.add(t)
+                    frontier.append(t)
+        if start is None:
+            seen.discard(self.ENTRY)
+        return seen
+
+    def cycles(self) -> list[list[int]]:
+        """Groups that can activate each other in a loop, one sorted list per loop. A group targeting itself is a loop too."""
+        out = self._out
+        return [
+            sorted(component)
+            for component in strongly_connected(out)
+            if len(component) > 1 or component[0] in out.get(component[0], ())
+        ]
+
+    def missing_targets(self) -> set[int]:
+        """Groups targeted by some trigger that no object is in."""
+        return {t for t in self._in if t not in self._size}
+
+    def dead_groups(self) -> set[int]:
+        """
+        Groups whose spawn-triggered triggers never run: nothing the player activates reaches the group,
+        or any other group those triggers are in.
+        """
+        reached = self.reachable()
+        links = self._links
+        return {
+            source
+            for source, edges in self._out.items()
+            if source != self.ENTRY and source not in reached
+            and all(reached.isdisjoint(links[oid][0]) for bucket in edges.values() for oid in bucket)
+        }
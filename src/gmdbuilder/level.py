@@ -1,19 +1,29 @@
 """Level loading and exporting for Geometry Dash."""
 
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
+from itertools import batched, chain, repeat
 import time
-from typing import Any, cast
+from typing import Any, Iterable, Iterator, Sequence, cast
 from pathlib import Path
 
 from gmdkit.extra.live_editor import WEBSOCKET_URL, LiveEditor
 from gmdkit.models.level import Level as KitLevel
 from gmdkit.models.object import ObjectList as KitObjectList, Object as KitObject
 from gmdkit.models.prop.color import ColorList as KitColorList
+from gmdkit.models.prop.gzip import ObjectString
 
+from .cache import LevelCache, LevelSnapshot, source_key
 from .id import IDAllocator
-from .mappings import obj_prop
-from .object import ObjectList, ValidatedObject
-from .fields import SPECIAL_KEYS
+from .live import LiveSession, LiveSync, SyncResult
+from .mappings import obj_prop, lvl_prop
+from .object import LazyObject, ObjectList, ValidatedObject
+from .readonly import ReadOnlyLevel
+from .columnar import ColumnarObjectList
+from .fields import SPECIAL_KEYS, UNHASHABLE_VALUE_KEYS
+from .stream import compress_pieces, iter_decompressed, split_pieces
+from .index import TriggerGraph
+from .validation import setting, validate_deferred, validate_spawn_limit
 from .color import Color, KitColor
 from .object_types import ObjectType
 
@@ -36,6 +46,9 @@ def _to_raw_key_cached(key: str) -> int | str:
     raise ValueError()
 
 def to_kit_object(obj: ObjectType) -> KitObject:
+    if type(obj) is LazyObject:
+        # Never decoded, so unchanged since load
+        return KitObject.from_string(cast(str, obj._raw)) # pyright: ignore[reportPrivateUsage]
     raw: dict[int|str, Any] = {}
     for k, v in obj.items():
         if s := SPECIAL_KEYS.get(k):
@@ -48,6 +61,56 @@ def to_kit_object(obj: ObjectType) -> KitObject:
     return KitObject(raw)
 
 
+def _to_object_string(obj: ObjectType) -> str:
+    """
+    Serialize one object for the level string, ';'-terminated. Objects unmodified since load are written as loaded.
+    
+    Decoded objects holding mutable values (groups, remaps, ...) are always re-encoded, 
+    since in-place edits like obj['a57'].add(5) can't be tracked.
+    """
+    raw = _reusable_raw(obj)
+    if raw is not None:
+        return raw + ";"
+    return to_kit_object(obj).to_string()
+
+
+def _reusable_raw(obj: ObjectType) -> str | None:
+    raw: str | None = getattr(obj, "_raw", None)
+    if raw is not None and (type(obj) is LazyObject or UNHASHABLE_VALUE_KEYS.isdisjoint(obj)):
+        return raw
+    return None
+
+
+def _encode_shard(payloads: Sequence[dict[str, Any]]) -> list[str]:
+    """Worker side of _join_object_strings_parallel."""
+    return [to_kit_object(payload).to_string() for payload in payloads]
+
+
+def _object_strings_parallel(objects: Iterable[ObjectType], workers: int) -> Iterator[str]:
+    """
+    map(_to_object_string, objects), with the objects that need encoding encoded across a pool of worker processes.
+    Objects are sent as plain dicts with sets as lists in iteration order, so each encodes exactly as it would serially.
+    """
+    parts: list[str | None] = []
+    pending: list[dict[str, Any]] = []
+    for obj in objects:
+        raw = _reusable_raw(obj)
+        if raw is not None:
+            parts.append(raw + ";")
+        else:
+            parts.append(None)
+            pending.append({k: list(v) if type(v) is set else v for k, v in obj.items()})
+    if not pending:
+        yield from cast(list[str], parts)
+        return
+    
+    shards = list(batched(pending, max(1, -(-len(pending) // (workers * 4)))))
+    with ProcessPoolExecutor(workers) as pool:
+        encoded = chain.from_iterable(pool.map(_encode_shard, shards))
+        for part in parts:
+            yield part if part is not None else next(encoded)
+
+
 @lru_cache(maxsize=1024)
 def _from_raw_key_cached(key: int|str) -> str:
     if isinstance(key, int):
@@ -73,16 +136,136 @@ def from_kit_object(obj: dict[int|str, Any]) -> ObjectType:
     return cast(ObjectType, new)
 
 
+def decode_object_string(string: str) -> ObjectType:
+    """Decode one raw object string ("1,1,2,15,...") into a ValidatedObject."""
+    return from_kit_object(KitObject.from_tokens(string.split(",")))
+
+
+def _has_raw_group(tokens: list[str], group: str) -> bool:
+    """Check an object's raw key/value tokens for a group, without decoding the object."""
+    i = -1
+    while True:
+        try:
+            i = tokens.index("57", i + 1)
+        except ValueError:
+            return False
+        if i % 2 == 0:
+            return i + 1 < len(tokens) and group in tokens[i + 1].split(".")
+
+
+def _decode_object_strings(chunks: Iterable[str], tag_group: int, lazy: bool = False) -> Iterator[ObjectType | None]:
+    """
+    Decode raw object strings straight into ValidatedObjects. Objects carrying tag_group are skipped (yields None) before decoding.
+    With lazy=True, yields LazyObjects that decode on first access instead.
+    """
+    tag = str(tag_group)
+    for chunk in chunks:
+        if lazy:
+            # Only objects with groups need tokenizing for the tag check
+            if (chunk.startswith("57,") or ",57," in chunk) and _has_raw_group(chunk.split(","), tag):
+                yield None
+            else:
+                yield cast(ObjectType, LazyObject(chunk))
+            continue
+        tokens = chunk.split(",")
+        if _has_raw_group(tokens, tag):
+            yield None
+        else:
+            obj = from_kit_object(KitObject.from_tokens(tokens))
+            cast(ValidatedObject, obj)._raw = chunk # pyright: ignore[reportPrivateUsage]
+            yield obj
+
+
+_SET_VALUED_KEYS = (obj_prop.GROUPS, obj_prop.PARENT_GROUPS)
+
+Payload = dict[str, Any]
+"""A decoded, validated object as a plain dict, with set values as lists in file order. None for tagged objects."""
+
+
+def _decode_shard(chunks: Sequence[str], tag_group: int) -> list[Payload | None]:
+    """
+    Decode and validate to payloads, plain dicts which pickle much smaller than ValidatedObjects.
+    Sets are kept as lists in file order, since a set rebuilt by unpickling can iterate (and so export) in a different order.
+    """
+    tag = str(tag_group)
+    payloads: list[Payload | None] = []
+    for chunk in chunks:
+        tokens = chunk.split(",")
+        if _has_raw_group(tokens, tag):
+            payloads.append(None)
+            continue
+        kit_obj = KitObject.from_tokens(tokens)
+        payload = dict(from_kit_object(kit_obj))
+        for key in _SET_VALUED_KEYS:
+            if payload.get(key):
+                payload[key] = list(kit_obj[_to_raw_key_cached(key)])
+        payloads.append(payload)
+    return payloads
+
+
+def _decode_payloads(chunks: Sequence[str], tag_group: int, workers: int | None = None) -> list[Payload | None]:
+    """Decode object strings to payloads, across a pool of worker processes if workers is more than 1."""
+    if workers is None or workers < 2:
+        return _decode_shard(chunks, tag_group)
+    shards = list(batched(chunks, max(1, -(-len(chunks) // (workers * 4)))))
+    with ProcessPoolExecutor(workers) as pool:
+        return list(chain.from_iterable(pool.map(_decode_shard, shards, repeat(tag_group))))
+
+
+def _objects_from_payloads(chunks: Iterable[str], payloads: Iterable[Payload | None]) -> Iterator[ObjectType | None]:
+    """
+    Wrap payloads from _decode_payloads into ValidatedObjects loaded from chunks, without validating again.
+    Sets are rebuilt the same way a serial load builds them, so objects and export output match decoding serially.
+    Payloads are left untouched.
+    """
+    new, update, setitem = ValidatedObject.__new__, dict.update, dict.__setitem__
+    for chunk, payload in zip(chunks, payloads):
+        if payload is None:
+            yield None
+            continue
+        # Same state ValidatedObject.__init__ sets up, without its per-object overhead
+        obj = new(ValidatedObject)
+        update(obj, payload)
+        obj._obj_id = payload[obj_prop.ID] # pyright: ignore[reportPrivateUsage]
+        obj._owner = None # pyright: ignore[reportPrivateUsage]
+        obj._raw = chunk # pyright: ignore[reportPrivateUsage]
+        for key in _SET_VALUED_KEYS:
+            if type(v := payload.get(key)) is list:
+                setitem(obj, key, set(v))
+        yield cast(ObjectType, obj)
+
+
+def _decode_kit_objects(kit_objects: Iterable[KitObject], tag_group: int) -> Iterator[ObjectType | None]:
+    """Convert already-parsed gmdkit objects, yielding None for objects carrying tag_group."""
+    for kit_obj in kit_objects:
+        if tag_group in kit_obj.get(57, ()):
+            yield None
+        else:
+            yield from_kit_object(kit_obj)
+
+
 class Level:
     """Manages level state, loading, and exporting. Use from_file() or from_live_editor() to create an instance."""
 
-    def __init__(self, tag_group: int = 9999):
-        self.objects = ObjectList(tag_group=tag_group)
-        """List of level's objects. Newly appended objects are stamped with tag_group."""
+    def __init__(self, tag_group: int = 9999, *, columnar: bool = False, spatial_index: bool = False):
+        if columnar and spatial_index:
+            raise ValueError("spatial_index is only supported on ObjectList storage, not columnar")
+        self.objects: ObjectList | ColumnarObjectList = (
+            ColumnarObjectList(tag_group=tag_group) if columnar else ObjectList(tag_group=tag_group)
+        )
+        """
+        List of level's objects. Newly appended objects are stamped with tag_group.
+        With columnar=True, objects are stored column-wise (see ColumnarObjectList).
+        With spatial_index=True, objects.spatial_index() is built in bulk during load.
+        """
+        if isinstance(self.objects, ObjectList) and spatial_index:
+            self.objects.spatial_index()
 
         self._kit_level: KitLevel | None = None
         self._source_file: Path | None = None
         self._live_editor: LiveEditor | None = None
+        self._live_session: LiveSession | None = None
+        self._live_sync: LiveSync | None = None
         self._color_dict: dict[int, KitColor] = {}
         self._color_list = KitColorList()
         
@@ -100,8 +283,20 @@ class Level:
         for c in self._color_list:
             self.color[c.channel] = Color.from_kit_color(c)
             self._color_dict[c.channel] = c
-            self.new.used_color_ids.add(c.channel)
+            self.new.reserve_id("color", c.channel)
     
+    def _check_triggers(self) -> None:
+        """Run the trigger checks turned on in setting, over the objects' trigger graph."""
+        if not setting.spawn_limit_check:
+            return
+        objects = self.objects
+        if isinstance(objects, ObjectList):
+            graph = objects.trigger_graph()
+        else:
+            graph = TriggerGraph()
+            graph.rebuild(objects)
+        validate_spawn_limit(graph)
+
     def _export_colors(self) -> None:
         for channel, color in self.color.items():
             if channel in self._color_dict:
@@ -112,17 +307,19 @@ class Level:
                 self._color_list.append(kit_col)
     
     def _load_objects(self, 
-        kit_objects: KitObjectList, 
-        obj_count: int, 
+        objects: Iterable[ObjectType | None], 
         filename: str | None = None
     ) -> None:
+        """Consume decoded objects into the ObjectList. None entries are tagged objects that were filtered out."""
+        append = self.objects._append_loaded # pyright: ignore[reportPrivateUsage]
+        obj_count = 0
+        for obj in objects:
+            obj_count += 1
+            if obj is not None:
+                append(obj)
+        self.objects._finish_load() # pyright: ignore[reportPrivateUsage]
+        
         tag_group = self.objects.tag_group
-
-        for kit_obj in kit_objects:
-            obj = from_kit_object(kit_obj)
-            groups = obj.get(obj_prop.GROUPS, {})
-            if tag_group not in groups:
-                list.append(self.objects, obj) # type: ignore
         
         self.new.register_free_ids_for_level(self.objects)
         
@@ -132,9 +329,35 @@ class Level:
               f"tag group {tag_group}, level is now {len(self.objects)} objects.")
 
     @classmethod
-    def from_file(cls, file_path: str | Path, tag_group: int = 9999) -> "Level":
-        """Load a new Level from a .gmd file."""
-        level = cls(tag_group)
+    def from_file(cls, 
+        file_path: str | Path, 
+        tag_group: int = 9999, 
+        *, 
+        columnar: bool = False, 
+        spatial_index: bool = False,
+        lazy: bool = True,
+        workers: int | None = None,
+        cache: LevelCache | bool = False
+    ) -> "Level":
+        """
+        Load a new Level from a .gmd file.
+        
+        The object string is decompressed and decoded one object at a time straight into ValidatedObjects,
+        so neither the whole decompressed string nor gmdkit's intermediate ObjectList is ever built. 
+        Tagged objects are dropped before decoding.
+        
+        columnar: store objects in a ColumnarObjectList instead of an ObjectList.
+        spatial_index: build the X/Y grid index while loading (see ObjectList.spatial_index).
+        lazy: load objects as LazyObjects that decode on first access; untouched objects are exported as loaded. 
+            Ignored with columnar.
+        workers: decode every object up front across this many worker processes, for large levels that will be fully decoded anyway.
+            Objects and export output are the same as with lazy=False. lazy is ignored when workers is more than 1.
+        cache: load from a snapshot of this file saved by an earlier run, or save one after decoding every object up front.
+            True uses a LevelCache in the default directory. Objects and export output are the same as with lazy=False.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        level = cls(tag_group, columnar=columnar, spatial_index=spatial_index)
         
         _time_since_last()
 
@@ -142,35 +365,104 @@ class Level:
         if not path.exists():
             raise FileNotFoundError(f"Level file not found: {file_path=}")
         
-        level._kit_level = KitLevel.from_file(path)
+        snapshots = LevelCache() if cache is True else cache or None
+        key = source_key(path) if snapshots is not None else None # before reading, in case the file changes meanwhile
+        
+        # Parse the plist only; the k4 object string stays compressed until we stream it below
+        level._kit_level = KitLevel.from_file(path, load_content=False)
         level._source_file = path
         
-        level._load_colors(level._kit_level.start)
+        object_string = level._kit_level.get(lvl_prop.Level.OBJECT_STRING)
+        if not isinstance(object_string, ObjectString):
+            raise RuntimeError(f"Level file has no object string: {file_path=}")
+        
+        snapshot = snapshots.load(path, tag_group, key) if snapshots is not None else None
+        
+        chunks: Iterable[str] = ()
+        if snapshot is not None:
+            start = snapshot.start
+        else:
+            pieces = split_pieces(iter_decompressed(object_string.string))
+            start = next(pieces)
+            chunks = (chunk for chunk in pieces if chunk)
         
-        obj_count = len(level._kit_level.objects)
-        level._load_objects(level._kit_level.objects, obj_count, filename=str(path))
+        # gmdkit serializes from these on export
+        object_string.start = KitObject.from_string(start)
+        object_string.objects = KitObjectList()
+        
+        level._load_colors(object_string.start)
+        
+        if snapshot is not None:
+            level._load_objects(_objects_from_payloads(snapshot.chunks, snapshot.payloads), filename=str(path))
+            if snapshot.id_refs is not None:
+                level.new._load_usage_refs(snapshot.id_refs) # pyright: ignore[reportPrivateUsage]
+            return level
+        
+        if snapshots is None and (workers is None or workers < 2):
+            level._load_objects(_decode_object_strings(chunks, tag_group, lazy=lazy and not columnar), filename=str(path))
+            return level
+        
+        chunks = list(chunks)
+        payloads = _decode_payloads(chunks, tag_group, workers)
+        level._load_objects(_objects_from_payloads(chunks, payloads), filename=str(path))
+        if snapshots is not None and key is not None:
+            refs = level.new._usage_refs() # pyright: ignore[reportPrivateUsage]
+            snapshots.store(path, tag_group, LevelSnapshot(key, start, chunks, payloads, refs))
         return level
 
+    @staticmethod
+    def open_readonly(file_path: str | Path, *, cache: LevelCache | None = None) -> ReadOnlyLevel:
+        """
+        Open a .gmd for reading only, e.g. for analysis scripts that never edit or export.
+        
+        The first open decompresses the level into an object file in cache (default: LevelCache()). 
+        Later opens of the unchanged file memory-map it without decoding anything, and objects are decoded one at a time on access:
+        
+            with Level.open_readonly("my_level.gmd") as level:
+                triggers = sum(1 for obj in level if obj[obj_prop.ID] in TRIGGER_IDS)
+        """
+        return ReadOnlyLevel(file_path, cache)
+
     @classmethod
-    def from_live_editor(cls, url: str = WEBSOCKET_URL, tag_group: int = 9999) -> "Level":
+    def from_live_editor(cls, 
+        url: str = WEBSOCKET_URL, 
+        tag_group: int = 9999, 
+        *, 
+        columnar: bool = False, 
+        spatial_index: bool = False
+    ) -> "Level":
         """Load a new Level from the live editor."""
-        level = cls(tag_group)
+        level = cls(tag_group, columnar=columnar, spatial_index=spatial_index)
         
         _time_since_last()
         
         level._live_editor = LiveEditor(url)
         level._live_editor.connect()
+        level._live_session = LiveSession(level._live_editor)
         start, objects = level._live_editor.get_level()
-        obj_count = len(objects)
         
-        level._live_editor.remove_objects(level.objects.tag_group)
+        level._live_session.remove(level.objects.tag_group)
+        level._live_session.flush()
         level._load_colors(start)
 
-        level._load_objects(objects, obj_count)
+        level._load_objects(_decode_kit_objects(objects, tag_group))
+        level._live_sync = LiveSync(level._live_session, level.objects)
+        level._export_colors()
+        level._live_sync.mark_synced(start.to_string())
         return level
 
-    def export_to_file(self, file_path: str | Path | None = None):
-        """Export level to .gmd file."""
+    def export_to_file(self, file_path: str | Path | None = None, *, workers: int | None = None):
+        """
+        Export level to .gmd file. Writes pending from an open deferred_validation() block are checked first,
+        then the trigger checks turned on in setting.
+        
+        workers: encode added and edited objects across this many worker processes. The output is identical to a serial export.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+
+        validate_deferred()
+        self._check_triggers()
 
         print(f"\ngmdbuilder took {_time_since_last():.4f} seconds to prepare for export.")
 
@@ -188,26 +480,65 @@ class Level:
         else:
             export_path = Path(file_path)
         
-        self._kit_level.objects.clear()
-        self._kit_level.objects.extend(to_kit_object(obj) for obj in self.objects)
+        object_string = self._kit_level[lvl_prop.Level.OBJECT_STRING]
         self._export_colors()
         
-        self._kit_level.to_file(str(export_path))
+        # Stream the level string into the compressor, reusing the source text of unmodified objects
+        if workers is not None and workers > 1:
+            objects = _object_strings_parallel(self.objects, workers)
+        else:
+            objects = map(_to_object_string, self.objects)
+        object_string.string = compress_pieces(chain((object_string.start.to_string(),), objects))
+        object_string.decompressed = None
+        self._kit_level.to_file(str(export_path), save_content=False)
         
         print(f"\nExported level to {export_path} with {len(self.objects)} objects in {_time_since_last():.3f} seconds.\n")
 
-    def export_to_live_editor(self):
-        """Export level to live editor. Level must be open."""
+    @property
+    def live_session(self) -> LiveSession:
+        """The open live editor session, e.g. for live_session.stats or tuning live_session.batch_bytes."""
+        if self._live_session is None:
+            raise RuntimeError("No live editor connection. Use Level.from_live_editor() first")
+        return self._live_session
+
+    def export_to_live_editor(self, *, close: bool = True):
+        """
+        Export level to live editor, replacing its level. Level must be open.
+        With close=False the connection stays open for further syncs or exports.
+        """
         
-        if self._live_editor is None:
+        validate_deferred()
+        self._check_triggers()
+        
+        if self._live_editor is None or self._live_sync is None:
             raise RuntimeError("No live editor connection. Use Level.from_live_editor() first")
         
-        self._live_editor.objects.clear()
-        self._live_editor.objects.extend(to_kit_object(obj) for obj in self.objects)
         self._export_colors()
+        self._live_sync.replace(self._live_editor.start.to_string())
         
-        self._live_editor.replace_level(save_string=True)
-        self._live_editor.close()
-        self._live_editor = None
+        if close:
+            self.live_session.close()
+            self._live_editor = None
+            self._live_session = None
+            self._live_sync = None
         
         print(f"\nExported to live editor with {len(self.objects)} objects in {_time_since_last():.3f} seconds.\n")
+
+    def sync_to_live_editor(self) -> SyncResult:
+        """
+        Send what changed since the last sync (or the load) to the live editor, keeping the connection open.
+        Unlike export_to_live_editor(), only new and edited objects are sent when possible, see LiveSync.
+        Messages are batched and pipelined through live_session, see LiveSession.
+        Use export_to_live_editor() at the end to close the connection.
+        """
+        validate_deferred()
+        self._check_triggers()
+        
+        if self._live_editor is None or self._live_sync is None:
+            raise RuntimeError("No live editor connection. Use Level.from_live_editor() first")
+        
+        self._export_colors()
+        result = self._live_sync.sync(self._live_editor.start.to_string())
+        
+        print(f"\nSynced {result.sent} objects to live editor ({result.mode}) in {_time_since_last():.3f} seconds.\n")
+        return result
@@ -0,0 +1,286 @@
+"""Persistent sessions with iAndyHD3's WSLiveEditor, and incremental sync of a Level's objects through them."""
+
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Iterable, Literal
+
+from gmdkit.extra.live_editor import LiveEditor
+
+from .columnar import ColumnarObjectList
+from .mappings import obj_prop
+from .object import ObjectList
+from .object_types import ObjectType
+from .stream import compress_pieces
+
+SyncMode = Literal["none", "add", "tagged", "replace"]
+
+
+@dataclass(slots=True)
+class SessionStats:
+    """Counters of a LiveSession, since it was opened or last reset."""
+    messages: int = 0
+    """Messages sent"""
+    objects: int = 0
+    """Objects sent in ADD_OBJECTS messages"""
+    bytes: int = 0
+    """Bytes of JSON sent"""
+    acks: int = 0
+    """Responses received"""
+    latency_total: float = 0.0
+    """Sum of seconds between sending each message and receiving its response"""
+    latency_max: float = 0.0
+    first_send: float | None = None
+    """time.perf_counter() of the first send"""
+    last_ack: float | None = None
+    """time.perf_counter() of the latest response"""
+
+    @property
+    def latency_mean(self) -> float:
+        return self.latency_total / self.acks if self.acks else 0.0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds from the first send to the latest response."""
+        if self.first_send is None or self.last_ack is None:
+            return 0.0
+        return max(self.last_ack - self.first_send, 0.0)
+
+    @property
+    def objects_per_second(self) -> float:
+        return self.objects / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+class LiveSession:
+    """
+    A long-lived connection to the live editor, that batches and pipelines object messages.
+
+    Object strings passed to add() are joined into ADD_OBJECTS messages of about batch_bytes each.
+    Messages are sent without waiting for their responses, up to max_in_flight at a time,
+    WSLiveEditor answers them in order. flush() sends what's batched and waits for every response,
+    raising RuntimeError if any of them was an error.
+    """
+
+    def __init__(self, editor: LiveEditor, *, batch_bytes: int = 1 << 16, max_in_flight: int = 16):
+        if batch_bytes <= 0:
+            raise ValueError("batch_bytes must be positive")
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        self.editor = editor
+        self.batch_bytes = batch_bytes
+        self.max_in_flight = max_in_flight
+        self.stats = SessionStats()
+        self._batch: list[str] = []
+        self._batch_size = 0
+        self._in_flight: deque[float] = deque()
+        """Send time of each message still waiting for a response, oldest first"""
+        self._error: str | None = None
+        """First error response not raised yet"""
+
+    @property
+    def connected(self) -> bool:
+        return self.editor.ws is not None
+
+    @property
+    def in_flight(self) -> int:
+        """Messages sent but not answered yet."""
+        return len(self._in_flight)
+
+    def reset_stats(self) -> None:
+        self.stats = SessionStats()
+
+    def request(self, action: str, **kwargs: Any) -> Any:
+        """Send an action after everything queued and wait for its response."""
+        self.flush()
+        self._send({"action": action, **kwargs})
+        response = self._receive()
+        self.flush() # raises if it was an error
+        return response
+
+    def add(self, object_strings: Iterable[str]) -> None:
+        """Queue object strings (each ending in ';') to be added to the level."""
+        for string in object_strings:
+            self._batch.append(string)
+            self._batch_size += len(string)
+            if self._batch_size >= self.batch_bytes:
+                self._send_batch()
+
+    def remove(self, group: int) -> None:
+        """Queue removing every object in group, after the objects added so far."""
+        self._send_batch()
+        self._send({"action": "REMOVE_OBJECTS", "group": group})
+
+    def replace(self, level_string: str, save: bool = False) -> None:
+        """Queue replacing the level with a compressed level string, after the objects added so far."""
+        self._send_batch()
+        self._send({"action": "REPLACE_LEVEL_STRING", "levelString": level_string, "save": save})
+
+    def flush(self) -> None:
+        """Send what's batched and wait for every response."""
+        self._send_batch()
+        while self._in_flight:
+            self._receive()
+        if (error := self._error) is not None:
+            self._error = None
+            raise RuntimeError(f"response error: {error}")
+
+    def close(self) -> None:
+        """Flush, then close the connection."""
+        try:
+            self.flush()
+        finally:
+            if self.connected:
+                self.editor.close()
+
+    def _send_batch(self) -> None:
+        if not self._batch:
+            return
+        count = len(self._batch)
+        self._send({"action": "ADD_OBJECTS", "objects": "".join(self._batch)})
+        self.stats.objects += count
+        self._batch.clear()
+        self._batch_size = 0
+
+    def _send(self, payload: dict[str, Any]) -> None:
+        ws = self.editor.ws
+        if ws is None:
+            raise RuntimeError("WebSocket is not connected")
+        while len(self._in_flight) >= self.max_in_flight:
+            self._receive()
+        message = json.dumps(payload)
+        try:
+            ws.send(message)
+        except Exception as e:
+            raise ConnectionError("failed to send action") from e
+        now = time.perf_counter()
+        self._in_flight.append(now)
+        stats = self.stats
+        stats.messages += 1
+        stats.bytes += len(message)
+        if stats.first_send is None:
+            stats.first_send = now
+
+    def _receive(self) -> Any:
+        ws = self.editor.ws
+        if ws is None:
+            raise RuntimeError("WebSocket is not connected")
+        raw = ws.recv()
+        now = time.perf_counter()
+        latency = now - self._in_flight.popleft()
+        stats = self.stats
+        stats.acks += 1
+        stats.latency_total += latency
+        stats.latency_max = max(stats.latency_max, latency)
+        stats.last_ack = now
+
+        response = json.loads(raw)
+        if response.get("status") == "error" and self._error is None:
+            self._error = response.get("message", "no error message provided")
+        return response.get("response")
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    """What one LiveSync.sync() found and sent."""
+    added: int
+    removed: int
+    modified: int
+    sent: int
+    """Objects sent to the editor"""
+    mode: SyncMode
+    """
+    none: nothing changed.
+    add: only new objects were sent.
+    tagged: every changed object carried the tag group, so the tag group was removed and its objects re-sent.
+    replace: the whole level was replaced.
+    """
+
+
+class LiveSync:
+    """
+    Sends an ObjectList's changes through a LiveSession, instead of replacing the whole level on every export.
+
+    The editor can only add objects and remove whole groups, so the cost of a sync depends on what changed:
+    new objects are just added; edited or removed objects carrying the tag group cost a re-send of the tag group's objects;
+    edited or removed level objects, and color changes, need a full replace.
+
+    Objects are tracked by identity. Writes are seen through ValidatedObject, so values mutated in place
+    (obj['a57'].add(5)) are not, reassign instead. A ColumnarObjectList isn't tracked and is always replaced.
+    """
+
+    def __init__(self, session: LiveSession, objects: ObjectList | ColumnarObjectList):
+        self.session = session
+        self.objects = objects
+        self._synced: dict[int, tuple[ObjectType, bool]] = {}
+        """id(obj) -> (obj, whether it carried the tag group) for objects the editor has, as of the last sync"""
+        self._start: str | None = None
+        """Start object string the editor has"""
+        if isinstance(objects, ObjectList):
+            objects._dirty = {} # pyright: ignore[reportPrivateUsage]
+
+    def mark_synced(self, start: str) -> None:
+        """Record that the editor holds exactly start and the current objects, e.g. right after a load."""
+        objects = self.objects
+        self._start = start
+        if isinstance(objects, ObjectList):
+            tag = objects.tag_group
+            self._synced = {id(obj): (obj, tag in obj.get(obj_prop.GROUPS, ())) for obj in objects}
+            objects._dirty = {} # pyright: ignore[reportPrivateUsage]
+
+    def sync(self, start: str) -> SyncResult:
+        """Bring the editor up to date with start and the current objects."""
+        from .level import _to_object_string # pyright: ignore[reportPrivateUsage]
+        objects = self.objects
+        if not isinstance(objects, ObjectList):
+            self.replace(start)
+            return SyncResult(0, 0, 0, sent=len(objects), mode="replace")
+
+        synced = self._synced
+        dirty = objects._dirty or {} # pyright: ignore[reportPrivateUsage]
+        current = {id(obj): obj for obj in objects}
+
+        added = [obj for oid, obj in current.items() if oid not in synced]
+        removed = [oid for oid in synced if oid not in current]
+        modified = [oid for oid in dirty if oid in synced and oid in current]
+        counts = len(added), len(removed), len(modified)
+
+        if start != self._start or not all(synced[oid][1] for oid in chain(removed, modified)):
+            self.replace(start)
+            return SyncResult(*counts, sent=len(current), mode="replace")
+
+        if not added and not removed and not modified:
+            objects._dirty = {} # pyright: ignore[reportPrivateUsage]
+            return SyncResult(0, 0, 0, sent=0, mode="none")
+
+        send = added
+        mode: SyncMode = "add"
+        session = self.session
+        if removed or modified:
+            session.remove(objects.tag_group)
+            for oid in removed:
+                del synced[oid]
+            # Everything that carried the tag group is gone from the editor now
+            send = [obj for obj in objects if synced.get(id(obj), (None, True))[1]]
+            mode = "tagged"
+
+        session.add(map(_to_object_string, send))
+        session.flush()
+        tag = objects.tag_group
+        for obj in send:
+            synced[id(obj)] = (obj, tag in obj.get(obj_prop.GROUPS, ()))
+        objects._dirty = {} # pyright: ignore[reportPrivateUsage]
+        return SyncResult(*counts, sent=len(send), mode=mode)
+
+    def replace(self, start: str) -> None:
+        """Replace the editor's level with start and the current objects."""
+        from .level import _to_object_string # pyright: ignore[reportPrivateUsage]
+        string = compress_pieces(chain((start,), map(_to_object_string, self.objects)))
+        self.session.replace(string)
+        self.session.flush()
+        self.mark_synced(start)
@@ -1,12 +1,16 @@
 
+from itertools import compress
 from typing import TYPE_CHECKING, Any, Callable, Iterable, SupportsIndex, cast
 
 if TYPE_CHECKING:
-    from .id import IDAllocator
+    from .query import Query
+    from .selection import Selection
 
+from .index import GroupIndex, ObjectIDIndex, ObjectIndex, SpatialIndex, TriggerGraph
 from .mappings import obj_prop
 from .object_types import ObjectType
-from .validation import validate
+from .typed_access import TypedAccess
+from .validation import transfer_deferred, validate
 
 
 class ValidatedObject(dict[str, Any]):
@@ -14,19 +18,78 @@ class ValidatedObject(dict[str, Any]):
     A dict subclass that represents a level object with validation on property edits.
     
     Is automatically wrapped around objects added to the level's ObjectList, so users can interact with objects as dicts while still getting validation.
+    Writes to keys watched by the owning ObjectList's indexes are reported to it.
+    Objects loaded from a level keep their source text until edited, which export reuses as-is.
     """
-    __slots__ = ("_obj_id",)
+    __slots__ = ("_obj_id", "_owner", "_raw")
 
     def __init__(self, obj_id: int):
         super().__init__()
         self._obj_id = int(obj_id)
+        self._owner: ObjectList | None = None
+        self._raw: str | None = None
+        """Object string this object was loaded from, while unmodified. None for new or edited objects."""
         super().__setitem__(obj_prop.ID, self._obj_id)
 
+    @property
+    def is_modified(self) -> bool:
+        """False while the object is unchanged since it was loaded. Always True for objects created in the script."""
+        return self._raw is None
+
     def __setitem__(self, k: str, v: Any):
         if k == obj_prop.ID:
             raise KeyError("Cannot change object ID after initialization")
         validate(k, v, self)
-        super().__setitem__(k, v)
+        self._raw = None
+        owner = self._owner
+        if owner is not None and owner._dirty is not None: # pyright: ignore[reportPrivateUsage]
+            owner._dirty[id(self)] = cast(ObjectType, self) # pyright: ignore[reportPrivateUsage]
+        if owner is not None and k in owner._watched_keys: # pyright: ignore[reportPrivateUsage]
+            old = self.get(k)
+            super().__setitem__(k, v)
+            owner._prop_changed(cast(ObjectType, self), k, old, v) # pyright: ignore[reportPrivateUsage]
+        else:
+            super().__setitem__(k, v)
+    
+    def __delitem__(self, k: str):
+        if k == obj_prop.ID:
+            raise KeyError("Cannot delete object ID")
+        old = self[k]
+        super().__delitem__(k)
+        self._raw = None
+        owner = self._owner
+        if owner is not None and owner._dirty is not None: # pyright: ignore[reportPrivateUsage]
+            owner._dirty[id(self)] = cast(ObjectType, self) # pyright: ignore[reportPrivateUsage]
+        if owner is not None and k in owner._watched_keys: # pyright: ignore[reportPrivateUsage]
+            owner._prop_changed(cast(ObjectType, self), k, old, None) # pyright: ignore[reportPrivateUsage]
+    
+    def pop(self, k: str, *default: Any) -> Any:
+        if k not in self:
+            if default:
+                return default[0]
+            raise KeyError(k)
+        old = self[k]
+        del self[k]
+        return old
+    
+    def setdefault(self, k: str, default: Any = None) -> Any:
+        if k not in self:
+            self[k] = default
+        return self[k]
+    
+    def popitem(self) -> tuple[str, Any]:
+        k = next(reversed(self))
+        if k == obj_prop.ID:
+            raise KeyError("Cannot delete object ID")
+        return k, self.pop(k)
+    
+    def clear(self):
+        for k in [k for k in self if k != obj_prop.ID]:
+            del self[k]
+    
+    def __ior__(self, other: Any): # type: ignore[override]
+        self.update(other)
+        return self
 
     def update(self, *args: Any, **kwargs: Any):
         # Construct items dict from args and kwargs
@@ -44,7 +107,18 @@ class ValidatedObject(dict[str, Any]):
             if k == obj_prop.ID:
                 raise KeyError("Cannot change object ID after initialization")
             validate(k, v, self)
+        
+        self._raw = None
+        owner = self._owner
+        if owner is not None and owner._dirty is not None: # pyright: ignore[reportPrivateUsage]
+            owner._dirty[id(self)] = cast(ObjectType, self) # pyright: ignore[reportPrivateUsage]
+        if owner is None or owner._watched_keys.isdisjoint(items): # pyright: ignore[reportPrivateUsage]
+            super().update(items)
+            return
+        old = {k: self.get(k) for k in owner._watched_keys.intersection(items)} # pyright: ignore[reportPrivateUsage]
         super().update(items)
+        for k, v in old.items():
+            owner._prop_changed(cast(ObjectType, self), k, v, items[k]) # pyright: ignore[reportPrivateUsage]
     
     @staticmethod
     def wrap_object(obj: "ObjectType | ValidatedObject") -> ObjectType:
@@ -56,23 +130,293 @@ class ValidatedObject(dict[str, Any]):
         return cast(ObjectType, wrapped)
 
 
+class LazyObject(ValidatedObject):
+    """
+    A ValidatedObject loaded from a level file that hasn't been decoded yet.
+    
+    Holds the object's raw string and decodes it on first read or write of any property,
+    turning into a plain ValidatedObject. Objects that are never touched are exported from the raw string.
+    """
+    __slots__ = ()
+
+    def __init__(self, raw: str):
+        dict.__init__(self)
+        self._owner = None
+        self._raw = raw
+
+    def _decode(self) -> None:
+        from .level import decode_object_string
+        decoded = decode_object_string(cast(str, self._raw))
+        written = dict.copy(self) # Raw dict writes made before decoding win
+        self.__class__ = ValidatedObject
+        self._obj_id = decoded[obj_prop.ID]
+        if written:
+            self._raw = None
+        dict.update(self, decoded)
+        dict.update(self, written)
+        # Decoding validates the file's values, so inside deferred_validation() they are checked on exit, on this object
+        transfer_deferred(decoded, self)
+
+    def __eq__(self, other: object) -> bool:
+        self._decode()
+        if type(other) is LazyObject:
+            other._decode()
+        return self == other
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+
+def _decoding(name: str) -> Callable[..., Any]:
+    def method(self: LazyObject, *args: Any, **kwargs: Any) -> Any:
+        self._decode() # pyright: ignore[reportPrivateUsage]
+        return getattr(self, name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+for _name in (
+    "__getitem__", "__setitem__", "__delitem__", "__contains__", "__iter__", "__reversed__", "__len__", 
+    "__repr__", "__or__", "__ror__", "__ior__", "__reduce__", "__reduce_ex__", "__sizeof__", 
+    "get", "keys", "values", "items", "pop", "popitem", "setdefault", "update", "copy", "clear",
+):
+    setattr(LazyObject, _name, _decoding(_name))
+
+
+def prepare_raw_write(objects: Iterable[ObjectType]) -> None:
+    """
+    Decode any LazyObjects among objects and mark all of them modified. 
+    For code that writes through dict methods directly, bypassing ValidatedObject.
+    """
+    for obj in objects:
+        if type(obj) is LazyObject:
+            obj._decode() # pyright: ignore[reportPrivateUsage]
+        cast(ValidatedObject, obj)._raw = None
+
+
 
 ObjectPatternMatch = dict[str, Any] | ObjectType | Callable[[ObjectType], bool]
 
-class ObjectList(list[ObjectType]):
+
+def compile_pattern(condition: ObjectPatternMatch) -> Callable[[ObjectType], bool]:
+    """
+    Turn a dict pattern or predicate into a predicate. 'None' dict values are wildcards.
+    Dict patterns compile to a single comparison of the pattern's values, plus a key check per wildcard.
+    """
+    if callable(condition):
+        return condition
+    present = tuple(k for k, v in condition.items() if v is None)
+    exact = [(k, v) for k, v in condition.items() if v is not None]
+    
+    # Pattern values are never None here, so a missing key (get() -> None) can't match
+    match: Callable[[ObjectType], bool] | None = None
+    if len(exact) == 1:
+        (key, value), = exact
+        match = lambda obj: obj.get(key) == value
+    elif exact:
+        keys = tuple(k for k, _ in exact)
+        values = tuple(v for _, v in exact)
+        match = lambda obj: tuple(map(obj.get, keys)) == values
+    
+    if not present:
+        return match or (lambda obj: True)
+    if match is None:
+        return lambda obj: all(k in obj for k in present)
+    return lambda obj: all(k in obj for k in present) and match(obj)
+
+class ObjectList(TypedAccess, list[ObjectType]):
     """
     A list that validates ObjectType mutations.
     
     - append/extend: adds tag_group
     - Property edits (objects[i]['a2'] = x): validated by ValidatedObject.__setitem__
+    - Indexes (e.g. in_group, by_id): kept up to date on list mutations and on property writes.
+      Mutating a property value in place (objects[i]['a57'].add(5)) bypasses them, reassign instead.
     """
     
     def __init__(self, *, tag_group: int = 9999):
         super().__init__()
         self.tag_group: int = tag_group
         """Group ID automatically added to objects on append/insert/extend."""
-        self._id_allocator: IDAllocator | None = None
-        """Private reference to the level's IDAllocator."""
+        self._group_index = GroupIndex()
+        self._id_index = ObjectIDIndex()
+        self._indexes: list[ObjectIndex] = [self._group_index, self._id_index]
+        """Indexes kept up to date on every change"""
+        self._stale_indexes: list[ObjectIndex] = []
+        """Indexes skipped at load (build_on_load=False), rebuilt on their first query"""
+        self._watched_keys: frozenset[str] = self._group_index.keys
+        self._spatial_index: SpatialIndex | None = None
+        self._trigger_graph: TriggerGraph | None = None
+        self._dirty: dict[int, ObjectType] | None = None
+        """id(obj) -> obj for objects written since the last live-editor sync. None unless a LiveSync tracks the list."""
+    
+    # -- indexes -------------------------------------------------------------
+    
+    def add_index(self, index: ObjectIndex) -> None:
+        """Attach an index. It is built from the current objects and maintained from then on."""
+        index.rebuild(self)
+        self._indexes.append(index)
+        self._watched_keys = self._watched_keys | index.keys
+    
+    def _refresh(self, index: ObjectIndex) -> None:
+        """Rebuild index if it was skipped at load."""
+        if index in self._stale_indexes:
+            index.rebuild(self)
+            self._stale_indexes.remove(index)
+            self._indexes.append(index)
+    
+    def _adopt(self, index: ObjectIndex) -> None:
+        """Mark an index skipped at load as current without rebuilding it, e.g. when its state was restored from a snapshot."""
+        if index in self._stale_indexes:
+            self._stale_indexes.remove(index)
+            self._indexes.append(index)
+    
+    def spatial_index(self, cell_size: float = 150.0) -> SpatialIndex:
+        """
+        The list's SpatialIndex for rectangle, radius and nearest queries over X/Y.
+        Built on first call (cell_size only applies then) and maintained afterwards:
+        
+            level.objects.spatial_index().in_rect(0, 0, 600, 300)
+        """
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(cell_size)
+            self.add_index(self._spatial_index)
+        self._refresh(self._spatial_index)
+        return self._spatial_index
+    
+    def trigger_graph(self) -> TriggerGraph:
+        """
+        The list's TriggerGraph of which groups activate which, for reachability, loop and dead group queries.
+        Built on first call and maintained afterwards:
+        
+            level.objects.trigger_graph().cycles()
+        """
+        if self._trigger_graph is None:
+            self._trigger_graph = TriggerGraph()
+            self.add_index(self._trigger_graph)
+        self._refresh(self._trigger_graph)
+        return self._trigger_graph
+    
+    def _attach(self, obj: ObjectType) -> None:
+        cast(ValidatedObject, obj)._owner = self
+        for index in self._indexes:
+            index.add(obj)
+    
+    def _detach(self, obj: ObjectType) -> None:
+        v = cast(ValidatedObject, obj)
+        if v._owner is not self:
+            return
+        v._owner = None
+        for index in self._indexes:
+            index.discard(obj)
+    
+    def _prop_changed(self, obj: ObjectType, key: str, old: Any, new: Any) -> None:
+        for index in self._indexes:
+            if key in index.keys:
+                index.changed(obj, key, old, new)
+    
+    def _finish_load(self) -> None:
+        """
+        Take ownership of objects added through _append_loaded and bulk-build indexes.
+        Indexes with build_on_load=False are left stale until queried, so loading doesn't decode LazyObjects.
+        """
+        for obj in self:
+            cast(ValidatedObject, obj)._owner = self
+        for index in list(self._indexes):
+            if index.build_on_load:
+                index.rebuild(self)
+            else:
+                index.clear()
+                self._indexes.remove(index)
+                self._stale_indexes.append(index)
+    
+    def in_group(self, group: int) -> list[ObjectType]:
+        """Objects whose GROUPS contain group. O(result) through the group index."""
+        self._refresh(self._group_index)
+        return self._group_index.members(group)
+    
+    def group_parents(self, group: int) -> list[ObjectType]:
+        """Objects whose PARENT_GROUPS contain group."""
+        self._refresh(self._group_index)
+        return self._group_index.parents(group)
+    
+    def _of_id(self, object_id: int) -> list[ObjectType]:
+        """Objects with object_id, in the order they joined the list. O(result) through the object ID index."""
+        self._refresh(self._id_index)
+        return self._id_index.members(object_id)
+    
+    def _candidates(self, condition: ObjectPatternMatch) -> list[ObjectType] | None:
+        """
+        Objects that may match a dict pattern, looked up through an index, or None if the pattern can't use one.
+        A GROUPS pattern value must equal the whole group set, so its rarest group's members cover every match.
+        The group index isn't built for this if still stale from a load, and no index is used when most objects
+        are candidates: a scan is cheaper then. The ID index is built without decoding objects, so it always is.
+        """
+        if callable(condition):
+            return None
+        counts: list[tuple[int, Callable[[], list[ObjectType]]]] = []
+        
+        object_id = condition.get(obj_prop.ID)
+        if isinstance(object_id, int):
+            id_index = self._id_index
+            self._refresh(id_index)
+            counts.append((id_index.count(object_id), lambda: id_index.members(object_id)))
+        
+        groups = condition.get(obj_prop.GROUPS)
+        group_index = self._group_index
+        if isinstance(groups, (set, frozenset)) and groups and group_index not in self._stale_indexes:
+            rarest = min(groups, key=group_index.count)
+            counts.append((group_index.count(rarest), lambda: group_index.members(rarest)))
+        
+        if counts:
+            count, members = min(counts, key=lambda c: c[0])
+            if count * 2 <= len(self):
+                return members()
+        return None
+    
+    def _match_flags(self, condition: ObjectPatternMatch, limit: int = -1) -> list[bool]:
+        """
+        Whether each object matches, in list order. With a limit, only the last limit matches are flagged.
+        """
+        predicate = compile_pattern(condition)
+        candidates = self._candidates(condition)
+        if candidates is not None:
+            matched = {id(obj) for obj in candidates if predicate(obj)}
+            if limit == -1:
+                return [id(obj) in matched for obj in self]
+            predicate = lambda obj: id(obj) in matched
+        
+        if limit == -1:
+            return list(map(predicate, self))
+        flags = [False] * len(self)
+        remaining = limit
+        for i in range(len(self) - 1, -1, -1):
+            if predicate(self[i]):
+                flags[i] = True
+                remaining -= 1
+                if remaining == 0:
+                    break
+        return flags
+    
+    def _remove_flagged(self, flags: list[bool]) -> list[ObjectType]:
+        """Remove flagged objects in one pass, keeping the rest in order. Returns the removed objects in list order."""
+        removed = list(compress(self, flags))
+        if not removed:
+            return removed
+        kept = list(compress(self, [not f for f in flags]))
+        super().__setitem__(slice(None), kept)
+        
+        if len(removed) > len(kept):
+            # Cheaper to rebuild indexes from what's left than to remove objects one at a time
+            for obj in removed:
+                cast(ValidatedObject, obj)._owner = None
+            for index in self._indexes:
+                index.rebuild(kept)
+        else:
+            for obj in removed:
+                self._detach(obj)
+        return removed
+    
+    # -- mutations -----------------------------------------------------------
     
     def delete_where(self, condition: ObjectPatternMatch, *, limit: int = -1) -> int:
         """
@@ -80,31 +424,47 @@ class ObjectList(list[ObjectType]):
         
         For dict-matching, dict must match standard ObjectType keys/values.
         'None' can be used as a wildcard value (not key).
+        With a limit, the last limit matches are deleted.
+        
+        The list is compacted in one pass, and dict patterns naming ID or GROUPS are looked up through the indexes.
         
         Returns number of deleted objects.
         """
         if limit < -1 or limit == 0:
             raise ValueError("delete_where limit must be -1 (no limit) or positive")
+        return len(self._remove_flagged(self._match_flags(condition, limit)))
+    
+    def filter_where(self, condition: ObjectPatternMatch) -> int:
+        """Keep only objects matching a condition (dict or predicate), deleting the rest. Returns number of deleted objects."""
+        return len(self._remove_flagged([not f for f in self._match_flags(condition)]))
+    
+    def partition_where(self, condition: ObjectPatternMatch) -> list[ObjectType]:
+        """
+        Remove objects matching a condition (dict or predicate) and return them, in list order.
+        The removed objects no longer belong to the list, so they can be edited and added back or elsewhere.
+        """
+        return self._remove_flagged(self._match_flags(condition))
+    
+    def query(self) -> "Query":
+        """
+        Start a query combining conditions, run through the most selective index:
         
-        predicate: Callable[[ObjectType], bool]
-        if callable(condition):
-            predicate = condition
-        else:
-            predicate = lambda obj: all(
-                k in obj and (obj.get(k) == v or v is None)
-                for k, v in condition.items()
-            )
-        
-        deleted = 0
-        
-        for i in range(len(self) - 1, -1, -1):
-            if predicate(self[i]):
-                del self[i]
-                deleted += 1
-                if limit != -1 and deleted >= limit:
-                    break
+            level.objects.query().id(obj_id.Trigger.MOVE).in_group(12).where(a51=40).all()
+        """
+        from .query import Query
+        return Query(self)
+    
+    def select(self, condition: ObjectPatternMatch | None = None) -> "Selection":
+        """
+        Select objects matching a condition (dict or predicate), or all objects, for batched edits:
         
-        return deleted
+            level.objects.select({obj_prop.GROUPS: ...}).shift(obj_prop.X, 30)
+        """
+        from .selection import Selection
+        if condition is None:
+            return Selection(self, list(self))
+        predicate = compile_pattern(condition)
+        return Selection(self, [obj for obj in self if predicate(obj)])
     
     def __setitem__(self, # type: ignore[override]
         index: SupportsIndex | slice, 
@@ -114,12 +474,39 @@ class ObjectList(list[ObjectType]):
             if not isinstance(value, list):
                 raise TypeError(f"can only assign a list (not {type(value).__name__}) to a slice")
             validated = [ValidatedObject.wrap_object(obj) for obj in value]
+            for old in super().__getitem__(index):
+                self._detach(old)
             super().__setitem__(index, validated)
+            for obj in validated:
+                self._attach(obj)
         else:
             if not isinstance(value, dict):
                 raise TypeError(f"can only assign ObjectType dict (not {type(value).__name__})")
             validated = ValidatedObject.wrap_object(value)
+            self._detach(super().__getitem__(index))
             super().__setitem__(index, validated)
+            self._attach(validated)
+    
+    def __delitem__(self, index: SupportsIndex | slice):
+        if isinstance(index, slice):
+            for obj in super().__getitem__(index):
+                self._detach(obj)
+        else:
+            self._detach(super().__getitem__(index))
+        super().__delitem__(index)
+    
+    def pop(self, index: SupportsIndex = -1) -> ObjectType:
+        obj = super().pop(index)
+        self._detach(obj)
+        return obj
+    
+    def remove(self, value: ObjectType):
+        del self[self.index(value)]
+    
+    def clear(self):
+        for obj in self:
+            self._detach(obj)
+        super().clear()
     
     def append(self, obj: ObjectType):
         """Validate and append an object."""
@@ -129,10 +516,8 @@ class ObjectList(list[ObjectType]):
         groups.add(self.tag_group)
         obj[obj_prop.GROUPS] = groups
         
-        if self._id_allocator is not None:
-            self._id_allocator.register_object(obj)
-        
         super().append(obj)
+        self._attach(obj)
     
     def insert(self, index: SupportsIndex, obj: ObjectType):
         """Validate and insert an object at index."""
@@ -142,16 +527,17 @@ class ObjectList(list[ObjectType]):
         groups.add(self.tag_group)
         obj[obj_prop.GROUPS] = groups
         
-        if self._id_allocator is not None:
-            self._id_allocator.register_object(obj)
-        
         super().insert(index, obj)
+        self._attach(obj)
     
     def extend(self, iterable: Iterable[ObjectType]):
         """Validate and extend with multiple objects."""
         for obj in iterable:
             self.append(obj)
     
+    _append_loaded = list.append
+    """Append an already validated object from a level load, without tagging. Followed by _finish_load()."""
+    
     def __add__(self, other: object) -> "ObjectList":
         """Disabled: use extend() instead."""
         raise TypeError("Use .extend() instead of + operator")
@@ -0,0 +1,250 @@
+"""Composable object queries, planned over an ObjectList's indexes."""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+from .fields import TARGET_GROUP_FIELDS
+from .mappings import obj_prop
+from .object import ObjectList, ObjectPatternMatch, compile_pattern
+from .object_types import ObjectType
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarObjectList
+    from .selection import Selection
+
+
+@dataclass(frozen=True, slots=True)
+class _Step:
+    kind: str
+    """"id", "group", "x", "y" or "where"; checks run cheapest kind first"""
+    text: str
+    check: Callable[[ObjectType], bool]
+    value: Any = None
+    """The object ID, group or (low, high) range, or the property values of a dict "where" step"""
+
+
+_CHECK_ORDER = {"id": 0, "group": 1, "x": 2, "y": 2, "where": 3}
+
+
+@dataclass(frozen=True, slots=True)
+class _Source:
+    """One way to produce a query's candidates."""
+    text: str
+    estimate: int | None
+    """Candidates it produces, None if unknown before running"""
+    candidates: Callable[[], list[ObjectType]]
+    covers: tuple[_Step, ...]
+    """Steps every candidate is known to satisfy"""
+
+
+@dataclass(slots=True)
+class QueryPlan:
+    """How a Query runs: which index produces the candidates, and which conditions are checked per candidate."""
+    total: int
+    """Objects in the list"""
+    source: str
+    """Where candidates come from, e.g. 'ID index: a1 == 901', or 'scan'"""
+    estimate: int | None
+    """Candidates the source is expected to produce, None if unknown before running"""
+    checks: list[str]
+    """Conditions checked on each candidate, in order"""
+    notes: list[str] = field(default_factory=list)
+    """Why other indexes weren't used"""
+    examined: int | None = None
+    """Candidates actually produced. Set by explain(run=True), like the fields below"""
+    matched: int | None = None
+    seconds: float | None = None
+
+    def __str__(self) -> str:
+        estimate = "?" if self.estimate is None else str(self.estimate)
+        lines = [f"query over {self.total} objects", f"  source: {self.source} (~{estimate} candidates)"]
+        lines += [f"  check:  {check}" for check in self.checks]
+        lines += [f"  note:   {note}" for note in self.notes]
+        if self.examined is not None:
+            lines.append(f"  ran:    {self.examined} examined, {self.matched} matched in {self.seconds:.4f} s")
+        return "\n".join(lines)
+
+
+class Query:
+    """
+    Conditions on a list's objects, run through the most selective index available:
+
+        level.objects.query().id(obj_id.Trigger.MOVE).in_group(12).x_between(3000, 5000).where(a51=40).all()
+
+    Candidates come from one of the object ID index, the group index, the spatial index or the trigger graph
+    (for where() conditions on a target group key like a51), and every other condition is checked on each candidate. Queries are immutable: each condition returns a new Query.
+    explain() shows the plan. Columnar lists have no indexes besides their ID column, so other conditions scan.
+    Created with `objects.query()`.
+    """
+
+    def __init__(self, objects: "ObjectList | ColumnarObjectList", steps: tuple[_Step, ...] = ()):
+        self._objects = objects
+        self._steps = steps
+
+    def _with(self, step: _Step) -> "Query":
+        return Query(self._objects, self._steps + (step,))
+
+    # -- conditions ----------------------------------------------------------
+
+    def id(self, object_id: int) -> "Query":
+        """Objects with this object ID (a1)."""
+        return self._with(_Step("id", f"a1 == {object_id}", lambda obj: obj.get(obj_prop.ID) == object_id, object_id))
+
+    def in_group(self, group: int) -> "Query":
+        """Objects with group in GROUPS (a57)."""
+        return self._with(_Step("group", f"{group} in a57", lambda obj: group in obj.get(obj_prop.GROUPS, ()), group))
+
+    def x_between(self, low: float, high: float) -> "Query":
+        """Objects with low <= X <= high. Objects without X count as 0, like in the spatial index."""
+        low, high = min(low, high), max(low, high)
+        return self._with(_Step("x", f"{low} <= X <= {high}", lambda obj: low <= obj.get(obj_prop.X, 0.0) <= high, (low, high)))
+
+    def y_between(self, low: float, high: float) -> "Query":
+        """Objects with low <= Y <= high. Objects without Y count as 0, like in the spatial index."""
+        low, high = min(low, high), max(low, high)
+        return self._with(_Step("y", f"{low} <= Y <= {high}", lambda obj: low <= obj.get(obj_prop.Y, 0.0) <= high, (low, high)))
+
+    def where(self, condition: ObjectPatternMatch | None = None, /, **props: Any) -> "Query":
+        """
+        Objects matching a condition (dict or predicate, as in delete_where) and/or property values:
+
+            query.where(a51=40)
+            query.where({obj_prop.Trigger.Move.TARGET_ID: 40})
+        """
+        query = self
+        if condition is not None:
+            text = "predicate" if callable(condition) else " and ".join(f"{k} == {v!r}" for k, v in condition.items())
+            query = query._with(_Step("where", text, compile_pattern(condition), None if callable(condition) else dict(condition)))
+        if props:
+            text = " and ".join(f"{k} == {v!r}" for k, v in props.items())
+            query = query._with(_Step("where", text, compile_pattern(props), props))
+        return query
+
+    # -- planning ------------------------------------------------------------
+
+    def _plan(self) -> tuple[QueryPlan, Callable[[], list[ObjectType]], list[_Step]]:
+        """The plan, a function producing the candidates, and the steps left to check on them."""
+        objects = self._objects
+        steps = list(self._steps)
+        notes: list[str] = []
+
+        sources: list[_Source] = []
+        if isinstance(objects, ObjectList):
+            id_index = objects._id_index # pyright: ignore[reportPrivateUsage]
+            group_index = objects._group_index # pyright: ignore[reportPrivateUsage]
+            group_stale = group_index in objects._stale_indexes # pyright: ignore[reportPrivateUsage]
+            for step in steps:
+                if step.kind == "id":
+                    objects._refresh(id_index) # pyright: ignore[reportPrivateUsage]
+                    sources.append(_Source(f"ID index: {step.text}", id_index.count(step.value),
+                                           lambda v=step.value: objects.by_id(v), (step,)))
+                elif step.kind == "group":
+                    sources.append(_Source(f"group index: {step.text}", None if group_stale else group_index.count(step.value),
+                                           lambda v=step.value: objects.in_group(v), (step,)))
+
+            graph = objects._trigger_graph # pyright: ignore[reportPrivateUsage]
+            if graph in objects._stale_indexes: # pyright: ignore[reportPrivateUsage]
+                graph = None
+            for step in steps:
+                if step.kind != "where" or step.value is None:
+                    continue
+                for key, target in step.value.items():
+                    if key not in TARGET_GROUP_FIELDS or not isinstance(target, int) or not target:
+                        continue
+                    if graph is not None:
+                        # Activators also include triggers reaching target through other fields or remaps, so the step stays checked
+                        sources.append(_Source(f"target index: {key} == {target}", graph.activator_count(target),
+                                               lambda g=graph, t=target: g.activators(t), ()))
+                    else:
+                        notes.append(f"{key} == {target} is checked per candidate, objects.trigger_graph() would index it")
+
+            ranges = tuple(step for step in steps if step.kind in ("x", "y"))
+            spatial = objects._spatial_index # pyright: ignore[reportPrivateUsage]
+            if ranges and spatial is not None:
+                (x1, x2), (y1, y2) = (-math.inf, math.inf), (-math.inf, math.inf)
+                for step in ranges:
+                    low, high = step.value
+                    if step.kind == "x":
+                        x1, x2 = max(x1, low), min(x2, high)
+                    else:
+                        y1, y2 = max(y1, low), min(y2, high)
+                estimate: int | None = 0
+                if spatial in objects._stale_indexes: # pyright: ignore[reportPrivateUsage]
+                    estimate = None
+                elif x1 <= x2 and y1 <= y2:
+                    estimate = spatial.count_in_cells(x1, y1, x2, y2)
+                sources.append(_Source(f"spatial index: {' and '.join(step.text for step in ranges)}", estimate,
+                                       lambda: objects.spatial_index().in_rect(x1, y1, x2, y2) if x1 <= x2 and y1 <= y2 else [],
+                                       ranges))
+            elif ranges:
+                notes.append("X/Y ranges are checked per candidate, objects.spatial_index() would index them")
+        else:
+            for step in steps:
+                if step.kind == "id":
+                    sources.append(_Source(f"ID column: {step.text}", None, lambda v=step.value: objects.by_id(v), (step,)))
+                    break
+
+        if sources:
+            # Every built index estimates its candidates up front, only a group index not built since the load can't
+            known = [source for source in sources if source.estimate is not None]
+            if known:
+                chosen = min(known, key=lambda source: source.estimate or 0)
+            else:
+                chosen = next((source for source in sources if source.covers[0].kind != "group"), sources[0])
+            if chosen.text.startswith("group") and chosen.estimate is None:
+                notes.append("group index not built since the load, building it decodes every object")
+            for source in sources:
+                if source is not chosen:
+                    estimate = "" if source.estimate is None else f" (~{source.estimate} candidates)"
+                    notes.append(f"{source.text}{estimate} is checked per candidate instead")
+        else:
+            chosen = _Source("scan", len(objects), lambda: list(objects), ())
+
+        residual = [step for step in steps if all(step is not covered for covered in chosen.covers)]
+        residual.sort(key=lambda step: _CHECK_ORDER[step.kind])
+        plan = QueryPlan(len(objects), chosen.text, chosen.estimate, [step.text for step in residual], notes)
+        return plan, chosen.candidates, residual
+
+    def _run(self) -> tuple[list[ObjectType], QueryPlan]:
+        start = time.perf_counter()
+        plan, candidates, residual = self._plan()
+        result = candidates()
+        plan.examined = len(result)
+        for step in residual:
+            check = step.check
+            result = [obj for obj in result if check(obj)]
+        plan.matched = len(result)
+        plan.seconds = time.perf_counter() - start
+        return result, plan
+
+    def explain(self, run: bool = False) -> QueryPlan:
+        """How this query will run. With run=True it also runs, filling in examined, matched and seconds."""
+        if run:
+            return self._run()[1]
+        return self._plan()[0]
+
+    # -- results -------------------------------------------------------------
+
+    def all(self) -> list[ObjectType]:
+        """Matching objects, in the order of the index they came from (list order for scans)."""
+        return self._run()[0]
+
+    def __iter__(self) -> Iterator[ObjectType]:
+        return iter(self.all())
+
+    def count(self) -> int:
+        return len(self.all())
+
+    def first(self) -> ObjectType | None:
+        result = self.all()
+        return result[0] if result else None
+
+    def select(self) -> "Selection":
+        """The matching objects as a Selection, for batched edits."""
+        from .selection import Selection
+        return Selection(self._objects, self.all())
+
+    def __repr__(self) -> str:
+        return f"Query({' and '.join(step.text for step in self._steps) or 'all'})"
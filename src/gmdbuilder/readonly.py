@@ -0,0 +1,212 @@
+"""Memory-mapped, read-only access to a level's objects, for scripts that only analyse levels."""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Iterator, Mapping, overload
+
+from gmdkit.models.level import Level as KitLevel
+from gmdkit.models.object import Object as KitObject
+from gmdkit.models.prop.gzip import ObjectString
+
+from .cache import LevelCache, SourceKey, source_key
+from .fields import SPECIAL_KEYS
+from .mappings import lvl_prop
+from .stream import iter_decompressed
+
+# Object file layout, all integers native-endian u64:
+#   header:  magic, start_end, count, table_offset, key_offset, key_length
+#   data:    the decompressed level string, as is
+#   table:   (begin, end) byte offsets into data of each object string, 8-byte aligned
+#   key:     source_key() of the .gmd as JSON
+_MAGIC = b"GMDOBJ01"
+_HEADER = struct.Struct("=8s5Q")
+
+
+def _build_objects_file(source: Path, target: Path, key: SourceKey) -> None:
+    """Decompress source's object string into target, indexing where each object string starts and ends."""
+    kit_level = KitLevel.from_file(source, load_content=False)
+    object_string = kit_level.get(lvl_prop.Level.OBJECT_STRING)
+    if not isinstance(object_string, ObjectString):
+        raise RuntimeError(f"Level file has no object string: {source=}")
+
+    table = array("Q")
+    start_end = -1
+    begin = 0
+    pos = 0
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(bytes(_HEADER.size))
+        for piece in iter_decompressed(object_string.string):
+            data = piece.encode()
+            f.write(data)
+            find = data.find
+            i = find(b";")
+            while i != -1:
+                end = pos + i
+                if start_end == -1:
+                    start_end = end
+                elif end > begin:
+                    table.extend((begin, end))
+                begin = end + 1
+                i = find(b";", i + 1)
+            pos += len(data)
+        if start_end == -1:
+            start_end = pos
+        elif pos > begin:
+            table.extend((begin, pos))
+
+        table_offset = -(-(_HEADER.size + pos) // 8) * 8
+        f.write(bytes(table_offset - _HEADER.size - pos))
+        f.write(table.tobytes())
+        key_bytes = json.dumps(key).encode()
+        f.write(key_bytes)
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, start_end, len(table) // 2, table_offset, table_offset + len(table) * 8, len(key_bytes)))
+    os.replace(tmp, target)
+
+
+class ObjectView(Mapping[str, Any]):
+    """
+    Read-only view of one object in a ReadOnlyLevel. 
+    Each property is decoded from the mapped file the first time it is read, without validation.
+    Values are not shared with other views, and editing them changes nothing.
+    """
+    __slots__ = ("_level", "_index", "_tokens", "_values")
+
+    def __init__(self, level: "ReadOnlyLevel", index: int):
+        self._level = level
+        self._index = index
+        self._tokens: dict[str, str] | None = None
+        """Raw key -> raw value, e.g. "57" -> "2.5"."""
+        self._values: dict[str, Any] = {}
+        """Decoded so far"""
+
+    @property
+    def raw(self) -> str:
+        """The object string, as in the file."""
+        return self._level.raw(self._index)
+
+    def _raw_props(self) -> dict[str, str]:
+        if self._tokens is None:
+            tokens = self.raw.split(",")
+            self._tokens = dict(zip(tokens[::2], tokens[1::2]))
+        return self._tokens
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        raw_key = key[1:] if key.startswith("a") else key
+        token = self._raw_props().get(raw_key)
+        if token is None:
+            raise KeyError(key)
+        _, value = KitObject.DECODER(raw_key, token)
+        if s := SPECIAL_KEYS.get(key):
+            value = s.from_kit(value)
+        self._values[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and (key[1:] if key.startswith("a") else key) in self._raw_props()
+
+    def __iter__(self) -> Iterator[str]:
+        return (f"a{k}" if k.isdigit() else k for k in self._raw_props())
+
+    def __len__(self) -> int:
+        return len(self._raw_props())
+
+    def __repr__(self) -> str:
+        return f"ObjectView({dict(self)!r})"
+
+
+class ReadOnlyLevel:
+    """
+    A level's objects, memory-mapped from an uncompressed object file kept in a LevelCache.
+
+    Opening an unchanged level only maps the file, so processes reading the same level share it through the page cache.
+    Objects are decoded one at a time as they are accessed. Includes every object in the file, tagged ones too.
+    Created with Level.open_readonly().
+    """
+
+    def __init__(self, file_path: str | Path, cache: LevelCache | None = None):
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Level file not found: {file_path=}")
+        cache = cache or LevelCache()
+        target = cache.objects_file(path)
+        key = source_key(path)
+
+        if self._stored_key(target) != key:
+            cache.directory.mkdir(parents=True, exist_ok=True)
+            _build_objects_file(path, target, key)
+            cache.evict()
+        else:
+            os.utime(target) # mark as recently used
+
+        with open(target, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, self._start_end, self._count, table_offset, _, _ = _HEADER.unpack_from(self._map)
+        self._view = memoryview(self._map)
+        self._table = self._view[table_offset:table_offset + self._count * 16].cast("Q")
+
+    @staticmethod
+    def _stored_key(target: Path) -> SourceKey | None:
+        try:
+            with open(target, "rb") as f:
+                magic, _, _, _, key_offset, key_length = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC:
+                    return None
+                f.seek(key_offset)
+                return tuple(json.loads(f.read(key_length))) # type: ignore[return-value]
+        except (OSError, ValueError, struct.error):
+            return None
+
+    @property
+    def start(self) -> str:
+        """The start object string (level settings and color channels)."""
+        return self._map[_HEADER.size:_HEADER.size + self._start_end].decode()
+
+    def raw(self, index: int) -> str:
+        """Object string of the object at index."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("object index out of range")
+        table = self._table
+        return self._map[_HEADER.size + table[2 * index]:_HEADER.size + table[2 * index + 1]].decode()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> ObjectView: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[ObjectView]: ...
+    def __getitem__(self, index: int | slice) -> ObjectView | list[ObjectView]:
+        if isinstance(index, slice):
+            return [ObjectView(self, i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("object index out of range")
+        return ObjectView(self, index)
+
+    def __iter__(self) -> Iterator[ObjectView]:
+        return (ObjectView(self, i) for i in range(self._count))
+
+    def close(self) -> None:
+        """Unmap the object file. Views can't be decoded afterwards."""
+        self._table.release()
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> "ReadOnlyLevel":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
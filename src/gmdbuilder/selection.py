@@ -0,0 +1,197 @@
+"""Batched, validated bulk edits over a subset of an ObjectList."""
+
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Mapping, Sequence, cast
+
+from .mappings import obj_prop
+from .object import prepare_raw_write
+from .object_types import ObjectType
+from .validation import validate_batch
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarObjectList
+    from .object import ObjectList, ObjectPatternMatch
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover - optional dependency
+    np = None
+
+HAS_NUMPY = np is not None
+"""Whether numeric transforms run vectorized through NumPy. Install 'gmdbuilder[fast]' to enable."""
+
+_NUMPY_DTYPES = {"d": "float64", "i": "intc"}
+
+ValueFn = Callable[[Any], Any]
+"""New value from one object's current value, e.g. `lambda v: v if v > 0 else 0`."""
+
+ColumnFn = Callable[[Any], Any]
+"""New values from a NumPy array of every selected object's current value, e.g. `lambda col: np.clip(col, 0, 300)`."""
+
+
+def _is_mutable(v: Any) -> bool:
+    return isinstance(v, (set, dict, list))
+
+
+class Selection:
+    """
+    A batch of objects selected from an ObjectList or ColumnarObjectList.
+
+    Edits validate each key once per batch (see validation.validate_batch) and then
+    write without per-object validation. shift and scale are vectorized with NumPy when available.
+    Created with `objects.select(...)`.
+    """
+
+    def __init__(self, objects: "ObjectList | ColumnarObjectList", members: Sequence[ObjectType]):
+        self._objects = objects
+        self._members = members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self) -> Iterator[ObjectType]:
+        return iter(self._members)
+
+    def __repr__(self) -> str:
+        return f"Selection({len(self._members)} objects)"
+
+    def where(self, condition: "ObjectPatternMatch") -> "Selection":
+        """Narrow the selection to objects also matching condition."""
+        from .object import compile_pattern
+        predicate = compile_pattern(condition)
+        return Selection(self._objects, [obj for obj in self._members if predicate(obj)])
+
+    def values(self, key: str, default: Any = None) -> list[Any]:
+        """Values of key for every selected object, default where the object lacks it."""
+        return [obj.get(key, default) for obj in self._members]
+
+    def _alive(self) -> Sequence[ObjectType]:
+        """
+        Selected objects still in the list. Objects removed since the selection was made (delete_where, pop, ...) are skipped,
+        so edits can't put them back into the list's indexes. Rows deleted from a ColumnarObjectList raise on access instead.
+        """
+        from .object import ObjectList, ValidatedObject
+        store = self._objects
+        if not isinstance(store, ObjectList):
+            return self._members
+        return [obj for obj in self._members if cast(ValidatedObject, obj)._owner is store] # pyright: ignore[reportPrivateUsage]
+
+    def _read(self, key: str) -> tuple[list[ObjectType], Sequence[Any]]:
+        """Selected objects that have key, with their current values. Hot columns are read as one NumPy gather."""
+        from .columnar import ColumnarObjectList, ObjectRow
+        store = self._objects
+        if np is not None and isinstance(store, ColumnarObjectList) and (col := store._cols.get(key)) is not None: # pyright: ignore[reportPrivateUsage]
+            rows = cast(list[ObjectRow], list(self._members))
+            slots = np.fromiter((row._check() for row in rows), dtype="int64", count=len(rows)) # pyright: ignore[reportPrivateUsage]
+            present = np.frombuffer(store._has[key], dtype="uint8")[slots].astype(bool) # pyright: ignore[reportPrivateUsage]
+            targets = [cast(ObjectType, row) for row, has in zip(rows, present.tolist()) if has]
+            return targets, np.frombuffer(col, dtype=_NUMPY_DTYPES[col.typecode])[slots[present]].copy()
+        
+        targets = [obj for obj in self._alive() if key in obj]
+        return targets, [obj[key] for obj in targets]
+
+    # -- writes --------------------------------------------------------------
+
+    def _write(self, targets: Sequence[ObjectType], key: str, values: Sequence[Any]) -> None:
+        """Write already validated values. Single write path for all batch edits."""
+        from .columnar import ColumnarObjectList, ObjectRow
+        store = self._objects
+        if isinstance(store, ColumnarObjectList):
+            rows = cast(Sequence[ObjectRow], targets)
+            slots = [row._check() for row in rows] # pyright: ignore[reportPrivateUsage]
+            col = store._cols.get(key) # pyright: ignore[reportPrivateUsage]
+            if col is not None and np is not None:
+                np.frombuffer(col, dtype=_NUMPY_DTYPES[col.typecode])[slots] = values
+                np.frombuffer(store._has[key], dtype="uint8")[slots] = 1 # pyright: ignore[reportPrivateUsage]
+                return
+            for s, v in zip(slots, values):
+                store._set(s, key, v) # pyright: ignore[reportPrivateUsage]
+            return
+
+        prepare_raw_write(targets)
+        if (dirty := store._dirty) is not None: # pyright: ignore[reportPrivateUsage]
+            dirty.update((id(obj), obj) for obj in targets)
+        setitem = dict.__setitem__
+        if key not in store._watched_keys: # pyright: ignore[reportPrivateUsage]
+            for obj, v in zip(targets, values):
+                setitem(obj, key, v)
+            return
+        for obj, v in zip(targets, values):
+            old = obj.get(key)
+            setitem(obj, key, v)
+            store._prop_changed(obj, key, old, v) # pyright: ignore[reportPrivateUsage]
+
+    def set(self, values: Mapping[str, Any]) -> int:
+        """
+        Set constant property values on every selected object.
+        Mutable values (sets, dicts, lists) are copied per object.
+
+        Returns number of objects edited.
+        """
+        members = self._alive()
+        for key, v in values.items():
+            validate_batch(key, [v], members)
+        for key, v in values.items():
+            if _is_mutable(v):
+                self._write(members, key, [v.copy() for _ in members])
+            else:
+                self._write(members, key, [v] * len(members))
+        return len(members)
+
+    def _apply(self, key: str, fn: Callable[[Any], Any], column: bool) -> int:
+        targets, current = self._read(key)
+        if not targets:
+            return 0
+
+        new_values: list[Any]
+        if column:
+            assert np is not None
+            result = np.asarray(fn(np.asarray(current)))
+            new_values = np.broadcast_to(result, (len(targets),) + result.shape[1:]).tolist()
+        else:
+            if np is not None and isinstance(current, np.ndarray):
+                current = current.tolist() # plain Python numbers, as stored on objects
+            new_values = [fn(v) for v in current]
+
+        if len(new_values) != len(targets):
+            raise ValueError(f"transform for {key!r} returned {len(new_values)} values for {len(targets)} objects")
+
+        validate_batch(key, new_values, targets)
+        self._write(targets, key, new_values)
+        return len(targets)
+
+    def transform(self, key: str, fn: ValueFn) -> int:
+        """
+        Replace key's value on every selected object that has it with fn(value), called once per object.
+
+        Returns number of objects edited.
+        """
+        return self._apply(key, fn, column=False)
+
+    def transform_column(self, key: str, fn: ColumnFn) -> int:
+        """
+        Replace key's value on every selected object that has it, computing all new values in one call:
+        fn receives a NumPy array of the current values and returns an array (or scalar) of new ones.
+        Needs NumPy, install 'gmdbuilder[fast]'.
+
+        Returns number of objects edited.
+        """
+        if np is None:
+            raise RuntimeError("transform_column needs NumPy, install 'gmdbuilder[fast]' or use transform()")
+        return self._apply(key, fn, column=True)
+
+    def shift(self, key: str, delta: float) -> int:
+        """Add delta to a numeric property, e.g. `shift(obj_prop.X, 30)`."""
+        return self._apply(key, lambda v: v + delta, column=HAS_NUMPY)
+
+    def scale(self, key: str, factor: float, origin: float = 0.0) -> int:
+        """Scale a numeric property around origin, e.g. positions around a region's center."""
+        return self._apply(key, lambda v: (v - origin) * factor + origin, column=HAS_NUMPY)
+
+    def move(self, dx: float = 0.0, dy: float = 0.0) -> int:
+        """Shift X and Y of every selected object."""
+        edited = 0
+        if dx:
+            edited = self.shift(obj_prop.X, dx)
+        if dy:
+            edited = max(edited, self.shift(obj_prop.Y, dy))
+        return edited
@@ -0,0 +1,86 @@
+"""
+Streaming codec for compressed level strings (base64 over gzip/zlib), one bounded piece at a time.
+
+Equivalent to gmdkit's decompress_string/compress_string, without ever holding the whole decompressed string.
+"""
+
+import base64
+import codecs
+import gzip
+import struct
+import zlib
+from typing import Iterable, Iterator
+
+CHUNK_SIZE = 1 << 16
+"""Approximate size in bytes of each piece read, decompressed or compressed per step."""
+
+
+def iter_decompressed(string: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Decompress a base64 gzip or zlib string, yielding the text in pieces of at most chunk_size characters.
+    Pieces end at arbitrary points, see split_pieces.
+    """
+    step = max(chunk_size // 4 * 4, 4) # whole base64 quanta only
+    inflate = zlib.decompressobj(zlib.MAX_WBITS | 32)
+    text = codecs.getincrementaldecoder("utf-8")()
+    for i in range(0, len(string), step):
+        data = base64.urlsafe_b64decode(string[i:i + step])
+        while data and not inflate.eof:
+            out = inflate.decompress(data, chunk_size)
+            data = inflate.unconsumed_tail
+            if out:
+                yield text.decode(out)
+    if tail := text.decode(inflate.flush(), final=True):
+        yield tail
+
+
+def split_pieces(pieces: Iterable[str], sep: str = ";") -> Iterator[str]:
+    """Split text arriving in pieces on sep, as "".join(pieces).split(sep) would, including empty parts."""
+    rest = ""
+    for piece in pieces:
+        parts = (rest + piece).split(sep)
+        rest = parts.pop()
+        yield from parts
+    yield rest
+
+
+def compress_pieces(pieces: Iterable[str], level: int = 6, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Gzip and base64 encode text arriving in pieces.
+    Returns exactly what gmdkit's compress_string("".join(pieces)) does on the running Python version,
+    buffering about chunk_size characters at a time.
+    """
+    # The gzip header differs between Python versions (the OS byte), so take gzip.compress's own.
+    # The body is raw deflate followed by the CRC-32 and size trailer, as gzip.compress writes it.
+    deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    crc = 0
+    total = 0
+    encoded: list[str] = []
+    carry = gzip.compress(b"", compresslevel=level, mtime=0)[:10]
+
+    def emit(data: bytes) -> None:
+        nonlocal carry
+        data = carry + data
+        cut = len(data) - len(data) % 3 # whole base64 quanta only
+        carry = data[cut:]
+        if cut:
+            encoded.append(base64.urlsafe_b64encode(data[:cut]).decode())
+
+    batch: list[str] = []
+    size = 0
+    for piece in pieces:
+        batch.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            data = "".join(batch).encode()
+            crc = zlib.crc32(data, crc)
+            total += len(data)
+            emit(deflate.compress(data))
+            batch.clear()
+            size = 0
+    data = "".join(batch).encode()
+    crc = zlib.crc32(data, crc)
+    total += len(data)
+    emit(deflate.compress(data) + deflate.flush() + struct.pack("<II", crc, total & 0xFFFFFFFF))
+    encoded.append(base64.urlsafe_b64encode(carry).decode())
+    return "".join(encoded)
@@ -0,0 +1,196 @@
+"""Type-narrowed accessors shared by ObjectList and ColumnarObjectList."""
+
+from abc import ABC, abstractmethod
+from typing import Literal, overload
+
+from . import object_types as td
+from .object_types import ObjectType
+
+
+class TypedAccess(ABC):
+    """
+    Mixin for object lists: by_id() returns objects typed by their ID, like is_obj_id() narrows one object.
+    The by_id overloads are generated by build_tools/gen_id_typeddict_stubs.py.
+    """
+    __slots__ = ()
+
+    @overload
+    def by_id(self, object_id: Literal[10, 11, 12, 13, 45, 46, 47, 99, 101, 111, 286, 287, 660, 745, 1331, 1933, 2926]) -> list[td.GamemodePortalType]: ...
+    @overload
+    def by_id(self, object_id: Literal[20, 1935]) -> list[td.TimewarpType]: ...
+    @overload
+    def by_id(self, object_id: Literal[22, 23, 24, 25, 26, 27, 28, 32, 33, 35, 36, 40, 56, 57, 58, 59, 67, 71, 84, 140, 141, 200, 201, 202, 203, 1332, 1333, 1334, 1612, 1613, 1755, 1813, 1818, 1819, 1829, 1859, 1917, 2866, 3004, 3005, 3606]) -> list[td.TriggerType]: ...
+    @overload
+    def by_id(self, object_id: Literal[31]) -> list[td.StartposType]: ...
+    @overload
+    def by_id(self, object_id: Literal[55, 1915]) -> list[td.EnterPresetType]: ...
+    @overload
+    def by_id(self, object_id: Literal[85, 86, 87, 88, 89, 97, 98, 137, 138, 139, 154, 155, 156, 180, 181, 182, 183, 184, 185, 186, 187, 188, 222, 223, 224, 375, 376, 377, 378, 394, 395, 396, 397, 398, 399, 678, 679, 680, 740, 741, 742, 997, 998, 999, 1000, 1019, 1020, 1021, 1055, 1056, 1057, 1058, 1059, 1060, 1061, 1521, 1522, 1523, 1524, 1525, 1526, 1527, 1528, 1582, 1619, 1620, 1705, 1706, 1707, 1708, 1709, 1710, 1734, 1735, 1736, 1752, 1831, 1832, 1833, 1834]) -> list[td.SawType]: ...
+    @overload
+    def by_id(self, object_id: Literal[162, 3006, 3007, 3008, 3009, 3010, 3011, 3012, 3013, 3014, 3015, 3017, 3018, 3019, 3020, 3021, 3023, 3024]) -> list[td.EffectType]: ...
+    @overload
+    def by_id(self, object_id: Literal[205, 2904, 2905, 2907, 2909, 2910, 2911, 2912, 2913, 2914, 2915, 2916, 2917, 2919, 2920, 2921, 2922, 2923, 2924]) -> list[td.ShaderType]: ...
+    @overload
+    def by_id(self, object_id: Literal[747, 2902]) -> list[td.PortalType]: ...
+    @overload
+    def by_id(self, object_id: Literal[899]) -> list[td.ColorType]: ...
+    @overload
+    def by_id(self, object_id: Literal[901]) -> list[td.MoveType]: ...
+    @overload
+    def by_id(self, object_id: Literal[914]) -> list[td.TextType]: ...
+    @overload
+    def by_id(self, object_id: Literal[920, 921, 922, 923, 924, 1050, 1051, 1052, 1053, 1054, 1329, 1516, 1518, 1519, 1583, 1591, 1592, 1593, 1618, 1697, 1698, 1699, 1839, 1840, 1841, 1842, 1849, 1850, 1851, 1852, 1853, 1854, 1855, 1856, 1857, 1858, 1860, 1936, 1937, 1938, 1939, 2020, 2021, 2022, 2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030, 2031, 2032, 2033, 2034, 2035, 2036, 2037, 2038, 2039, 2040, 2041, 2042, 2043, 2044, 2045, 2046, 2047, 2048, 2049, 2050, 2051, 2052, 2053, 2054, 2055, 2605, 2629, 2630, 2694, 2864, 2865, 2867, 2868, 2869, 2870, 2871, 2872, 2873, 2874, 2875, 2876, 2877, 2878, 2879, 2880, 2881, 2882, 2883, 2884, 2885, 2886, 2887, 2888, 2889, 2890, 2891, 2892, 2893, 2894, 3000, 3001, 3002, 3119, 3120, 3121, 3219, 3303, 3304, 3482, 3483, 3484, 3492, 3493, 4211, 4300]) -> list[td.AnimatedType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1006]) -> list[td.PulseType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1007]) -> list[td.AlphaType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1022, 1330]) -> list[td.OrbSawType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1049]) -> list[td.ToggleType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1268]) -> list[td.SpawnType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1275, 1587, 1589, 1598, 1614, 3601, 4401, 4402, 4403, 4404, 4405, 4406, 4407, 4408, 4409, 4410, 4411, 4412, 4413, 4414, 4415, 4416, 4417, 4418, 4419, 4420, 4421, 4422, 4423, 4424, 4425, 4426, 4427, 4428, 4429, 4430, 4431, 4432, 4433, 4434, 4435, 4436, 4437, 4438, 4439, 4440, 4441, 4442, 4443, 4444, 4445, 4446, 4447, 4448, 4449, 4450, 4451, 4452, 4453, 4454, 4455, 4456, 4457, 4458, 4459, 4460, 4461, 4462, 4463, 4464, 4465, 4466, 4467, 4468, 4469, 4470, 4471, 4472, 4473, 4474, 4475, 4476, 4477, 4478, 4479, 4480, 4481, 4482, 4483, 4484, 4485, 4486, 4487, 4488, 4489, 4490, 4491, 4492, 4493, 4494, 4495, 4496, 4497, 4498, 4499, 4500, 4501, 4502, 4503, 4504, 4505, 4506, 4507, 4508, 4509, 4510, 4511, 4512, 4513, 4514, 4515, 4516, 4517, 4518, 4519, 4520, 4521, 4522, 4523, 4524, 4525, 4526, 4527, 4528, 4529, 4530, 4531, 4532, 4533, 4534, 4535, 4536, 4537, 4538, 4539]) -> list[td.CollectibleType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1346]) -> list[td.RotateType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1347]) -> list[td.FollowType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1520]) -> list[td.ShakeType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1585]) -> list[td.AnimateType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1594, 3643]) -> list[td.ToggleBlockType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1595]) -> list[td.TouchType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1611]) -> list[td.CountType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1615]) -> list[td.ItemLabelType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1616]) -> list[td.StopType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1704, 1751]) -> list[td.DashType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1811]) -> list[td.InstantCountType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1812]) -> list[td.OnDeathType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1814]) -> list[td.FollowPlayerYType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1815]) -> list[td.CollisionType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1816]) -> list[td.CollisionBlockType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1817]) -> list[td.PickupType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1912]) -> list[td.RandomType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1913]) -> list[td.ZoomCameraType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1914]) -> list[td.StaticCameraType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1916]) -> list[td.OffsetCameraType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1932]) -> list[td.PlayerControlType]: ...
+    @overload
+    def by_id(self, object_id: Literal[1934, 3605]) -> list[td.SongType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2015]) -> list[td.RotateCameraType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2016]) -> list[td.CameraGuideType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2062]) -> list[td.CameraEdgeType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2063]) -> list[td.CheckpointType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2064, 3022, 3027]) -> list[td.TeleportType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2065]) -> list[td.ParticleType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2066]) -> list[td.GravityType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2067]) -> list[td.ScaleType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2068]) -> list[td.AdvRandomType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2069, 3645]) -> list[td.ForceBlockType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2895, 2896, 2897]) -> list[td.TemplateType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2899]) -> list[td.OptionsType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2900]) -> list[td.ArrowType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2901]) -> list[td.GameplayOffsetType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2903]) -> list[td.GradientType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2925]) -> list[td.CameraModeType]: ...
+    @overload
+    def by_id(self, object_id: Literal[2999]) -> list[td.MgEditType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3016]) -> list[td.AdvFollowType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3029]) -> list[td.ChangeBgType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3030]) -> list[td.ChangeGrType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3031]) -> list[td.ChangeMgType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3032]) -> list[td.KeyframeType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3033]) -> list[td.AnimateKeyframeType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3600]) -> list[td.EndType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3602, 3603]) -> list[td.SfxType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3604]) -> list[td.EventType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3607]) -> list[td.SequenceType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3608]) -> list[td.SpawnParticleType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3609]) -> list[td.InstantCollisionType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3612]) -> list[td.MgSpeedType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3613]) -> list[td.UiType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3614]) -> list[td.TimeType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3615]) -> list[td.TimeEventType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3617]) -> list[td.TimeControlType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3618]) -> list[td.ResetType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3619]) -> list[td.ItemEditType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3620]) -> list[td.ItemCompareType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3640]) -> list[td.StateBlockType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3641]) -> list[td.ItemPersistType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3642]) -> list[td.BpmType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3660, 3661]) -> list[td.EditAdvFollowType]: ...
+    @overload
+    def by_id(self, object_id: Literal[3662]) -> list[td.LinkVisibleType]: ...
+    @overload
+    def by_id(self, object_id: int) -> list[ObjectType]: ...
+    def by_id(self, object_id: int) -> list[ObjectType]:
+        """
+        All objects with this object ID (a1), typed by it:
+
+            for spawn in level.objects.by_id(obj_id.Trigger.SPAWN):
+                spawn[obj_prop.Trigger.Spawn.DELAY] = 0.5
+        """
+        return self._of_id(object_id)
+
+    @abstractmethod
+    def _of_id(self, object_id: int) -> list[ObjectType]:
+        """Objects with this object ID, untyped. Implemented by each list type."""
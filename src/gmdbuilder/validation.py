@@ -1,10 +1,21 @@
 
-from functools import lru_cache
-from typing import Any, cast
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence, cast
 from warnings import warn
 
-from .fields import SPECIAL_KEYS, TARGET_GROUP_FIELDS, value_is_correct_type, key_is_allowed, int_is_in_range
-from .mappings import obj_prop
+from .fields import (
+    COMMON_ALLOWED_KEYS, 
+    ID_TO_ALLOWED_KEYS, 
+    INSTANT_SPAWNERS, 
+    SPECIAL_KEYS, 
+    TARGET_GROUP_FIELDS, 
+    hashable_value_key_to_isinstance, 
+    numeric_key_types, 
+    type_check_stats, 
+)
+from .index import TriggerGraph, raw_props, strongly_connected
+from .mappings import obj_id, obj_prop
 from .object_types import AllPropsType, ObjectType
 
 
@@ -22,7 +33,7 @@ class setting:
     """Checks that visual-related triggers target non-trigger & visible groups/objects"""
     
     spawn_limit_check = False
-    """Checks for any spawn-limit occurrance within trigger execution chains"""
+    """Checks for groups that spawn each other within the same tick, which GD cuts off at its spawn limit"""
     
     group_parent_check = False
     """Checks that every group parent is unique (no two parents for 1 ID)"""
@@ -86,46 +97,370 @@ def validate_solid_targets(
 
 
 
-@lru_cache(maxsize=2048)
-def _value_is_allowed(k: str, v: Any) -> bool:
-    if not value_is_correct_type(k,v):
-        return False
-    match k:
-        case (obj_prop.Trigger.Move.TARGET_ID 
-            | obj_prop.Trigger.Move.TARGET_CENTER_ID 
-            | obj_prop.Trigger.Move.TARGET_POS
-            | obj_prop.Trigger.Pickup.ITEM_ID
-            | obj_prop.Trigger.CONTROL_ID
-            | obj_prop.COLOR_1
-            | obj_prop.COLOR_2
-            | obj_prop.Trigger.CollisionBlock.BLOCK_ID):
-            return int_is_in_range(v)
-        case _:
+@dataclass(frozen=True, slots=True)
+class SpawnLoop:
+    """Groups that spawn each other in a loop within one tick."""
+    groups: tuple[int, ...]
+    """The loop, in spawn order. The last group spawns the first"""
+    triggers: tuple[ObjectType, ...]
+    """The trigger making each step: triggers[i] spawns groups[i + 1] from groups[i]"""
+    component: tuple[int, ...]
+    """Every group caught in this loop or loops crossing it, sorted"""
+
+    def __str__(self) -> str:
+        return " -> ".join(map(str, self.groups + self.groups[:1]))
+
+
+def _instant_spawn(obj: ObjectType) -> tuple[tuple[int, ...], dict[int, int]] | None:
+    """Groups obj spawns in the tick it is activated, and its remaps. None if it never does."""
+    if (props := raw_props(obj)) is not None:
+        try:
+            object_id = int(props["1"])
+            if object_id not in INSTANT_SPAWNERS:
+                return None
+            if object_id == obj_id.Trigger.SPAWN and float(props.get("63", 0)) > float(props.get("556", 0)):
+                return None
+            return tuple(t for key in ("51", "71") if (t := int(props.get(key, 0)))), {}
+        except (KeyError, ValueError):
             pass
-            # print(f'placeholder warning: {k!r} : {v!r} is not validated.')
-    return True
+    object_id = obj[obj_prop.ID]
+    if object_id not in INSTANT_SPAWNERS:
+        return None
+    spawn = obj_prop.Trigger.Spawn
+    # A random delay can come out as 0 as long as it ranges down to it
+    if object_id == obj_id.Trigger.SPAWN and obj.get(spawn.DELAY, 0) > obj.get(spawn.DELAY_RAND, 0):
+        return None
+    targets = tuple(t for key in (spawn.TARGET_ID, obj_prop.Trigger.Random.FALSE_ID) if (t := obj.get(key)))
+    return targets, obj.get(spawn.REMAPS) or {}
+
+
+def find_spawn_loops(graph: TriggerGraph) -> list[SpawnLoop]:
+    """
+    Loops of groups spawning each other within one tick, in one pass over graph.
+
+    Only INSTANT_SPAWNERS make same-tick steps, and Spawn triggers only when their delay can come out as 0.
+    A Spawn trigger with remaps is taken to redirect every instant spawn of the group it spawns:
+    if group 5 spawns 6 remapping 7 to 8, and a trigger in 6 spawns 7, then 6 may spawn 8.
+    Strongly connected components of the same-tick steps are found with Tarjan's algorithm, O(groups + edges).
+    """
+    steps: dict[int, dict[int, ObjectType]] = {}
+    """Source -> target -> a trigger spawning target from source in the same tick"""
+    remapped: list[tuple[int, dict[int, int]]] = []
+    """(spawned group, remaps) of each instant spawn with remaps"""
+    seen: dict[int, tuple[tuple[int, ...], dict[int, int]] | None] = {}
+    for source, target, triggers in graph.edges():
+        if source == graph.ENTRY: # Nothing spawns the player's triggers, so they can't be in a loop
+            continue
+        for trigger in triggers:
+            oid = id(trigger)
+            if oid not in seen:
+                spawn = seen[oid] = _instant_spawn(trigger)
+                if spawn is not None and spawn[1]:
+                    remapped.extend((t, spawn[1]) for t in spawn[0])
+            spawn = seen[oid]
+            if spawn is not None and target in spawn[0]:
+                steps.setdefault(source, {}).setdefault(target, trigger)
+
+    for group, remaps in remapped:
+        edges = steps.get(group)
+        if edges:
+            for old, new in remaps.items():
+                if old in edges and new:
+                    edges.setdefault(new, edges[old])
+
+    loops: list[SpawnLoop] = []
+    for component in strongly_connected(steps):
+        if len(component) == 1 and component[0] not in steps.get(component[0], ()):
+            continue
+        members = set(component)
+        start = min(component)
+        # Shortest way back to start within the component, by BFS
+        came_from: dict[int, int] = {}
+        frontier = [start]
+        while start not in came_from:
+            next_frontier: list[int] = []
+            for g in frontier:
+                for t in steps.get(g, ()):
+                    if t in members and t not in came_from:
+                        came_from[t] = g
+                        next_frontier.append(t)
+            frontier = next_frontier
+        path: list[int] = []
+        g = came_from[start]
+        while g != start:
+            path.append(g)
+            g = came_from[g]
+        groups = (start, *reversed(path))
+        triggers = tuple(steps[g][groups[(i + 1) % len(groups)]] for i, g in enumerate(groups))
+        loops.append(SpawnLoop(groups, triggers, tuple(sorted(component))))
+    return loops
+
+
+def validate_spawn_limit(graph: TriggerGraph):
+    if not setting.spawn_limit_check:
+        return
+    
+    loops = find_spawn_loops(graph)
+    if loops:
+        chains = "".join(f"{loop}\n" for loop in loops)
+        guilty = "".join(f"{trigger}\n" for loop in loops for trigger in loop.triggers)
+        warn(
+            f"\nSPAWN-LIMIT CHECK FAILED:\n"
+            f"To disable this check, set 'setting.spawn_limit_check' to False.\n\n"
+            f"DETAILS:\n"
+            f"Some groups spawn each other in a loop within the same tick, which GD cuts off at its spawn limit:\n"
+            f"Loops: \n{chains}"
+            f"Offending triggers:\n{guilty}"
+        )
+
+
+ID_RANGE_KEYS = frozenset({
+    obj_prop.Trigger.Move.TARGET_ID,
+    obj_prop.Trigger.Move.TARGET_CENTER_ID,
+    obj_prop.Trigger.Move.TARGET_POS,
+    obj_prop.Trigger.Pickup.ITEM_ID,
+    obj_prop.Trigger.CONTROL_ID,
+    obj_prop.COLOR_1,
+    obj_prop.COLOR_2,
+    obj_prop.Trigger.CollisionBlock.BLOCK_ID,
+})
+"""Keys whose int values must also be valid IDs (0-9999)"""
+
+ValueCheck = Callable[[Any], bool]
+
+_value_checks: dict[str, ValueCheck] = {}
+"""Key -> compiled value check, shared by every object ID that allows the key"""
+
+_validators: dict[int, dict[str, ValueCheck]] = {}
+"""Object ID -> {allowed key: value check}, compiled on first use of each ID"""
+
+
+def _compile_value_check(key: str) -> ValueCheck:
+    if check := _value_checks.get(key):
+        return check
+    
+    if s := SPECIAL_KEYS.get(key):
+        check = s.is_valid_val
+    elif (type_check := hashable_value_key_to_isinstance.get(key)) is None:
+        raise ValueError(f"No type information available for key {key!r}")
+    elif key in ID_RANGE_KEYS:
+        check = lambda v: type_check(v) and isinstance(v, int) and 0 <= v <= 9999
+    else:
+        check = type_check
+    
+    _value_checks[key] = check
+    return check
+
+
+def compile_validators(obj_id: int) -> dict[str, ValueCheck]:
+    """
+    Flat {key: value check} table for every key allowed on obj_id.
+    A key missing from the table is not allowed on that object ID.
+    """
+    if (table := _validators.get(obj_id)) is not None:
+        return table
+    allowed = COMMON_ALLOWED_KEYS | ID_TO_ALLOWED_KEYS.get(obj_id, frozenset())
+    table = {key: _compile_value_check(key) for key in allowed}
+    _validators[obj_id] = table
+    return table
+
+
+_deferred: dict[int, tuple[Mapping[str, Any], set[str]]] | None = None
+"""id(obj) -> (obj, written keys) while deferred_validation() is active"""
+
+_deferred_depth = 0
+
+
+@contextmanager
+def deferred_validation() -> Iterator[None]:
+    """
+    Record property writes instead of validating each one, then check them all on exit:
+    
+        with deferred_validation():
+            for obj in level.objects:
+                obj[obj_prop.X] += 30
+    
+    The checks run grouped by object ID and key, so each distinct check runs once, 
+    and every failure is collected into one ValueError. Nested blocks are checked when the outermost exits.
+    Level.export_to_file also checks pending writes first (see validate_deferred).
+    Values are checked as they are at check time, not as first written. Selection edits are recorded too.
+    If the block exits with an exception, pending writes are still checked, 
+    and failures are added to that exception as a note instead of replacing it.
+    """
+    global _deferred, _deferred_depth
+    if _deferred is None:
+        _deferred = {}
+    _deferred_depth += 1
+    try:
+        yield
+    except BaseException as e:
+        _deferred_depth -= 1
+        if _deferred_depth == 0:
+            try:
+                validate_deferred()
+            except ValueError as invalid:
+                e.add_note(str(invalid))
+            finally:
+                _deferred = None
+        raise
+    _deferred_depth -= 1
+    if _deferred_depth == 0:
+        try:
+            validate_deferred()
+        finally:
+            _deferred = None
+
+
+def _record_deferred(key: str, obj: Mapping[str, Any]) -> None:
+    assert _deferred is not None
+    if (entry := _deferred.get(id(obj))) is None:
+        _deferred[id(obj)] = (obj, {key})
+    else:
+        entry[1].add(key)
+
+
+def transfer_deferred(source: Mapping[str, Any], target: Mapping[str, Any]) -> None:
+    """Check writes recorded for source in an open deferred_validation() block on target instead, e.g. when target took over source's values."""
+    if _deferred is None or (entry := _deferred.pop(id(source), None)) is None:
+        return
+    for key in entry[1]:
+        _record_deferred(key, target)
+
+
+def validate_deferred():
+    """Check writes recorded so far by deferred_validation(). Raises one ValueError listing every failure."""
+    if not _deferred:
+        return
+    pending = list(_deferred.values())
+    _deferred.clear()
+    
+    grouped: dict[tuple[int, str], list[Any]] = {}
+    for obj, keys in pending:
+        try:
+            obj_id = obj[obj_prop.ID]
+        except RuntimeError: # ObjectRow deleted from its ColumnarObjectList since the write
+            continue
+        for key in keys:
+            if key in obj:
+                grouped.setdefault((obj_id, key), []).append(obj[key])
+    
+    errors: list[str] = []
+    for (obj_id, key), values in grouped.items():
+        check = compile_validators(obj_id).get(key)
+        if check is None:
+            if setting.property_allowed_check:
+                errors.append(f"Key {key!r} not allowed for object ID {obj_id} ({len(values)} objects)")
+                continue
+            if not setting.property_type_check:
+                continue
+            try:
+                check = _compile_value_check(key)
+            except ValueError as e:
+                errors.append(f"{e} on object ID {obj_id} ({len(values)} objects)")
+                continue
+        elif not setting.property_type_check:
+            continue
+        
+        verdicts: dict[tuple[type, Any], bool] = {}
+        invalid: list[Any] = []
+        for v in values:
+            try:
+                ok = verdicts[type(v), v]
+            except KeyError:
+                ok = verdicts[type(v), v] = check(v)
+            except TypeError: # Unhashable value
+                ok = check(v)
+            if not ok:
+                invalid.append(v)
+        if invalid:
+            shown = ", ".join(repr(v) for v in invalid[:5]) + (", ..." if len(invalid) > 5 else "")
+            errors.append(f"Invalid values for {key=} on object ID {obj_id} ({len(invalid)} objects): {shown}")
+    
+    if errors:
+        raise ValueError(f"Deferred validation found {len(errors)} problems:\n" + "\n".join(errors))
 
 
-def validate(key: str, v: Any, obj: dict[str, Any]):
+def validation_stats() -> dict[str, int]:
+    """
+    Counters for confirming writes stay on the fast path. Every count here is a slow-path event:
+    - compiled_object_ids / compiled_keys: validator tables and value checks built so far (each built once)
+    - subclass_type_checks: numeric/bool checks whose value type wasn't an exact int/float/bool
+    - deferred_pending_objects: objects with writes waiting in a deferred_validation() block
+    """
+    return {
+        "compiled_object_ids": len(_validators),
+        "compiled_keys": len(_value_checks),
+        "subclass_type_checks": type_check_stats["subclass_checks"],
+        "deferred_pending_objects": len(_deferred) if _deferred else 0,
+    }
+
+
+def validate(key: str, v: Any, obj: Mapping[str, Any]):
     """immediate validation. to be called by 'level.objects' mutations"""
+    if _deferred is not None:
+        _record_deferred(key, obj)
+        return
+    
     obj_id = obj[obj_prop.ID]
+    check = (_validators.get(obj_id) or compile_validators(obj_id)).get(key)
     
-    if setting.property_allowed_check:
-        if not key_is_allowed(obj_id, key):
+    if check is None:
+        if setting.property_allowed_check:
             raise ValueError(f"Key {key!r} not allowed for object ID {obj_id}:\n{obj=}")
+        if not setting.property_type_check:
+            return
+        check = _compile_value_check(key)
+    elif not setting.property_type_check:
+        return
     
-    if not setting.property_type_check:
+    if not check(v):
+        raise ValueError(f"Invalid value for {key=}:{v=} on object ID {obj_id}:\n{obj=}")
+
+
+def validate_batch(key: str, values: Sequence[Any], objects: Iterable[Mapping[str, Any]]):
+    """
+    Validate one key written with many values across many objects. 
+    Each distinct check runs once per batch instead of once per object:
+    key checks once per object ID, type checks once per value type (plain int/float keys) 
+    or per distinct value, and range checks on the batch's min/max.
+    """
+    if key == obj_prop.ID:
+        raise KeyError("Cannot change object ID after initialization")
+    
+    if _deferred is not None:
+        for obj in objects:
+            _record_deferred(key, obj)
         return
     
-    ValueNotAllowed = ValueError(f"Invalid value for {key=}:{v=} on object ID {obj_id}:\n{obj=}")
+    if setting.property_allowed_check:
+        for obj_id in {obj[obj_prop.ID] for obj in objects}:
+            if key not in compile_validators(obj_id):
+                raise ValueError(f"Key {key!r} not allowed for object ID {obj_id}")
     
-    if s := SPECIAL_KEYS.get(key):
-        if not s.is_valid_val(v):
-            raise ValueNotAllowed
+    if not setting.property_type_check or not values:
         return
     
-    try:
-        if not _value_is_allowed(key, v):
-            raise ValueNotAllowed
-    except TypeError: # Unhashable value
-        print(f"placeholder warning: {key} : {v!r} is unhashable and not validated.")
\ No newline at end of file
+    check = _compile_value_check(key)
+    if key in SPECIAL_KEYS:
+        for v in values:
+            if not check(v):
+                raise ValueError(f"Invalid value for {key=}:{v=}")
+        return
+    
+    candidates: Iterable[Any]
+    if key in numeric_key_types:
+        candidates = list({type(v): v for v in values}.values())
+        # Ranges hold for every value between the extremes, whatever their exact number types
+        numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+        if numbers:
+            candidates += [min(numbers), max(numbers)]
+    else:
+        try:
+            # Keyed by type too, since True == 1 but only one of them may pass
+            candidates = {(type(v), v): v for v in values}.values()
+        except TypeError: # Unhashable values
+            candidates = values
+    
+    for v in candidates:
+        if not check(v):
+            raise ValueError(f"Invalid value for {key=}:{v=}")
@@ -0,0 +1,131 @@
+"""
+IDAllocator tests: free-ID allocation, blocks, release and snapshots on a small in-memory level.
+"""
+
+import pytest
+
+from gmdbuilder.core import new_obj
+from gmdbuilder.id import IDAllocator
+from gmdbuilder.mappings import obj_id, obj_prop
+from gmdbuilder.object import ObjectList
+
+
+def make_allocator(*groups: int) -> IDAllocator:
+    objects = ObjectList()
+    obj = new_obj(obj_id.Trigger.MOVE)
+    obj[obj_prop.GROUPS] = set(groups)
+    objects.append(obj)
+    new = IDAllocator(objects)
+    new.register_free_ids_for_level(objects)
+    return new
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+def test_next_free_skips_used_ids() -> None:
+    new = make_allocator(1, 2, 4, 9999)
+
+    assert new.group(3) == (3, 5, 6)
+    assert repr(new.group()) == "new_group_4(7)"
+    assert {1, 2, 3, 4, 9999} <= new.used_group_ids
+    assert new.item() == 1
+
+
+def test_group_block_is_contiguous() -> None:
+    new = make_allocator(*range(1, 10), 12, 40)
+
+    block = new.group_block(30)
+    assert block == tuple(range(41, 71))
+    assert new.group() == 10  # holes before the block are still handed out
+    with pytest.raises(RuntimeError):
+        new.group_block(10_000)
+
+
+def test_release_and_snapshot_restore() -> None:
+    new = make_allocator(1)
+    a, b, c = new.group(3)
+    new.release("group", b)
+    assert new.group() == b
+
+    snap = new.snapshot()
+    taken = new.group_block(5)
+    new.reserve_id("group", 500)
+    new.restore(snap)
+
+    assert new.group_block(5) == taken
+    assert 500 not in new.used_group_ids
+    with pytest.raises(ValueError):
+        new.release("groups", 1)  # type: ignore[arg-type]
+
+
+def test_block_policies_and_alignment() -> None:
+    # free runs: 3..9 (7), 11..12 (2), 16..9999
+    new = make_allocator(1, 2, 10, 13, 14, 15)
+
+    assert new.item_block(2, policy="best") == (1, 2)
+    assert new.group_block(2, policy="best") == (11, 12)
+    assert new.group_block(2) == (3, 4)
+    assert new.group_block(4, align=8) == (16, 17, 18, 19)
+    assert new.collision_block(256, align=256) == tuple(range(256, 512))
+    with pytest.raises(ValueError):
+        new.group_block(2, policy="worst")  # type: ignore[arg-type]
+
+
+def test_fragmentation_stats() -> None:
+    new = make_allocator(*range(2, 9999, 2))
+    stats = new.stats()["group"]
+
+    assert stats.used == 5000  # evens plus the tag group 9999
+    assert stats.free == 4999 and stats.largest_free_run == 1
+    assert stats.highest_used == 9999
+    assert stats.fragmentation > 0.99
+    assert new.stats()["item"].fragmentation == 0.0
+
+
+def test_usage_follows_edits_and_deletes() -> None:
+    objects = ObjectList()
+    objects.extend(new_obj(obj_id.Trigger.MOVE) for _ in range(3))
+    new = IDAllocator(objects)
+    new.register_free_ids_for_level(objects)
+
+    objects[0][obj_prop.GROUPS] = {5, 6}
+    objects[1][obj_prop.GROUPS] = {6}
+    objects[2][obj_prop.COLOR_1] = 3
+    assert {5, 6} <= new.used_group_ids and 3 in new.used_color_ids
+
+    objects[0][obj_prop.GROUPS] = {7}
+    assert 5 not in new.used_group_ids and new.group() == 1
+
+    objects.delete_where({obj_prop.GROUPS: {6}})
+    del objects[-1][obj_prop.COLOR_1]
+    assert 6 not in new.used_group_ids and 3 not in new.used_color_ids
+    assert new.group(2) == (2, 3)
+
+
+def test_held_ids_outlive_their_objects() -> None:
+    objects = ObjectList()
+    objects.append(new_obj(obj_id.Trigger.MOVE))
+    new = IDAllocator(objects)
+    new.register_free_ids_for_level(objects)
+
+    g = new.group()
+    snap = new.snapshot()
+    objects[0][obj_prop.GROUPS] = {g, 40}
+    objects.clear()
+    assert g in new.used_group_ids and 40 not in new.used_group_ids
+
+    objects.append(new_obj(obj_id.Trigger.MOVE))
+    objects[0][obj_prop.GROUPS] = {41}
+    new.release("group", g)
+    new.restore(snap)  # references made since the snapshot are kept
+    assert {g, 41} <= new.used_group_ids
+
+
+def test_used_ids_are_read_only() -> None:
+    new = make_allocator(1)
+    used = new.used_group_ids
+    with pytest.raises(AttributeError):
+        used.add(50)  # type: ignore[attr-defined]
+    new.reserve_id("group", 50)
+    assert 50 in new.used_group_ids and 50 not in used
@@ -0,0 +1,202 @@
+"""
+Level I/O tests: object string decoding and export paths.
+"""
+
+from pathlib import Path
+
+import pytest
+from gmdkit.models.level import Level as KitLevel
+from gmdkit.serialization.functions import compress_string, decompress_string
+
+import gmdbuilder.cache as cache_module
+import gmdbuilder.level as level_module
+from gmdbuilder.cache import LevelCache, SourceKey, source_key
+from gmdbuilder.level import Level, _decode_object_strings, decode_object_string
+from gmdbuilder.mappings import lvl_prop, obj_prop
+from gmdbuilder.object import LazyObject, ValidatedObject
+from gmdbuilder.stream import compress_pieces, iter_decompressed, split_pieces
+
+LEVELS_DIR = Path(__file__).parent / "levels"
+SMALL_LEVEL = LEVELS_DIR / "3Depth.gmd"
+
+
+def object_strings(path: Path) -> list[str]:
+    """Raw object strings of a level file, start object excluded."""
+    kit_level = KitLevel.from_file(path, load_content=False)
+    string = decompress_string(kit_level[lvl_prop.Level.OBJECT_STRING].string)
+    return [s for s in string.split(";")[1:] if s]
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+def test_streaming_codec_matches_gmdkit() -> None:
+    string = "kS38,1;" + "".join(f"1,{i},2,{i * 30},3,15,57,{i % 7}.2;" for i in range(2000))
+    compressed = compress_string(string)
+
+    assert compress_pieces(string[i:i + 97] for i in range(0, len(string), 97)) == compressed
+    pieces = list(iter_decompressed(compressed, chunk_size=64))
+    assert len(pieces) > 1 and "".join(pieces) == string
+    assert list(split_pieces(pieces)) == string.split(";")
+
+
+def test_tag_group_filtered_before_decode() -> None:
+    chunks = [
+        "1,1,2,15,3,15,57,4.9999",  # tagged
+        "1,1,2,57,3,15,57,4",       # '57' appears as a value, not tagged
+        "1,1,2,45,3,15",            # no groups
+    ]
+    decoded = list(_decode_object_strings(chunks, tag_group=9999))
+
+    assert decoded[0] is None
+    assert decoded[1] is not None and decoded[1][obj_prop.GROUPS] == {4}
+    assert decoded[2] is not None and obj_prop.GROUPS not in decoded[2]
+
+
+def test_streamed_load_matches_export(tmp_path: Path) -> None:
+    level = Level.from_file(SMALL_LEVEL)
+    out_file = tmp_path / SMALL_LEVEL.name
+    level.export_to_file(out_file)
+
+    reloaded = Level.from_file(out_file)
+    assert len(reloaded.objects) == len(level.objects)
+    assert all(a == b for a, b in zip(level.objects, reloaded.objects))
+
+
+def test_lazy_load_matches_eager_load() -> None:
+    lazy = Level.from_file(SMALL_LEVEL)
+    eager = Level.from_file(SMALL_LEVEL, lazy=False)
+
+    assert all(type(obj) is LazyObject for obj in lazy.objects)
+    assert list(lazy.objects) == list(eager.objects)
+    assert all(type(obj) is ValidatedObject for obj in lazy.objects)  # comparing decoded them
+
+
+def test_untouched_lazy_objects_export_as_loaded(tmp_path: Path) -> None:
+    level = Level.from_file(SMALL_LEVEL)
+    edited = level.objects[0]
+    edited[obj_prop.X] = 1000
+    assert type(edited) is ValidatedObject
+    assert type(level.objects[1]) is LazyObject
+
+    out_file = tmp_path / SMALL_LEVEL.name
+    level.export_to_file(out_file)
+
+    original = object_strings(SMALL_LEVEL)
+    exported = object_strings(out_file)
+    untagged = [s for s in original if s in exported]
+    assert len(untagged) == len(level.objects) - 1
+    assert exported[1:] == untagged
+    assert Level.from_file(out_file).objects[0][obj_prop.X] == 1000
+
+
+def test_only_modified_objects_are_reencoded(tmp_path: Path) -> None:
+    level = Level.from_file(SMALL_LEVEL, lazy=False)
+    objects = level.objects
+    grouped = next(obj for obj in objects if obj.get(obj_prop.GROUPS))
+    plain = next(obj for obj in objects if obj_prop.GROUPS not in obj)
+    assert not grouped.is_modified and not plain.is_modified  # type: ignore[attr-defined]
+
+    grouped[obj_prop.GROUPS].add(42)  # in-place edit, not tracked
+    objects.select({obj_prop.ID: plain[obj_prop.ID]}).shift(obj_prop.Y, 30)
+    assert plain.is_modified  # type: ignore[attr-defined]
+
+    out_file = tmp_path / SMALL_LEVEL.name
+    level.export_to_file(out_file)
+
+    reloaded = Level.from_file(out_file).objects
+    assert list(reloaded) == list(objects)
+    original = set(object_strings(SMALL_LEVEL))
+    reused = [s for s in object_strings(out_file) if s in original]
+    unchanged = [obj for obj in objects if not obj.is_modified and obj_prop.GROUPS not in obj]  # type: ignore[attr-defined]
+    assert len(reused) >= len(unchanged) > 0
+
+
+def test_parallel_load_matches_serial_load(tmp_path: Path) -> None:
+    serial = Level.from_file(SMALL_LEVEL, lazy=False)
+    parallel = Level.from_file(SMALL_LEVEL, workers=2)
+
+    assert all(type(obj) is ValidatedObject and not obj.is_modified for obj in parallel.objects)
+    assert list(parallel.objects) == list(serial.objects)
+
+    serial_out, parallel_out = tmp_path / "serial.gmd", tmp_path / "parallel.gmd"
+    serial.export_to_file(serial_out)
+    parallel.export_to_file(parallel_out)
+    assert object_strings(parallel_out) == object_strings(serial_out)
+
+
+def test_parallel_export_matches_serial_export(tmp_path: Path) -> None:
+    level = Level.from_file(SMALL_LEVEL)
+    objects = level.objects
+    objects.select(lambda obj: obj[obj_prop.ID] % 3 == 0).shift(obj_prop.X, 30)
+    objects.append(decode_object_string("1,1,2,15,3,15,57,4.2"))
+
+    serial_out, parallel_out = tmp_path / "serial.gmd", tmp_path / "parallel.gmd"
+    level.export_to_file(serial_out)
+    level.export_to_file(parallel_out, workers=2)
+    assert object_strings(parallel_out) == object_strings(serial_out)
+
+
+def test_cached_load_matches_fresh_load(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = LevelCache(tmp_path / "cache")
+    fresh = Level.from_file(SMALL_LEVEL, cache=cache)
+    assert cache.size() > 0
+    cached = Level.from_file(SMALL_LEVEL, cache=cache)
+
+    assert list(cached.objects) == list(fresh.objects)
+    assert not any(obj.is_modified for obj in cached.objects)  # type: ignore[attr-defined]
+    assert cached.new.stats() == fresh.new.stats()
+    assert cached.color.keys() == fresh.color.keys()
+
+    hashed: list[Path] = []
+    def counting_key(path: Path) -> SourceKey:
+        hashed.append(path)
+        return source_key(path)
+    monkeypatch.setattr(cache_module, "source_key", counting_key)
+    monkeypatch.setattr(level_module, "source_key", counting_key)
+    Level.from_file(SMALL_LEVEL, cache=cache)
+    assert len(hashed) == 1  # the source is hashed once per load
+
+    fresh_out, cached_out = tmp_path / "fresh.gmd", tmp_path / "cached.gmd"
+    fresh.export_to_file(fresh_out)
+    cached.export_to_file(cached_out)
+    assert object_strings(cached_out) == object_strings(fresh_out)
+
+
+def test_cache_invalidation_and_eviction(tmp_path: Path) -> None:
+    cache = LevelCache(tmp_path / "cache")
+    level_file = tmp_path / SMALL_LEVEL.name
+    level_file.write_bytes(SMALL_LEVEL.read_bytes())
+
+    level = Level.from_file(level_file, cache=cache)
+    level.objects[0][obj_prop.X] = 1000
+    level.export_to_file(level_file)  # changes the source, so its snapshot is stale
+    assert cache.load(level_file) is None
+    assert Level.from_file(level_file, cache=cache).objects[0][obj_prop.X] == 1000
+    assert cache.load(level_file) is not None
+
+    assert cache.invalidate(level_file) == 1 and cache.size() == 0
+
+    Level.from_file(level_file, cache=cache)
+    Level.from_file(level_file, tag_group=9998, cache=cache)
+    cache.max_bytes = cache.size() - 1
+    assert cache.evict() == 1
+    assert cache.invalidate() == 1
+
+
+def test_readonly_level_matches_loaded_level(tmp_path: Path) -> None:
+    cache = LevelCache(tmp_path / "cache")
+    level = Level.from_file(SMALL_LEVEL, tag_group=0)  # keep every object
+
+    with Level.open_readonly(SMALL_LEVEL, cache=cache) as readonly:
+        assert len(readonly) == len(level.objects)
+        assert [view.raw for view in readonly] == object_strings(SMALL_LEVEL)
+        assert all(dict(view) == obj for view, obj in zip(readonly, level.objects))
+        assert readonly[-1] == readonly[len(readonly) - 1] == level.objects[-1]
+        assert readonly.start.startswith("kS38")
+
+    objects_file = cache.objects_file(SMALL_LEVEL)
+    built = objects_file.stat().st_mtime_ns
+    with Level.open_readonly(SMALL_LEVEL, cache=cache) as readonly:
+        assert len(readonly[:3]) == 3
+    assert objects_file.stat().st_mtime_ns >= built and cache.invalidate(SMALL_LEVEL) == 1
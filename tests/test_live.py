@@ -0,0 +1,257 @@
+"""
+Live editor tests: sessions and incremental sync, against a local stand-in for the WSLiveEditor websocket server.
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from gmdkit.models.level import Level as KitLevel
+from gmdkit.serialization.functions import decompress_string
+
+from gmdbuilder.core import new_obj
+from gmdbuilder.level import Level, _to_object_string, decode_object_string  # pyright: ignore[reportPrivateUsage]
+from gmdbuilder.mappings import lvl_prop, obj_id, obj_prop
+from gmdbuilder.object_types import ObjectType
+
+SMALL_LEVEL = Path(__file__).parent / "levels" / "3Depth.gmd"
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class StandInEditor:
+    """
+    Just enough of WSLiveEditor: a websocket server on localhost, serving one client, that edits a level string.
+    Responses are sent in order as each message is handled.
+    """
+
+    def __init__(self, level_string: str):
+        start, *objects = level_string.split(";")
+        self.start = start
+        self.objects = [s for s in objects if s]
+        self.received: list[dict[str, Any]] = []
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.url = f"ws://127.0.0.1:{self._server.getsockname()[1]}"
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def actions(self) -> list[str]:
+        actions = [message["action"] for message in self.received if message["action"] != "GET_LEVEL_STRING"]
+        self.received.clear()
+        return actions
+
+    def close(self) -> None:
+        self._server.close()
+        self._thread.join(timeout=5)
+
+    def _handle(self, message: dict[str, Any]) -> Any:
+        match message["action"]:
+            case "GET_LEVEL_STRING":
+                return ";".join([self.start, *self.objects]) + ";"
+            case "ADD_OBJECTS":
+                self.objects.extend(s for s in message["objects"].split(";") if s)
+            case "REMOVE_OBJECTS":
+                self.objects = [s for s in self.objects if message["group"] not in groups(s)]
+            case "REPLACE_LEVEL_STRING":
+                self.start, *objects = decompress_string(message["levelString"]).split(";")
+                self.objects = [s for s in objects if s]
+            case action:
+                raise ValueError(f"unknown action {action}")
+
+    def _serve(self) -> None:
+        try:
+            conn, _ = self._server.accept()
+        except OSError:
+            return
+        with conn:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(4096)
+            key = next(line.split(b":", 1)[1].strip() for line in request.split(b"\r\n") if line.lower().startswith(b"sec-websocket-key"))
+            accept = base64.b64encode(hashlib.sha1(key + _WS_GUID).digest())
+            conn.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+            for text in _read_messages(conn):
+                message = json.loads(text)
+                self.received.append(message)
+                try:
+                    response = {"status": "successful", "response": self._handle(message)}
+                except ValueError as e:
+                    response = {"status": "error", "message": str(e)}
+                _send_frame(conn, 0x1, json.dumps(response).encode())
+
+
+def _recv_exact(conn: socket.socket, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        if not (chunk := conn.recv(n - len(data))):
+            raise ConnectionError("client went away")
+        data += chunk
+    return data
+
+
+def _read_messages(conn: socket.socket) -> Iterator[str]:
+    """Text messages from a client until it closes, reassembling fragments."""
+    parts: list[bytes] = []
+    while True:
+        head, size = _recv_exact(conn, 2)
+        size &= 0x7F
+        if size == 126:
+            size, = struct.unpack("!H", _recv_exact(conn, 2))
+        elif size == 127:
+            size, = struct.unpack("!Q", _recv_exact(conn, 8))
+        mask = _recv_exact(conn, 4)
+        data = _recv_exact(conn, size)
+        data = (int.from_bytes(data) ^ int.from_bytes((mask * (size // 4 + 1))[:size])).to_bytes(size)
+        opcode = head & 0x0F
+        if opcode == 0x8:
+            _send_frame(conn, 0x8, data[:2])
+            return
+        if opcode == 0x9:
+            _send_frame(conn, 0xA, data)
+            continue
+        parts.append(data)
+        if head & 0x80:
+            yield b"".join(parts).decode()
+            parts.clear()
+
+
+def _send_frame(conn: socket.socket, opcode: int, data: bytes) -> None:
+    size = len(data)
+    if size < 126:
+        header = struct.pack("!BB", 0x80 | opcode, size)
+    elif size < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, size)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, size)
+    conn.sendall(header + data)
+
+
+def groups(object_string: str) -> set[int]:
+    tokens = object_string.split(",")
+    props = dict(zip(tokens[::2], tokens[1::2]))
+    return {int(g) for g in props["57"].split(".")} if "57" in props else set()
+
+
+@pytest.fixture
+def server() -> Iterator[StandInEditor]:
+    kit_level = KitLevel.from_file(SMALL_LEVEL, load_content=False)
+    string = decompress_string(kit_level[lvl_prop.Level.OBJECT_STRING].string)
+    server = StandInEditor(";".join(string.split(";")[:2000]))  # enough of the level to have tagged objects too
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def level(server: StandInEditor) -> Iterator[Level]:
+    level = Level.from_live_editor(server.url)
+    server.actions()  # the tag group removal on load
+    yield level
+    if level._live_session is not None:  # pyright: ignore[reportPrivateUsage]
+        level.live_session.close()
+
+
+def canonical(obj: ObjectType) -> str:
+    return repr(sorted((k, sorted(v) if isinstance(v, set) else v) for k, v in obj.items()))
+
+
+def editor_matches(server: StandInEditor, level: Level) -> bool:
+    editor = (canonical(decode_object_string(s)) for s in server.objects)
+    loaded = (canonical(decode_object_string(_to_object_string(obj)[:-1])) for obj in level.objects)
+    return sorted(editor) == sorted(loaded)
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+def test_sync_sends_only_new_objects(server: StandInEditor, level: Level) -> None:
+    assert level.sync_to_live_editor().mode == "none" and server.actions() == []
+
+    level.objects.append(new_obj(obj_id.Trigger.MOVE))
+    result = level.sync_to_live_editor()
+
+    assert (result.added, result.sent, result.mode) == (1, 1, "add")
+    assert server.actions() == ["ADD_OBJECTS"]
+    assert editor_matches(server, level)
+    assert level.sync_to_live_editor().mode == "none"
+
+
+def test_sync_resends_tag_group_for_tagged_edits(server: StandInEditor, level: Level) -> None:
+    objects = level.objects
+    first, second = new_obj(obj_id.Trigger.MOVE), new_obj(obj_id.Trigger.MOVE)
+    objects.extend([first, second])
+    level.sync_to_live_editor()
+    server.actions()
+
+    first[obj_prop.X] = 300
+    result = level.sync_to_live_editor()
+    assert (result.modified, result.sent, result.mode) == (1, 2, "tagged")
+    assert server.actions() == ["REMOVE_OBJECTS", "ADD_OBJECTS"]
+    assert editor_matches(server, level)
+
+    objects.delete_where(lambda obj: obj is second)
+    result = level.sync_to_live_editor()
+    assert (result.removed, result.sent, result.mode) == (1, 1, "tagged")
+    assert server.actions() == ["REMOVE_OBJECTS", "ADD_OBJECTS"]
+    assert editor_matches(server, level)
+
+
+def test_sync_replaces_level_for_level_object_edits(server: StandInEditor, level: Level) -> None:
+    level.objects[0][obj_prop.X] = 1000
+    result = level.sync_to_live_editor()
+
+    assert (result.modified, result.sent, result.mode) == (1, len(level.objects), "replace")
+    (message,) = server.received
+    assert message["action"] == "REPLACE_LEVEL_STRING" and message["save"] is False
+    assert editor_matches(server, level)
+
+    server.actions()
+    assert level.sync_to_live_editor().mode == "none"
+    level.color[next(iter(level.color))].red = 12
+    assert level.sync_to_live_editor().mode == "replace"
+
+
+def test_session_batches_and_pipelines(server: StandInEditor, level: Level) -> None:
+    session = level.live_session
+    session.batch_bytes = 200
+    session.max_in_flight = 4
+    session.reset_stats()
+
+    for i in range(60):
+        obj = new_obj(obj_id.Trigger.MOVE)
+        obj[obj_prop.X] = i * 30
+        level.objects.append(obj)
+    session.add(_to_object_string(obj) for obj in level.objects[-60:])
+    assert session.in_flight == 4  # sent without waiting on responses
+
+    session.flush()
+    stats = session.stats
+    assert session.in_flight == 0 and stats.acks == stats.messages > 4
+    assert stats.objects == 60 and stats.bytes > 60 * 20
+    assert 0 < stats.latency_mean <= stats.latency_max and stats.objects_per_second > 0
+    assert set(server.actions()) == {"ADD_OBJECTS"}
+    assert editor_matches(server, level)
+
+
+def test_session_errors_and_export(server: StandInEditor, level: Level) -> None:
+    session = level.live_session
+    with pytest.raises(RuntimeError, match="unknown action"):
+        session.request("SPIN_LEVEL")
+    assert session.connected and session.in_flight == 0
+
+    level.objects.append(new_obj(obj_id.Trigger.MOVE))
+    level.export_to_live_editor(close=False)
+    assert server.actions()[-1] == "REPLACE_LEVEL_STRING" and session.connected
+    assert editor_matches(server, level)
+
+    level.export_to_live_editor()
+    assert not session.connected
+    with pytest.raises(RuntimeError):
+        level.sync_to_live_editor()
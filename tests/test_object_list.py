@@ -0,0 +1,432 @@
+"""
+ObjectList tests: mutations, queries and the columnar backend, on small in-memory lists.
+"""
+
+import math
+from pathlib import Path
+
+import pytest
+
+from gmdbuilder.columnar import ColumnarObjectList
+from gmdbuilder.core import new_obj
+from gmdbuilder.index import ObjectIndex
+from gmdbuilder.level import Level
+from gmdbuilder.mappings import obj_id, obj_prop
+from gmdbuilder.object import LazyObject, ObjectList
+from gmdbuilder.object_types import ObjectType
+from gmdbuilder.selection import HAS_NUMPY
+from gmdbuilder.typed_access import TypedAccess
+
+SMALL_LEVEL = Path(__file__).parent / "levels" / "3Depth.gmd"
+
+
+def make_move(x: float, target: int) -> ObjectType:
+    obj = new_obj(obj_id.Trigger.MOVE)
+    obj[obj_prop.X] = x
+    obj[obj_prop.Trigger.Move.TARGET_ID] = target
+    return obj
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+def test_columnar_rows_match_object_list() -> None:
+    plain = ObjectList()
+    columnar = ColumnarObjectList()
+    for i in range(5):
+        plain.append(make_move(i * 30, i + 1))
+        columnar.append(make_move(i * 30, i + 1))
+
+    assert len(columnar) == len(plain)
+    assert [dict(o) for o in columnar] == [dict(o) for o in plain]
+    assert columnar.column(obj_prop.X) == [0.0, 30.0, 60.0, 90.0, 120.0]
+
+
+def test_columnar_rows_validate() -> None:
+    objects = ColumnarObjectList()
+    objects.append(make_move(0, 1))
+    row = objects[0]
+
+    row[obj_prop.Y] = 45
+    assert objects[0][obj_prop.Y] == 45
+
+    with pytest.raises(ValueError):
+        row[obj_prop.Trigger.Move.DURATION] = "fast"
+    with pytest.raises(ValueError):
+        row[obj_prop.Trigger.Spawn.DELAY] = 1.0  # not a Move key
+    with pytest.raises(KeyError):
+        row[obj_prop.ID] = 1
+
+
+def test_columnar_delete_where_invalidates_rows() -> None:
+    objects = ColumnarObjectList()
+    objects.extend(make_move(i, i + 1) for i in range(10))
+    stale = objects[3]
+
+    deleted = objects.delete_where({obj_prop.Trigger.Move.TARGET_ID: 4})
+
+    assert deleted == 1
+    assert len(objects) == 9
+    with pytest.raises(RuntimeError):
+        stale[obj_prop.X]
+
+    # Freed slots are reused without leaking old properties
+    objects.append(new_obj(1))
+    assert obj_prop.Trigger.Move.TARGET_ID not in objects[-1]
+
+
+def test_columnar_packed_groups() -> None:
+    objects = ColumnarObjectList()
+    objects.extend(make_move(i, i + 1) for i in range(6))
+    row = objects[2]
+
+    row[obj_prop.GROUPS] = {1, 2, 3}
+    row[obj_prop.GROUPS] = {4}  # fits in the old run
+    objects[3][obj_prop.GROUPS] = set(range(10, 20))
+    del objects[4][obj_prop.GROUPS]
+
+    assert row[obj_prop.GROUPS] == {4}
+    assert objects[3][obj_prop.GROUPS] == set(range(10, 20))
+    assert obj_prop.GROUPS not in objects[4] and obj_prop.GROUPS in objects[5]
+    assert objects.column(obj_prop.GROUPS, set())[2:5] == [{4}, set(range(10, 20)), set()]
+    assert objects.delete_where({obj_prop.GROUPS: {4}}) == 1
+
+    for i in range(6000):  # rewrites that don't fit pile up dead runs until compaction
+        objects[0][obj_prop.GROUPS] = {9999, 100 + i % 50} if i % 2 else {9999, 100 + i % 50, 200}
+    assert objects[0][obj_prop.GROUPS] == {9999, 149}
+    assert objects[2][obj_prop.GROUPS] == set(range(10, 20))
+
+
+@pytest.mark.parametrize("list_type", [ObjectList, ColumnarObjectList])
+def test_delete_filter_and_partition_where(list_type: type) -> None:
+    def fresh() -> ObjectList | ColumnarObjectList:
+        objects = list_type()
+        objects.extend(make_move(i * 10, 1 + i % 3) for i in range(9))
+        return objects
+
+    objects = fresh()
+    assert objects.delete_where({obj_prop.Trigger.Move.TARGET_ID: 2, obj_prop.X: None}) == 3
+    assert objects.delete_where({obj_prop.Trigger.Move.TARGET_ID: 1}, limit=2) == 2
+    assert objects.select().values(obj_prop.X) == [0, 20, 50, 80]  # limit deletes the last matches
+    assert objects.delete_where({obj_prop.Trigger.Spawn.DELAY: None}) == 0
+
+    objects = fresh()
+    assert objects.filter_where(lambda obj: obj[obj_prop.X] >= 40) == 4
+    assert objects.select().values(obj_prop.X) == [40, 50, 60, 70, 80]
+
+    objects = fresh()
+    removed = objects.partition_where({obj_prop.Trigger.Move.TARGET_ID: 3})
+    assert [obj[obj_prop.X] for obj in removed] == [20, 50, 80]
+    assert objects.select().values(obj_prop.X) == [0, 10, 30, 40, 60, 70]
+    objects.append(removed[0])
+    assert objects[-1][obj_prop.X] == 20 and len(objects) == 7
+
+
+def test_delete_where_uses_group_index() -> None:
+    objects = ObjectList(tag_group=9999)
+    objects.extend(make_move(i, 1) for i in range(40))
+    for obj in objects[:3]:
+        obj[obj_prop.GROUPS] = {5, 9999}
+    assert len(objects.in_group(5)) == 3
+
+    assert objects.delete_where({obj_prop.GROUPS: {5}}) == 0  # whole set must match
+    assert objects.delete_where({obj_prop.GROUPS: {5, 9999}}, limit=1) == 1
+    assert objects.delete_where({obj_prop.GROUPS: {9999, 5}}) == 2
+    assert objects.in_group(5) == [] and len(objects.in_group(9999)) == 37
+
+    removed = objects.partition_where({obj_prop.GROUPS: {9999}, obj_prop.ID: obj_id.Trigger.MOVE})
+    assert len(removed) == 37 and objects.in_group(9999) == [] and len(objects) == 0
+    removed[0][obj_prop.GROUPS] = {6}  # removed objects are no longer tracked
+    assert objects.in_group(6) == []
+
+
+@pytest.mark.parametrize("list_type", [ObjectList, ColumnarObjectList])
+def test_by_id_tracks_mutations(list_type: type) -> None:
+    objects = list_type()
+    objects.extend(make_move(i, 1) for i in range(3))
+    objects.append(new_obj(obj_id.Trigger.SPAWN))
+
+    assert len(objects.by_id(obj_id.Trigger.MOVE)) == 3
+    spawns = objects.by_id(obj_id.Trigger.SPAWN)
+    assert len(spawns) == 1 and spawns[0][obj_prop.ID] == obj_id.Trigger.SPAWN
+
+    del objects[0]
+    objects[0] = new_obj(obj_id.Trigger.SPAWN)
+    assert len(objects.by_id(obj_id.Trigger.MOVE)) == 1
+    assert len(objects.by_id(obj_id.Trigger.SPAWN)) == 2
+    assert objects.delete_where({obj_prop.ID: obj_id.Trigger.SPAWN}) == 2
+    assert objects.by_id(obj_id.Trigger.SPAWN) == [] and objects.by_id(obj_id.Trigger.ALPHA) == []
+
+
+def test_by_id_leaves_loaded_objects_undecoded() -> None:
+    level = Level.from_file(SMALL_LEVEL)
+    objects = level.objects
+    assert isinstance(objects, ObjectList)
+
+    moves = objects.by_id(obj_id.Trigger.MOVE)
+    assert moves and all(type(obj) is LazyObject for obj in objects)
+    assert moves == [obj for obj in objects if obj[obj_prop.ID] == obj_id.Trigger.MOVE]
+
+    assert objects.delete_where({obj_prop.ID: obj_id.Trigger.MOVE, obj_prop.X: None}) == len(moves)
+    assert objects.by_id(obj_id.Trigger.MOVE) == []
+
+
+@pytest.mark.parametrize("list_type", [ObjectList, ColumnarObjectList])
+def test_query_matches_scan(list_type: type) -> None:
+    objects = list_type()
+    objects.extend(make_move(i * 30, 40 if i % 4 == 0 else 1) for i in range(200))
+    objects.extend(new_obj(obj_id.Trigger.SPAWN) for _ in range(5))
+    for i in range(0, 200, 3):
+        objects[i][obj_prop.GROUPS] = {12, objects.tag_group}
+
+    query = objects.query().id(obj_id.Trigger.MOVE).in_group(12).x_between(3000, 5000).where(a51=40)
+    expected = [
+        obj for obj in objects
+        if obj[obj_prop.ID] == obj_id.Trigger.MOVE and 12 in obj.get(obj_prop.GROUPS, ())
+        and 3000 <= obj[obj_prop.X] <= 5000 and obj.get(obj_prop.Trigger.Move.TARGET_ID) == 40
+    ]
+    assert expected and sorted(o[obj_prop.X] for o in query) == sorted(o[obj_prop.X] for o in expected)
+    assert objects.query().id(obj_id.Trigger.SPAWN).count() == 5
+    assert objects.query().x_between(5000, 3000).y_between(-1, 1).count() == 67
+    assert objects.query().in_group(12).id(obj_id.Trigger.SPAWN).first() is None
+
+    assert query.select().shift(obj_prop.Y, 30) == len(expected)
+    assert query.where({obj_prop.Y: 30}).count() == len(expected)
+
+
+def test_query_plans_use_the_most_selective_index() -> None:
+    objects = ObjectList()
+    objects.extend(make_move(i * 30, 1) for i in range(100))
+    objects.append(new_obj(obj_id.Trigger.SPAWN))
+    for obj in objects[:4]:
+        obj[obj_prop.GROUPS] = {12}
+
+    plan = objects.query().id(obj_id.Trigger.MOVE).in_group(12).where(a51=1).explain()
+    assert plan.source == "group index: 12 in a57" and plan.estimate == 4
+    assert plan.checks == ["a1 == 901", "a51 == 1"]
+    assert objects.query().in_group(12).id(obj_id.Trigger.SPAWN).explain().source.startswith("ID index")
+
+    plan = objects.query().x_between(0, 300).explain(run=True)
+    assert plan.source == "scan" and plan.examined == 101 and plan.matched == 12
+    assert any("spatial_index()" in note for note in plan.notes)
+
+    objects.spatial_index()
+    plan = objects.query().x_between(0, 300).explain(run=True)
+    assert plan.source.startswith("spatial index") and plan.checks == [] and plan.matched == 12
+    assert plan.examined is not None and plan.examined < 101
+    assert "spatial index" in str(plan)
+
+    # Estimates are compared across every index: a narrow range beats a common object ID
+    plan = objects.query().id(obj_id.Trigger.MOVE).x_between(0, 60).explain(run=True)
+    assert plan.source.startswith("spatial index") and plan.estimate == 6 and plan.matched == 3
+
+    plan = objects.query().where(a51=7).explain()
+    assert plan.source == "scan" and any("trigger_graph()" in note for note in plan.notes)
+    objects[50][obj_prop.Trigger.Move.TARGET_ID] = 7
+    objects.trigger_graph()
+    plan = objects.query().id(obj_id.Trigger.MOVE).where(a51=7).explain(run=True)
+    assert plan.source == "target index: a51 == 7" and plan.estimate == 1
+    assert plan.checks == ["a1 == 901", "a51 == 7"] and plan.matched == 1
+
+
+def make_spawn(groups: set[int], target: int, spawn_triggered: bool = True) -> ObjectType:
+    obj = new_obj(obj_id.Trigger.SPAWN)
+    if groups:
+        obj[obj_prop.GROUPS] = groups
+    obj[obj_prop.Trigger.Spawn.TARGET_ID] = target
+    obj[obj_prop.Trigger.SPAWN_TRIGGER] = spawn_triggered
+    return obj
+
+
+def test_trigger_graph_queries() -> None:
+    objects = ObjectList()
+    objects.append(make_spawn(set(), 1, spawn_triggered=False))  # player-activated
+    objects.append(make_spawn({1}, 2))
+    objects.append(make_spawn({2}, 1))
+    objects.append(make_spawn({3}, 4))
+    objects.append(make_spawn({5}, 5))
+    graph = objects.trigger_graph()
+
+    tag = objects.tag_group  # every trigger is in it too, but nothing targets it
+    assert graph.targets(graph.ENTRY) == {1} and graph.sources(1) == {graph.ENTRY, 2, tag}
+    assert graph.reachable() == {1, 2} and graph.reachable(3) == {3, 4}
+    assert sorted(graph.cycles()) == [[1, 2], [5]]
+    assert graph.dead_groups() == {3, 5}
+    assert graph.missing_targets() == {4}
+    assert graph.groups() == {1, 2, 3, 5, tag}
+    assert graph.triggers(2, 1) == [objects[2]] and len(graph.activators(1)) == 2
+
+
+def test_trigger_graph_tracks_mutations() -> None:
+    objects = ObjectList()
+    objects.extend(make_spawn({i}, i + 1) for i in range(1, 50))
+    objects.append(make_spawn(set(), 1, spawn_triggered=False))
+    graph = objects.trigger_graph()
+    assert graph.reachable() == set(range(1, 51)) and graph.cycles() == []
+
+    objects[48][obj_prop.Trigger.Spawn.TARGET_ID] = 1  # 49 -> 1 closes a loop
+    assert graph.cycles() == [list(range(1, 50))] and graph.missing_targets() == set()
+    objects[10][obj_prop.Trigger.Spawn.REMAPS] = {20: 60}
+    assert graph.targets(11) == {12, 60} and graph.missing_targets() == {60}
+    objects[20][obj_prop.Trigger.SPAWN_TRIGGER] = False  # group 21's trigger runs on its own now
+    assert graph.targets(graph.ENTRY) == {1, 22}
+    objects.delete_where(lambda obj: 30 in obj.get(obj_prop.GROUPS, ()))
+    del objects[0]
+    objects.select(lambda obj: 40 in obj.get(obj_prop.GROUPS, ())).set({obj_prop.Trigger.Spawn.TARGET_ID: 31})
+
+    rebuilt = ObjectList()
+    rebuilt.extend(objects)
+    fresh = rebuilt.trigger_graph()
+    assert sorted((s, t) for s, t, _ in graph.edges()) == sorted((s, t) for s, t, _ in fresh.edges())
+    assert graph.groups() == fresh.groups()
+    assert graph.cycles() == fresh.cycles() == [list(range(31, 41))]
+    assert graph.reachable() == {1} | set(range(22, 31))
+    assert graph.dead_groups() == fresh.dead_groups() == set(range(2, 21)) | set(range(31, 50))
+
+
+@pytest.mark.parametrize("list_type", [ObjectList, ColumnarObjectList])
+def test_select_shift_and_set(list_type: type) -> None:
+    objects = list_type()
+    objects.extend(make_move(i * 10, 1 + i % 2) for i in range(6))
+
+    selection = objects.select({obj_prop.Trigger.Move.TARGET_ID: 2})
+    assert len(selection) == 3
+
+    assert selection.shift(obj_prop.X, 30) == 3
+    assert selection.set({obj_prop.Trigger.Move.DURATION: 2.5, obj_prop.GROUPS: {7}}) == 3
+    assert objects.select().values(obj_prop.X) == [0, 40, 20, 60, 40, 80]
+
+    edited = [o for o in objects if o[obj_prop.Trigger.Move.TARGET_ID] == 2]
+    assert all(o[obj_prop.Trigger.Move.DURATION] == 2.5 for o in edited)
+    # mutable values are copied per object
+    edited[0][obj_prop.GROUPS].add(8)
+    assert edited[1][obj_prop.GROUPS] == {7}
+
+
+@pytest.mark.parametrize("list_type", [ObjectList, ColumnarObjectList])
+def test_transform_calls_fn_per_value(list_type: type) -> None:
+    objects = list_type()
+    objects.extend(make_move(x, 1) for x in (-30, 0, 45))
+
+    assert objects.select().transform(obj_prop.X, lambda x: x if x > 0 else 0) == 3
+    assert objects.select().values(obj_prop.X) == [0, 0, 45]
+    if HAS_NUMPY:
+        assert objects.select().transform_column(obj_prop.X, lambda xs: xs * 2 + 1) == 3
+        assert objects.select().values(obj_prop.X) == [1, 1, 91]
+    else:
+        with pytest.raises(RuntimeError, match="NumPy"):
+            objects.select().transform_column(obj_prop.X, lambda xs: xs * 2)
+
+
+def test_select_validates_once_per_batch() -> None:
+    objects = ObjectList()
+    objects.extend(make_move(i, 1) for i in range(3))
+
+    with pytest.raises(ValueError):
+        objects.select().transform(obj_prop.Trigger.Move.TARGET_ID, lambda v: v + 10_000)
+    with pytest.raises(ValueError):
+        objects.select().set({obj_prop.Trigger.Spawn.DELAY: 1.0})
+
+    # nothing was written by the failed batches
+    assert objects.select().values(obj_prop.Trigger.Move.TARGET_ID) == [1, 1, 1]
+
+
+def test_selection_skips_removed_objects() -> None:
+    objects = ObjectList()
+    objects.extend(make_move(i * 30, 1) for i in range(8))
+    objects._dirty = {}  # pyright: ignore[reportPrivateUsage]
+    grid = objects.spatial_index()
+    selection = objects.select()
+
+    removed = objects.partition_where(lambda obj: obj[obj_prop.X] >= 120)
+    assert len(removed) == 4
+    assert selection.set({obj_prop.GROUPS: {7}}) == 4
+    assert selection.shift(obj_prop.X, 1000) == 4
+
+    assert objects.in_group(7) == list(objects)
+    assert all(7 not in obj[obj_prop.GROUPS] for obj in removed)
+    assert [obj[obj_prop.X] for obj in removed] == [120, 150, 180, 210]
+    assert len(grid.in_rect(0, -100, 10_000, 100)) == 4
+    assert set(objects._dirty) == {id(obj) for obj in objects}  # pyright: ignore[reportPrivateUsage]
+
+
+def test_group_index_tracks_mutations() -> None:
+    objects = ObjectList(tag_group=9999)
+    objects.extend(make_move(i, 1) for i in range(4))
+    objects[0][obj_prop.GROUPS] = {5, 9999}
+    objects[1].update({obj_prop.GROUPS: {5, 6}})
+    assert objects.in_group(5) == [objects[0], objects[1]]
+    assert len(objects.in_group(9999)) == 3
+
+    objects.select({obj_prop.X: 2}).set({obj_prop.GROUPS: {6}})
+    assert objects.in_group(6) == [objects[1], objects[2]]
+
+    removed = objects.pop(0)
+    removed[obj_prop.GROUPS] = {6}  # detached objects are no longer tracked
+    assert objects.in_group(5) == [objects[0]]
+    assert removed not in objects.in_group(6)
+
+    objects[0] = make_move(0, 1)
+    assert objects.in_group(5) == []
+    del objects[:]
+    assert objects.in_group(6) == [] and objects.in_group(9999) == []
+
+
+def test_group_index_parent_groups() -> None:
+    objects = ObjectList()
+    obj = make_move(0, 1)
+    obj[obj_prop.PARENT_GROUPS] = {3}
+    objects.append(obj)
+    assert objects.group_parents(3) == [objects[0]]
+
+    del objects[0][obj_prop.PARENT_GROUPS]
+    assert objects.group_parents(3) == []
+
+
+def test_spatial_index_queries_follow_moves() -> None:
+    objects = ObjectList()
+    objects.extend(make_move(x, 1) for x in range(0, 3000, 30))  # y = 0 for all
+    grid = objects.spatial_index(cell_size=90)
+
+    assert [o[obj_prop.X] for o in sorted(grid.in_rect(600, -10, 690, 10), key=lambda o: o[obj_prop.X])] == [600, 630, 660, 690]
+    assert len(grid.in_radius(1500, 0, 45)) == 3
+    assert [o[obj_prop.X] for o in grid.nearest(1000, 0, k=2)] == [990, 1020]
+    assert len(grid.in_rect(-math.inf, -10, math.inf, 10)) == 100
+    assert grid.in_rect(math.inf, -10, math.inf, 10) == [] and grid.in_rect(0, -math.inf, 100, -math.inf) == []
+
+    far = objects[0]
+    far[obj_prop.Y] = 5000
+    assert far not in grid.in_rect(0, -10, 100, 10)
+    assert grid.nearest(0, 4990) == [far]
+
+    objects.select({obj_prop.X: 60}).move(dx=10_000)
+    assert [o[obj_prop.X] for o in grid.nearest(10_000, 0)] == [10_060]
+
+    del objects[:50]
+    assert len(grid) == 50 and grid.in_rect(0, -10, 1470, 6000) == []
+
+
+def test_spatial_index_bulk_built_on_load() -> None:
+    level = Level.from_file(SMALL_LEVEL, spatial_index=True)
+    objects = level.objects
+    assert isinstance(objects, ObjectList)
+
+    grid = objects.spatial_index()
+    assert len(grid) == len(objects)
+    expected = [o for o in objects if 0 <= o.get(obj_prop.X, 0) <= 300 and 0 <= o.get(obj_prop.Y, 0) <= 300]
+    assert sorted(map(id, grid.in_rect(0, 0, 300, 300))) == sorted(map(id, expected))
+
+
+def test_custom_index_must_implement_every_hook() -> None:
+    class Partial(ObjectIndex):
+        def add(self, obj: ObjectType) -> None: ...
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial()  # type: ignore[abstract]
+
+
+def test_typed_access_requires_of_id() -> None:
+    class NoLookup(TypedAccess): ...
+
+    with pytest.raises(TypeError, match="_of_id"):
+        NoLookup()  # type: ignore[abstract]
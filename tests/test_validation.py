@@ -0,0 +1,228 @@
+"""
+Validation tests: compiled per-ID checks and the setting flags.
+"""
+
+import warnings
+from pathlib import Path
+
+import pytest
+
+from gmdbuilder.core import new_obj
+from gmdbuilder.id import NamedInt
+from gmdbuilder.level import Level
+from gmdbuilder.mappings import obj_id, obj_prop
+from gmdbuilder.object import LazyObject, ObjectList
+from gmdbuilder.object_types import ObjectType
+from gmdbuilder.validation import (
+    compile_validators,
+    deferred_validation,
+    find_spawn_loops,
+    setting,
+    validate_batch,
+    validate_spawn_limit,
+    validation_stats,
+)
+
+SMALL_LEVEL = Path(__file__).parent / "levels" / "3Depth.gmd"
+
+
+@pytest.fixture
+def move():
+    objects = ObjectList()
+    objects.append(new_obj(obj_id.Trigger.MOVE))
+    return objects[0]
+
+
+def spawner(object_id: int, group: int, target: int, **props: object) -> ObjectType:
+    obj = new_obj(object_id)
+    obj[obj_prop.GROUPS] = {group}
+    obj[obj_prop.Trigger.SPAWN_TRIGGER] = True
+    obj[obj_prop.Trigger.Spawn.TARGET_ID] = target
+    for key, value in props.items():
+        obj[key] = value
+    return obj
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+def test_compiled_table_matches_allowed_keys() -> None:
+    table = compile_validators(obj_id.Trigger.MOVE)
+    assert obj_prop.Trigger.Move.TARGET_ID in table
+    assert obj_prop.X in table
+    assert obj_prop.Trigger.Spawn.DELAY not in table
+    assert compile_validators(obj_id.Trigger.MOVE) is table
+
+
+def test_validate_rejects_bad_writes(move) -> None:
+    move[obj_prop.X] = 15
+    move[obj_prop.Trigger.Move.TARGET_ID] = 9999
+    move[obj_prop.GROUPS] = {1, 2}
+
+    with pytest.raises(ValueError, match="not allowed"):
+        move[obj_prop.Trigger.Spawn.DELAY] = 1.0
+    with pytest.raises(ValueError, match="Invalid value"):
+        move[obj_prop.X] = "15"
+    with pytest.raises(ValueError, match="Invalid value"):
+        move[obj_prop.Trigger.Move.TARGET_ID] = 10_000
+    with pytest.raises(ValueError, match="Invalid value"):
+        move[obj_prop.GROUPS] = {1, -2}
+
+
+def test_validate_respects_settings(move, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(setting, "property_type_check", False)
+    move[obj_prop.X] = "anything"
+
+    monkeypatch.setattr(setting, "property_allowed_check", False)
+    move[obj_prop.Trigger.Spawn.DELAY] = "anything"
+
+    monkeypatch.setattr(setting, "property_type_check", True)
+    with pytest.raises(ValueError, match="Invalid value"):
+        move[obj_prop.Trigger.Spawn.DELAY] = "anything"
+
+
+def test_deferred_validation_reports_all_failures() -> None:
+    objects = ObjectList()
+    objects.extend(new_obj(obj_id.Trigger.MOVE) for _ in range(3))
+
+    with pytest.raises(ValueError) as err:
+        with deferred_validation():
+            for obj in objects:
+                obj[obj_prop.X] = "bad"
+                obj[obj_prop.Trigger.Spawn.DELAY] = 1.0
+            objects[0][obj_prop.Y] = 30  # valid writes are recorded too
+    message = str(err.value)
+    assert "2 problems" in message
+    assert "(3 objects)" in message
+    with pytest.raises(ValueError, match="Invalid value"):
+        objects[0][obj_prop.X] = "still bad"  # a failed block doesn't leave validation deferred
+
+
+def test_deferred_validation_checks_final_values(move) -> None:
+    with deferred_validation():
+        move[obj_prop.X] = "bad"
+        with deferred_validation():
+            move[obj_prop.Y] = "bad"
+        move[obj_prop.X] = 15  # fixed before the block exits
+        move[obj_prop.Y] = 30
+
+    assert move[obj_prop.X] == 15
+    with pytest.raises(ValueError, match="Invalid value"):
+        move[obj_prop.X] = "bad"  # immediate again outside the block
+
+
+def test_deferred_validation_covers_batches_and_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    objects = ObjectList()
+    objects.extend(new_obj(obj_id.Trigger.MOVE) for _ in range(3))
+
+    with pytest.raises(ValueError, match="(3 objects)"):
+        with deferred_validation():
+            objects.select().set({obj_prop.X: "bad"})  # recorded, not checked yet
+            assert validation_stats()["deferred_pending_objects"] == 3
+
+    with pytest.raises(KeyError) as err:
+        with deferred_validation():
+            objects[0][obj_prop.Y] = "bad"
+            raise KeyError("original")
+    assert err.value.args == ("original",)
+    assert any("Invalid values" in note for note in err.value.__notes__)
+
+    monkeypatch.setattr(setting, "property_allowed_check", False)
+    with pytest.raises(ValueError, match="2 problems"):
+        with deferred_validation():
+            objects[0]["a99999"] = 1
+            objects[1][obj_prop.X] = "bad"
+
+
+def test_deferred_validation_checks_decoded_objects() -> None:
+    objects = Level.from_file(SMALL_LEVEL).objects
+    with deferred_validation():
+        objects[0][obj_prop.X] = 15
+        decoded = sum(obj_prop.X in obj for obj in objects[:10])
+        assert validation_stats()["deferred_pending_objects"] == 10 and decoded > 0
+
+    bad = LazyObject("1,901,2,15,63,1.5")  # a Spawn trigger key on a Move trigger
+    with pytest.raises(ValueError, match="a63"):
+        with deferred_validation():
+            assert bad[obj_prop.X] == 15  # checked on exit, like it is on decode outside a block
+
+
+def test_value_checks_do_not_cache_values(move) -> None:
+    before = validation_stats()
+    for i in range(5000):
+        move[obj_prop.X] = i + 0.5
+    after = validation_stats()
+
+    assert after["compiled_object_ids"] == before["compiled_object_ids"]
+    assert after["subclass_type_checks"] == before["subclass_type_checks"]
+
+    class Flag(int): ...
+    move[obj_prop.Trigger.Move.TARGET_ID] = Flag(3)  # subclasses still pass, off the fast path
+    assert validation_stats()["subclass_type_checks"] == after["subclass_type_checks"] + 1
+    with pytest.raises(ValueError):
+        move[obj_prop.Trigger.Move.TARGET_ID] = True
+
+
+def test_find_spawn_loops(monkeypatch: pytest.MonkeyPatch) -> None:
+    spawn = obj_prop.Trigger.Spawn
+    objects = ObjectList()
+    objects.extend([
+        spawner(obj_id.Trigger.SPAWN, 1, 2),
+        spawner(obj_id.Trigger.SPAWN, 2, 3),
+        spawner(obj_id.Trigger.SPAWN, 3, 1, a63=0.5, a556=0.5),  # random delay can be 0
+        spawner(obj_id.Trigger.SPAWN, 4, 5, a63=0.5),            # delayed, so not in one tick
+        spawner(obj_id.Trigger.SPAWN, 5, 4),
+        spawner(obj_id.Trigger.RANDOM, 6, 7, a71=6),
+        spawner(obj_id.Trigger.MOVE, 8, 8),                       # moves, doesn't spawn
+        spawner(obj_id.Trigger.SPAWN, 10, 11, a442={12: 10}),
+        spawner(obj_id.Trigger.SPAWN, 11, 12),                    # spawns 10 when spawned by 10
+    ])
+    loops = find_spawn_loops(objects.trigger_graph())
+
+    assert sorted(map(str, loops)) == ["1 -> 2 -> 3 -> 1", "10 -> 11 -> 10", "6 -> 6"]
+    first = next(loop for loop in loops if loop.groups[0] == 1)
+    assert first.triggers == tuple(objects[:3]) and first.component == (1, 2, 3)
+
+    monkeypatch.setattr(setting, "property_allowed_check", False)
+    objects[5][spawn.DELAY] = 0.5  # only Spawn triggers have a delay
+    assert "6 -> 6" in map(str, find_spawn_loops(objects.trigger_graph()))
+
+    objects[2][spawn.DELAY_RAND] = 0.0
+    objects[5][obj_prop.Trigger.Random.FALSE_ID] = 7
+    objects[7][spawn.REMAPS] = {}
+    assert find_spawn_loops(objects.trigger_graph()) == []
+
+
+def test_spawn_limit_check_warns(monkeypatch: pytest.MonkeyPatch) -> None:
+    objects = ObjectList()
+    objects.extend([spawner(obj_id.Trigger.SPAWN, 1, 2), spawner(obj_id.Trigger.SPAWN, 2, 1)])
+    graph = objects.trigger_graph()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        validate_spawn_limit(graph)  # off by default
+    monkeypatch.setattr(setting, "spawn_limit_check", True)
+    with pytest.warns(UserWarning, match=r"SPAWN-LIMIT CHECK FAILED[\s\S]*1 -> 2 -> 1"):
+        validate_spawn_limit(graph)
+
+
+def test_find_spawn_loops_leaves_loaded_objects_undecoded() -> None:
+    objects = Level.from_file(SMALL_LEVEL).objects
+    assert isinstance(objects, ObjectList)
+
+    find_spawn_loops(objects.trigger_graph())
+    assert all(type(obj) is LazyObject for obj in objects)
+
+
+def test_validate_batch_range_checks_int_subclasses(move) -> None:
+    validate_batch(obj_prop.COLOR_1, [NamedInt(5, "color"), 20, 6], [move])
+    with pytest.raises(ValueError, match="Invalid value"):
+        validate_batch(obj_prop.COLOR_1, [NamedInt(5, "color"), 20_000, 6], [move])
+    with pytest.raises(ValueError, match="Invalid value"):
+        validate_batch(obj_prop.X, [1.5, NamedInt(2, "x"), "3"], [move])
+
+
+def test_validate_batch_keeps_bools_apart_from_ints(move) -> None:
+    validate_batch(obj_prop.Trigger.SPAWN_TRIGGER, [True, False, True], [move])
+    with pytest.raises(ValueError, match="Invalid value"):
+        validate_batch(obj_prop.Trigger.SPAWN_TRIGGER, [True, 1], [move])